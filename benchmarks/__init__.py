@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+benchmarks 패키지
+- loadtest.py: API 부하/지연 시간 측정 (python -m benchmarks.loadtest)
+- mock_azure.py: 로컬 Azure OpenAI 대역 서버 (python -m benchmarks.mock_azure)
+"""
@@ -0,0 +1,355 @@
+# benchmarks/loadtest.py
+
+"""
+loadtest.py
+API 부하/지연 시간 벤치마크
+- 로컬 Azure OpenAI 대역 서버(mock_azure)와 API 서버(uvicorn)를 하위 프로세스로 띄운 뒤
+  /chat, /history, /upload 를 지정한 동시성으로 호출
+- 질문은 kb_default/faq_data.csv 기반의 헬프데스크 질문 구성(FAQ / 인사 / 도구 / 담당자 조회)에서 추출
+- 엔드포인트별 처리량(req/s), p50/p95/p99 지연 시간(ms), 오류 수, 서버 RSS(MB)를 JSON 으로 저장
+  → 커밋별 결과 비교: --baseline 이전_결과.json
+
+실행 예: python -m benchmarks.loadtest --concurrency 16 --requests 200 --latency-ms 300 --output bench.json
+주의: API 서버는 프로젝트의 kb_data/(대화 기록 DB, 업로드 파일)와 indexes/ 를 그대로 사용합니다.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time as _time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+FAQ_PATH = BASE_DIR / "kb_default" / "faq_data.csv"
+UPLOAD_DIR = BASE_DIR / "kb_data"
+ENDPOINTS = ("chat", "history", "upload")
+
+# 질문 구성 비율 (운영 로그 기준 대략적인 헬프데스크 문의 분포)
+QUESTION_MIX = {"faq": 0.7, "greeting": 0.1, "tool": 0.1, "owner": 0.1}
+GREETINGS = ["안녕하세요", "안녕", "반가워"]
+TOOL_QUESTIONS = ["비밀번호 초기화 방법 알려줘", "아이디 발급 어떻게 해요?", "계정 신청하고 싶어요"]
+OWNER_QUESTIONS = ["인사시스템 담당자 누구야?", "재무시스템 정산화면 담당자 알려줘", "담당자 전체 리스트 보여줘"]
+# FAQ 질문 변형 (같은 질문만 반복하면 응답 캐시만 측정하게 되므로)
+FAQ_SUFFIXES = ["", "?", " 알려주세요", " 어떻게 하나요?", " 문의드립니다"]
+
+
+# =============================================================
+# 1. 질문 구성 / 통계
+# =============================================================
+def load_faq_questions(path: Path = FAQ_PATH) -> List[str]:
+    with open(path, encoding="utf-8-sig") as f:
+        return [row["question"].strip() for row in csv.DictReader(f) if row.get("question", "").strip()]
+
+
+def question_mix(n: int, seed: int = 42, faq_questions: Optional[List[str]] = None) -> List[str]:
+    """QUESTION_MIX 비율대로 n개의 질문을 만듭니다 (seed 가 같으면 같은 순서)."""
+    rng = random.Random(seed)
+    faq = faq_questions if faq_questions is not None else load_faq_questions()
+    pools = {
+        "faq": [q + s for q in faq for s in FAQ_SUFFIXES],
+        "greeting": GREETINGS,
+        "tool": TOOL_QUESTIONS,
+        "owner": OWNER_QUESTIONS,
+    }
+    kinds = rng.choices(list(QUESTION_MIX), weights=list(QUESTION_MIX.values()), k=n)
+    return [rng.choice(pools[kind]) for kind in kinds]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """선형 보간 백분위수 (sorted_values 는 오름차순)"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * p / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+@dataclass
+class PhaseResult:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+    rss_mb: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        total = len(lat) + self.errors
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "throughput_rps": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(lat) / len(lat), 2) if lat else 0.0,
+                "p50": round(percentile(lat, 50), 2),
+                "p95": round(percentile(lat, 95), 2),
+                "p99": round(percentile(lat, 99), 2),
+                "max": round(lat[-1], 2) if lat else 0.0,
+            },
+            "rss_mb": {
+                "start": self.rss_mb[0] if self.rss_mb else None,
+                "end": self.rss_mb[-1] if self.rss_mb else None,
+                "peak": max(self.rss_mb) if self.rss_mb else None,
+            },
+        }
+
+
+def read_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """프로세스 RSS(MB) - Linux /proc 기준, 읽을 수 없으면 None"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+# =============================================================
+# 2. 부하 실행
+# =============================================================
+async def _sample_rss(pid: Optional[int], out: List[float], stop: asyncio.Event, interval: float = 0.1) -> None:
+    while True:
+        rss = read_rss_mb(pid)
+        if rss is not None:
+            out.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_phase(client: httpx.AsyncClient, requests: List[Tuple[str, str, Dict[str, Any]]], concurrency: int, pid: Optional[int]) -> PhaseResult:
+    """(method, url, httpx 인자) 요청 목록을 concurrency 개의 작업자로 실행"""
+    result = PhaseResult()
+    queue: asyncio.Queue = asyncio.Queue()
+    for req in requests:
+        queue.put_nowait(req)
+
+    async def worker() -> None:
+        while True:
+            try:
+                method, url, kwargs = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = _time.perf_counter()
+            try:
+                r = await client.request(method, url, **kwargs)
+                ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies_ms.append((_time.perf_counter() - start) * 1000)
+            else:
+                result.errors += 1
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(pid, result.rss_mb, stop))
+    start = _time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = _time.perf_counter() - start
+    stop.set()
+    await sampler
+    return result
+
+
+def build_requests(endpoint: str, n: int, sessions: List[str], questions: List[str], run_id: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+    if endpoint == "chat":
+        return [("POST", "/chat", {"json": {"message": q, "session_id": sessions[i % len(sessions)]}}) for i, q in enumerate(questions[:n])]
+    if endpoint == "history":
+        return [("GET", "/history", {"params": {"session_id": sessions[i % len(sessions)], "limit": 20}}) for i in range(n)]
+    if endpoint == "upload":
+        body = ("\n".join(questions[:50]) + "\n").encode("utf-8")
+        return [("POST", "/upload", {"files": {"files": (f"bench_{run_id}_{i}.txt", body, "text/plain")}}) for i in range(n)]
+    raise ValueError(f"알 수 없는 엔드포인트: {endpoint}")
+
+
+async def run_benchmark(base_url: str, endpoints: List[str], n: int, concurrency: int, sessions: int, seed: int, pid: Optional[int], run_id: str, warmup: int = 5) -> Dict[str, Any]:
+    session_ids = [f"bench-{run_id}-{i}" for i in range(sessions)]
+    questions = question_mix(max(n, warmup, 50), seed)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        # 워밍업: 인덱스 로드, 커넥션 풀, 의도 분류 중심 계산 등 첫 요청 비용 제외
+        await run_phase(client, build_requests("chat", warmup, session_ids, question_mix(warmup, seed + 1), run_id), 1, None)
+        # history 는 chat 단계에서 쌓인 기록을 조회하므로 chat 을 먼저 실행
+        for endpoint in sorted(endpoints, key=ENDPOINTS.index):
+            phase = await run_phase(client, build_requests(endpoint, n, session_ids, questions, run_id), concurrency, pid)
+            results[endpoint] = phase.summary()
+    return results
+
+
+# =============================================================
+# 3. 서버 프로세스 관리
+# =============================================================
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_ready(url: str, proc: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = _time.monotonic() + timeout
+    while _time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"서버 프로세스가 종료되었습니다 (exit={proc.returncode}): {url}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        _time.sleep(0.2)
+    raise TimeoutError(f"서버가 {timeout}초 안에 준비되지 않았습니다: {url}")
+
+
+def start_servers(mock_args: List[str], extra_env: Dict[str, str]) -> Tuple[str, List[subprocess.Popen]]:
+    """mock_azure(mock_args 옵션)와 API 서버를 띄우고 (API base_url, 프로세스 목록)을 반환 (API 프로세스가 마지막)"""
+    mock_port, api_port = _free_port(), _free_port()
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_azure", "--port", str(mock_port), *mock_args],
+        cwd=BASE_DIR,
+    )
+    procs = [mock]
+    try:
+        _wait_until_ready(f"http://127.0.0.1:{mock_port}/docs", mock)
+        env = {
+            **os.environ,
+            "AOAI_ENDPOINT": f"http://127.0.0.1:{mock_port}",
+            "AOAI_API_KEY": "mock",
+            # 오프라인 환경에서 tiktoken 인코딩 파일을 받지 않도록
+            "EMBED_CHECK_CTX_LENGTH": "0",
+            **extra_env,
+        }
+        api = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "platform_service.api:api", "--port", str(api_port), "--log-level", "warning"],
+            cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,  # 로그는 logs/ 에 기록
+        )
+        procs.append(api)
+        _wait_until_ready(f"http://127.0.0.1:{api_port}/health", api)
+    except BaseException:
+        stop_servers(procs)
+        raise
+    return f"http://127.0.0.1:{api_port}", procs
+
+
+def stop_servers(procs: List[subprocess.Popen]) -> None:
+    for proc in reversed(procs):
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# =============================================================
+# 4. 결과 출력 / 비교
+# =============================================================
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    lines = [f"{'endpoint':<10}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}{'rss_peak':>10}"]
+    for endpoint, r in report["results"].items():
+        lat = r["latency_ms"]
+        peak = r["rss_mb"]["peak"]
+        lines.append(f"{endpoint:<10}{r['throughput_rps']:>10}{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}{r['errors']:>8}{peak if peak is not None else '-':>10}")
+        base = (baseline or {}).get("results", {}).get(endpoint)
+        if base:
+            def delta(new: float, old: float) -> str:
+                return f"{(new - old) / old * 100:+.1f}%" if old else "-"
+            lines.append(
+                f"{'  vs base':<10}{delta(r['throughput_rps'], base['throughput_rps']):>10}"
+                f"{delta(lat['p50'], base['latency_ms']['p50']):>10}{delta(lat['p95'], base['latency_ms']['p95']):>10}"
+                f"{delta(lat['p99'], base['latency_ms']['p99']):>10}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Service Desk Assistant API 부하/지연 시간 벤치마크")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="측정할 엔드포인트 (chat,history,upload)")
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--sessions", type=int, default=20, help="사용할 세션(session_id) 수")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mock Azure 응답 지연(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="mock Azure 응답 지연 편차(±ms)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="mock Azure 429 응답 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=42, help="질문 구성 시드")
+    parser.add_argument("--base-url", help="이미 실행 중인 API 서버 주소 (지정하면 서버를 띄우지 않음)")
+    parser.add_argument("--server-pid", type=int, help="--base-url 서버의 PID (RSS 측정용)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="API 서버 환경 변수 추가 (반복 가능)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"알 수 없는 엔드포인트: {', '.join(sorted(unknown))}")
+
+    run_id = uuid.uuid4().hex[:8]
+    procs: List[subprocess.Popen] = []
+    if args.base_url:
+        base_url, pid = args.base_url, args.server_pid
+    else:
+        extra_env = dict(item.split("=", 1) for item in args.env)
+        mock_args = ["--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms), "--rate-limit", str(args.rate_limit), "--seed", str(args.seed)]
+        base_url, procs = start_servers(mock_args, extra_env)
+        pid = procs[-1].pid
+    try:
+        results = asyncio.run(run_benchmark(base_url, endpoints, args.requests, args.concurrency, args.sessions, args.seed, pid, run_id))
+    finally:
+        stop_servers(procs)
+        if procs:
+            # 직접 띄운 서버에 업로드한 벤치마크 파일 정리
+            for path in UPLOAD_DIR.glob(f"bench_{run_id}_*.txt"):
+                path.unlink(missing_ok=True)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": _time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_url": base_url if args.base_url else "local",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "sessions": args.sessions,
+            "mock": None if args.base_url else {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "rate_limit": args.rate_limit},
+            "seed": args.seed,
+            "run_id": run_id,
+        },
+        "results": results,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# benchmarks/micro/bench_hotpaths.py
+
+"""
+검색 / FAQ 매칭 핫패스 마이크로벤치마크 (pytest-benchmark)
+실행: pytest benchmarks/micro                       (저장된 기준 대비 20% 이상 느려지면 실패)
+기준 저장: pytest benchmarks/micro --benchmark-save=baseline
+빠른 확인: BENCH_SIZES=1000,100000 pytest benchmarks/micro
+"""
+import functools
+import itertools
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+from benchmarks.loadtest import question_mix
+from platform_service import ann, core, tokenizer
+
+from .conftest import SIZES, faq_corpus, kb_documents, owner_corpus, sentences, size_id
+
+pytest.importorskip("pytest_benchmark")
+
+SIZE_PARAMS = pytest.mark.parametrize("n", SIZES, ids=size_id)
+# 대용량 코퍼스는 1회 실행이 길어 라운드 수를 고정
+LARGE = 100_000
+
+# FAISS: text-embedding-3-small 차원, Flat 은 벡터 메모리가 이 크기를 넘으면 생략
+DIM = int(os.getenv("BENCH_DIM", "1536"))
+FLAT_MAX_BYTES = int(os.getenv("BENCH_FLAT_MAX_BYTES", str(2 * 1024 ** 3)))
+_ADD_CHUNK = 50_000
+
+
+# =============================================================
+# 1. FAQ 매칭 (find_similar_faq: 역색인 + Jaccard 상한 조기 종료)
+# =============================================================
+@SIZE_PARAMS
+def test_find_similar_faq(benchmark, monkeypatch, dummy_okt, n):
+    data = faq_corpus(n)
+    monkeypatch.setattr(core, "_faq_data", data)
+    monkeypatch.setattr(core, "_faq_postings", core._build_faq_postings(data))
+    # 코퍼스 질문과 단어를 공유하는 새 질문 (매 호출 다른 질문)
+    queries = itertools.cycle(sentences(256, seed=99))
+    benchmark(lambda: core.find_similar_faq(next(queries)))
+
+
+# =============================================================
+# 2. 형태소 분석 (get_okt().phrases: load_faq_data / find_similar_faq 에서 사용)
+#    KOREAN_TOKENIZER=kiwi|okt 로 백엔드 선택 (extra_info에 백엔드 이름 기록)
+# =============================================================
+def _analyzer(benchmark, text):
+    try:
+        okt = core.get_okt()
+        okt.phrases(text)
+    except Exception as e:  # kiwipiepy / JVM 미설치 등
+        pytest.skip(f"형태소 분석기를 사용할 수 없습니다: {e}")
+    if isinstance(okt, core._DummyOkt):
+        pytest.skip("TEST_DISABLE_JVM=1: 실제 형태소 분석기가 아님")
+    benchmark.extra_info["tokenizer"] = okt.name
+    return okt
+
+
+def test_okt_phrases(benchmark):
+    texts = question_mix(1000, seed=7)
+    okt = _analyzer(benchmark, texts[0])
+    benchmark.pedantic(lambda: [okt.phrases(t) for t in texts], rounds=3, iterations=1, warmup_rounds=1)
+
+
+def test_okt_phrases_batch(benchmark):
+    """load_faq_data 경로: 질문 전체를 한 번에 분석 (Kiwi는 내부 스레드 풀 사용)"""
+    texts = question_mix(1000, seed=7)
+    okt = _analyzer(benchmark, texts[0])
+    benchmark.pedantic(lambda: tokenizer.phrases_many(okt, texts), rounds=3, iterations=1, warmup_rounds=1)
+
+
+# =============================================================
+# 3. 담당자 조회 (tool_owner_lookup: 화면명 부분 일치 선형 탐색)
+# =============================================================
+@SIZE_PARAMS
+def test_tool_owner_lookup(benchmark, monkeypatch, n):
+    owners = owner_corpus(n)
+    monkeypatch.setattr(core, "_owner_data", owners)
+    target = owners[-1]["screen"]  # 최악의 경우: 마지막 행
+    result = benchmark(core.tool_owner_lookup.invoke, {"payload": {"screen": target}})
+    assert result["ok"] and result["screen"] == target
+
+
+# =============================================================
+# 4. 청크 분할 (build_or_load_vectorstore 의 RecursiveCharacterTextSplitter)
+# =============================================================
+@SIZE_PARAMS
+def test_split_documents(benchmark, n):
+    docs = kb_documents(n)
+    splitter = core._make_splitter()
+    rounds = 3 if n >= LARGE else 10
+    chunks = benchmark.pedantic(splitter.split_documents, args=(docs,), rounds=rounds, iterations=1)
+    assert len(chunks) > n
+
+
+# =============================================================
+# 5. FAISS 검색 (질의 1건, HYBRID_FETCH_K 후보)
+# =============================================================
+def _vectors(n: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, DIM), dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=1)
+def _faiss_index(n: int, index_type: str):
+    """서비스와 같은 팩토리 설정(ann._factory_string)으로 만든 인덱스 (벡터는 청크 단위로 생성해 추가)"""
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(DIM)
+    else:
+        opts = {"nlist": core.INDEX_NLIST, "pq_m": core.INDEX_PQ_M, "hnsw_m": core.INDEX_HNSW_M,
+                "ef_construction": core.INDEX_EF_CONSTRUCTION}
+        factory = ann._factory_string(index_type, DIM, n, opts)
+        if factory is None:
+            pytest.skip(f"{index_type}: 벡터 수({n})가 학습에 부족합니다.")
+        index = faiss.index_factory(DIM, factory)
+        index.train(_vectors(min(n, core.INDEX_TRAIN_SAMPLE), seed=0))
+    for start in range(0, n, _ADD_CHUNK):
+        index.add(_vectors(min(_ADD_CHUNK, n - start), seed=start + 1))
+    return index
+
+
+@SIZE_PARAMS
+@pytest.mark.parametrize("index_type", ["flat", "ivf_pq"])
+def test_faiss_search(benchmark, n, index_type):
+    if index_type == "flat" and n * DIM * 4 > FLAT_MAX_BYTES:
+        pytest.skip(f"Flat 인덱스 벡터 메모리가 BENCH_FLAT_MAX_BYTES({FLAT_MAX_BYTES})를 넘습니다.")
+    index = _faiss_index(n, index_type)
+    params = ann.search_parameters(index, nprobe=core.INDEX_NPROBE, ef_search=core.INDEX_EF_SEARCH)
+    queries = itertools.cycle(list(_vectors(64, seed=-1 % 2**32)[:, None, :]))
+    k = core.HYBRID_FETCH_K
+    _, ids = benchmark(lambda: index.search(next(queries), k, params=params))
+    assert ids.shape == (1, k)
@@ -0,0 +1,119 @@
+# benchmarks/micro/conftest.py
+
+"""
+검색 / FAQ 매칭 핫패스 마이크로벤치마크용 합성 코퍼스
+- 코퍼스 크기: BENCH_SIZES (기본 1000,100000,1000000)
+- 같은 크기의 코퍼스는 항상 같은 내용으로 생성 (시드 고정) → 커밋 간 결과 비교 가능
+- 메모리를 아끼기 위해 종류별로 마지막에 만든 크기의 코퍼스 하나만 유지
+- 저장된 기준 결과가 있으면 가장 최근 결과와 비교하여 BENCH_REGRESSION(기본: 중앙값 20%) 이상 느려지면 실패
+  기준 저장: pytest benchmarks/micro --benchmark-save=baseline
+"""
+import functools
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from platform_service import core
+
+try:
+    from pytest_benchmark.utils import parse_compare_fail
+except ImportError:  # pragma: no cover - pip install -e ".[bench]"
+    parse_compare_fail = None
+
+SIZES = [int(s) for s in os.getenv("BENCH_SIZES", "1000,100000,1000000").split(",") if s.strip()]
+VOCAB_SIZE = 20000
+SEED = 1234
+BENCH_REGRESSION = os.getenv("BENCH_REGRESSION", "median:20%")
+
+_SYLLABLES = [chr(c) for c in range(0xAC00, 0xD7A4, 7)]  # 한글 음절 일부
+
+
+def size_id(n: int) -> str:
+    return f"{n // 1000}k" if n < 1_000_000 else f"{n // 1_000_000}m"
+
+
+@functools.lru_cache(maxsize=1)
+def vocabulary() -> List[str]:
+    rng = np.random.default_rng(SEED)
+    words = set()
+    while len(words) < VOCAB_SIZE:
+        words.add("".join(rng.choice(_SYLLABLES, size=int(rng.integers(2, 5)))))
+    return sorted(words)
+
+
+def sentences(n: int, seed: int) -> List[str]:
+    """Zipf 분포 단어로 만든 4~8 단어 문장 n개 (자주 쓰이는 단어가 많은 FAQ 질문과 비슷한 분포)"""
+    vocab = vocabulary()
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(4, 9, size=n)
+    ranks = np.minimum(rng.zipf(1.3, size=int(lengths.sum())), VOCAB_SIZE) - 1
+    out, pos = [], 0
+    for length in lengths:
+        out.append(" ".join(vocab[r] for r in ranks[pos:pos + length]))
+        pos += length
+    return out
+
+
+@functools.lru_cache(maxsize=1)
+def faq_corpus(n: int) -> List[Dict[str, Any]]:
+    tokenizer = core._DummyOkt()  # load_faq_data 와 같은 구조 (형태소 분석 비용은 별도 벤치마크)
+    return [
+        {"question": q, "answer": f"답변 {i}", "faq_words": set(tokenizer.phrases(q))}
+        for i, q in enumerate(sentences(n, SEED + 1))
+    ]
+
+
+@functools.lru_cache(maxsize=1)
+def owner_corpus(n: int) -> List[Dict[str, str]]:
+    vocab = vocabulary()
+    return [
+        {"screen": f"{vocab[i % VOCAB_SIZE]}시스템-{vocab[(i * 7919) % VOCAB_SIZE]}화면{i}", "owner": f"담당자{i}",
+         "email": f"owner{i}@example.com", "phone": f"010-{i % 10000:04d}-{i // 10000 % 10000:04d}"}
+        for i in range(n)
+    ]
+
+
+@functools.lru_cache(maxsize=1)
+def kb_documents(n: int) -> List[Document]:
+    """대부분 FAQ 행 길이(수십 자)이고 100건 중 1건은 긴 문서(약 3천 자)인 문서 n개"""
+    short = sentences(n, SEED + 2)
+    long_text = " ".join(sentences(120, SEED + 3))
+    return [
+        Document(page_content=long_text if i % 100 == 0 else text, metadata={"source": f"doc{i % 50}.txt", "row": i})
+        for i, text in enumerate(short)
+    ]
+
+
+@pytest.fixture
+def dummy_okt(monkeypatch):
+    monkeypatch.setattr(core, "_okt", core._DummyOkt())
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    """기준 결과가 저장되어 있으면 최근 결과와 비교하고 회귀 기준(BENCH_REGRESSION)을 적용합니다."""
+    session = getattr(config, "_benchmarksession", None)
+    if session is None or parse_compare_fail is None or session.compare or session.compare_fail:
+        return  # 플러그인 없음 / 명령행에서 직접 지정한 경우 그대로 사용
+    if not list(session.storage.load()):
+        session.logger.warning("저장된 기준 결과가 없어 비교를 생략합니다: --benchmark-save=baseline 으로 저장하세요.")
+        return
+    session.compare = True
+    session.compare_fail = [parse_compare_fail(BENCH_REGRESSION)]
+    session.handle_loading()
+
+
+_last_test = {"name": None}
+
+
+@pytest.fixture(autouse=True)
+def _release_corpora(request):
+    """다른 벤치마크 함수로 넘어가면 이전 코퍼스를 해제 (1M 코퍼스 여러 개가 동시에 메모리에 남지 않도록)"""
+    name = request.node.originalname
+    if name != _last_test["name"]:
+        for cached in (faq_corpus, owner_corpus, kb_documents):
+            cached.cache_clear()
+        _last_test["name"] = name
@@ -0,0 +1,287 @@
+# benchmarks/mock_azure.py
+
+"""
+mock_azure.py
+부하/성능 테스트용 로컬 Azure OpenAI 대역 서버
+- langchain_openai(AzureChatOpenAI / AzureOpenAIEmbeddings)가 호출하는
+  chat completions / embeddings 엔드포인트만 구현
+- 임베딩: 입력 텍스트 해시를 시드로 만든 단위 벡터 (같은 텍스트 → 같은 벡터, 프로세스/실행과 무관)
+- 의도 분류 프롬프트: 분류 스크립트(정규식 → 의도 JSON)로 응답, 그 외에는 고정 형식 답변
+- 응답 지연(latency + jitter), 429(Retry-After) 비율, 스트리밍(SSE) 청크 간격을 설정으로 주입
+- GET /mock/stats: 처리한 요청 / 429 응답 수
+
+실행: python -m benchmarks.mock_azure --port 8900 --latency-ms 300 --jitter-ms 100 --rate-limit 0.05
+API 서버는 AOAI_ENDPOINT=http://127.0.0.1:8900, AOAI_API_KEY=mock, EMBED_CHECK_CTX_LENGTH=0 으로 연결합니다.
+테스트에서는 MockAzureServer 로 같은 프로세스의 스레드에서 실행할 수 있습니다.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import re
+import threading
+import time as _time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMBED_DIM = 1536
+CLASSIFY_MARKER = "사용자 의도를 분류"
+DEFAULT_REPLY = "모의 응답입니다. 사내 포털에서 자세한 내용을 확인해 주세요."
+# RAG 프롬프트의 컨텍스트 항목 ("[1] 문서 내용")
+_CONTEXT_ITEM = re.compile(r"^\[(\d+)\] ", re.M)
+_QUESTION = re.compile(r'사용자 질문: "(.*?)" ->', re.S)
+
+# 의도 분류 스크립트: 위에서부터 pattern(정규식)이 질문에 포함되면 해당 의도 JSON 반환, 없으면 general_qa
+DEFAULT_CLASSIFIER_SCRIPT: List[Dict[str, Any]] = [
+    {"pattern": r"^(안녕|안녕하세요|하이|반가워|hi|hello)\W*$", "intent": "greeting"},
+    {"pattern": r"비밀번호|패스워드|비번", "intent": "direct_tool", "arguments": {"tool_name": "tool_reset_password"}},
+    {"pattern": r"아이디|계정", "intent": "direct_tool", "arguments": {"tool_name": "tool_request_id"}},
+    {"pattern": r"담당자", "intent": "direct_tool", "arguments": {"tool_name": "tool_owner_lookup"}},
+]
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 0.0                    # 요청당 기본 지연
+    jitter_ms: float = 0.0                     # 지연 편차 (±jitter_ms 균등 분포)
+    embed_latency_ms: Optional[float] = None   # 임베딩 전용 지연 (None 이면 latency_ms)
+    rate_limit: float = 0.0                    # 429 응답 비율 (0~1)
+    retry_after_ms: int = 100                  # 429 응답의 retry-after-ms
+    stream_chunk_ms: float = 0.0               # 스트리밍 청크 간격
+    embed_dim: int = EMBED_DIM
+    seed: int = 0                              # 지연 편차 / 429 발생 난수 시드
+    classifier_script: List[Dict[str, Any]] = field(default_factory=lambda: list(DEFAULT_CLASSIFIER_SCRIPT))
+
+
+def embed_text(text: Any, dim: int = EMBED_DIM) -> np.ndarray:
+    """텍스트(또는 토큰 배열) 해시를 시드로 한 결정적 단위 벡터"""
+    data = text if isinstance(text, str) else json.dumps(text)
+    rng = np.random.default_rng(zlib.crc32(data.encode("utf-8")))
+    vec = rng.standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+def classify(question: str, script: List[Dict[str, Any]]) -> Dict[str, Any]:
+    for rule in script:
+        if re.search(rule["pattern"], question.strip(), re.I):
+            return {"intent": rule["intent"], "arguments": dict(rule.get("arguments", {}))}
+    return {"intent": "general_qa", "arguments": {}}
+
+
+def _reply(messages: List[Dict[str, Any]], config: MockConfig) -> str:
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+    if CLASSIFY_MARKER in prompt:
+        questions = _QUESTION.findall(prompt)
+        return json.dumps(classify(questions[-1] if questions else "", config.classifier_script), ensure_ascii=False)
+    contexts = _CONTEXT_ITEM.findall(prompt)
+    if contexts:
+        return f"참고 문서 {len(contexts)}건을 바탕으로 한 모의 응답입니다. 정확한 정책은 사내 포털에서 확인 필요"
+    return DEFAULT_REPLY
+
+
+def _chunks(text: str) -> Iterator[str]:
+    """공백 단위로 나눈 스트리밍 청크 (공백은 다음 청크 앞에 붙임)"""
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        yield word if i == 0 else " " + word
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    config = config or MockConfig()
+    app = FastAPI(title="Mock Azure OpenAI")
+    rng = random.Random(config.seed)
+    lock = threading.Lock()
+    stats = {"chat": 0, "embeddings": 0, "streams": 0, "throttled": 0}
+
+    def count(key: str) -> None:
+        with lock:
+            stats[key] += 1
+
+    async def delay(base_ms: float) -> None:
+        with lock:
+            jitter = rng.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0.0
+        wait = max(0.0, base_ms + jitter) / 1000.0
+        if wait:
+            await asyncio.sleep(wait)
+
+    def throttled() -> Optional[JSONResponse]:
+        if not config.rate_limit:
+            return None
+        with lock:
+            hit = rng.random() < config.rate_limit
+        if not hit:
+            return None
+        count("throttled")
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after-ms": str(config.retry_after_ms), "Retry-After": str(math.ceil(config.retry_after_ms / 1000))},
+            content={"error": {"code": "429", "message": "Requests have exceeded the mock rate limit. Please retry later."}},
+        )
+
+    @app.get("/mock/stats")
+    def mock_stats():
+        with lock:
+            return dict(stats)
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, body: Dict[str, Any] = Body(...)):
+        await delay(config.latency_ms)
+        limited = throttled()
+        if limited is not None:
+            return limited
+        count("chat")
+        messages = body.get("messages", [])
+        content = _reply(messages, config)
+        prompt_tokens = sum(_count_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = _count_tokens(content)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(_time.time())
+        if body.get("stream"):
+            count("streams")
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                _stream(completion_id, created, deployment, content, usage if include_usage else None, config.stream_chunk_ms),
+                media_type="text/event-stream",
+            )
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": deployment,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    @app.post("/openai/deployments/{deployment}/embeddings")
+    async def embeddings(deployment: str, body: Dict[str, Any] = Body(...)):
+        await delay(config.latency_ms if config.embed_latency_ms is None else config.embed_latency_ms)
+        limited = throttled()
+        if limited is not None:
+            return limited
+        count("embeddings")
+        inputs = body.get("input", [])
+        # 단일 문자열 / 단일 토큰 배열도 목록으로 처리
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        dim = int(body.get("dimensions") or config.embed_dim)
+        base64_encoded = body.get("encoding_format") == "base64"
+        data = []
+        for i, item in enumerate(inputs):
+            vec = embed_text(item, dim)
+            embedding = base64.b64encode(vec.astype("<f4").tobytes()).decode("ascii") if base64_encoded else vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(_count_tokens(x) if isinstance(x, str) else len(x) for x in inputs)
+        return {"object": "list", "data": data, "model": deployment, "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+    return app
+
+
+async def _stream(completion_id: str, created: int, model: str, content: str, usage: Optional[Dict[str, int]], chunk_ms: float):
+    """chat.completion.chunk SSE (역할 → 내용 청크 → 종료 → [usage] → [DONE])"""
+    def event(choices: List[Dict[str, Any]], **extra: Any) -> str:
+        chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model, "choices": choices, **extra}
+        return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+    yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+    for piece in _chunks(content):
+        if chunk_ms:
+            await asyncio.sleep(chunk_ms / 1000.0)
+        yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+    yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if usage is not None:
+        yield event([], usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+# =============================================================
+# 테스트용: 같은 프로세스의 스레드에서 실행
+# =============================================================
+class MockAzureServer:
+    """
+    with MockAzureServer(MockConfig(latency_ms=50)) as server:
+        os.environ["AOAI_ENDPOINT"] = server.url
+    빈 포트를 자동으로 할당하고, with 블록을 벗어나면 종료합니다.
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockAzureServer":
+        self._server = uvicorn.Server(uvicorn.Config(create_app(self.config), host=self.host, port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="mock-azure", daemon=True)
+        self._thread.start()
+        deadline = _time.monotonic() + 10
+        while not self._server.started:
+            if not self._thread.is_alive() or _time.monotonic() > deadline:
+                raise RuntimeError("mock Azure 서버를 시작하지 못했습니다.")
+            _time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+
+    def __enter__(self) -> "MockAzureServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="로컬 Azure OpenAI 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="요청마다 주입할 응답 지연(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="응답 지연 편차(±ms)")
+    parser.add_argument("--embed-latency-ms", type=float, help="임베딩 전용 응답 지연(ms), 생략 시 --latency-ms")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--retry-after-ms", type=int, default=100, help="429 응답의 retry-after-ms")
+    parser.add_argument("--stream-chunk-ms", type=float, default=0.0, help="스트리밍 청크 간격(ms)")
+    parser.add_argument("--embed-dim", type=int, default=EMBED_DIM)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--classifier-script", type=Path, help="의도 분류 스크립트 JSON ([{pattern, intent, arguments}, ...])")
+    args = parser.parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        embed_latency_ms=args.embed_latency_ms,
+        rate_limit=args.rate_limit,
+        retry_after_ms=args.retry_after_ms,
+        stream_chunk_ms=args.stream_chunk_ms,
+        embed_dim=args.embed_dim,
+        seed=args.seed,
+    )
+    if args.classifier_script:
+        config.classifier_script = json.loads(args.classifier_script.read_text(encoding="utf-8"))
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # platform_assistant/ui.py
 
 import os
+import json
 import streamlit as st
 import httpx
 import uuid
@@ -45,6 +46,52 @@ def format_source_name(source_name: str) -> str:
     base = os.path.basename(source_name or "")
     return os.path.splitext(base)[0] if base else "알 수 없음"
 
+# 스트리밍 중 노드 진행 상황 표시 문구
+NODE_LABELS = {
+    "classify": "질문 분석",
+    "direct_tool": "요청 처리",
+    "faq": "FAQ 검색",
+    "rag": "문서 검색 및 답변 생성",
+    "finalize": "답변 정리",
+}
+
+def stream_chat(message: str, session_id: str):
+    """/chat/stream SSE 응답을 (event, data) 단위로 반환"""
+    # 토큰 사이 대기는 읽기 타임아웃으로만 제한 (전체 응답 시간 제한 없음)
+    timeout = httpx.Timeout(60.0, connect=5.0)
+    with httpx.Client(timeout=timeout) as client:
+        with client.stream(
+            "POST",
+            f"{API_BASE_URL}/chat/stream",
+            json={"message": message, "session_id": session_id},
+        ) as resp:
+            resp.raise_for_status()
+            event = "message"
+            for line in resp.iter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    yield event, json.loads(line[len("data: "):])
+
+def render_sources(sources: list):
+    """참고 문서(중복 제거 + page 표시)"""
+    if not sources:
+        return
+    seen = set()
+    with st.expander("🔎 참고 자료"):
+        for s in sources:
+            raw_name = s.get("name") or s.get("source") or ""
+            key = (raw_name, s.get("page"))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            display = format_source_name(raw_name)
+            if s.get("page") is not None:
+                st.write(f"- {display}, page {int(s['page']) + 1}")
+            else:
+                st.write(f"- {display}")
+
 # [checklist: 10] 서비스 개발 및 패키징 (Streamlit을 활용한 UI 개발)
 # Streamlit을 사용하여 사용자 친화적인 웹 인터페이스를 구축함
 # # =============================================================
@@ -143,12 +190,24 @@ def main():
                 )
             if resp.status_code == 200 and resp.json().get("ok"):
                 msgs = resp.json().get("messages", [])
+                # "이전 기록 더 보기"로 불러온 과거 페이지 (before_id 커서 기반)
+                older = st.session_state.setdefault("history_older", [])
+                cursor = st.session_state.get("history_cursor") if older else resp.json().get("next_before_id")
                 if not msgs:
                     st.info("저장된 대화가 없습니다.")
                 else:
-                    for m in msgs:
+                    for m in msgs + older:
                         role = "🧑 사용자" if m["role"] == "user" else "🤖 어시스턴트"
                         st.write(f"{role}: {m['message']}  \n🕒 {m['created_at']}")
+                if cursor and st.button("이전 기록 더 보기", use_container_width=True):
+                    with httpx.Client(timeout=10.0) as client:
+                        page = client.get(
+                            f"{API_BASE_URL}/history",
+                            params={"session_id": st.session_state["thread_id"], "limit": 10, "before_id": cursor},
+                        ).json()
+                    older.extend(page.get("messages", []))
+                    st.session_state["history_cursor"] = page.get("next_before_id")
+                    st.rerun()
             else:
                 st.warning("대화 기록을 불러오지 못했습니다.")
         except Exception as e:
@@ -171,47 +230,33 @@ def main():
             st.markdown(q)
 
         with st.chat_message("assistant"):
-            with st.spinner("처리 중..."):
-                if not api_is_healthy:
-                    st.error("API 서버가 오프라인입니다.")
-                else:
-                    try:
-                        with httpx.Client(timeout=30.0) as client:
-                            resp = client.post(
-                                f"{API_BASE_URL}/chat",
-                                json={
-                                    "message": q,
-                                    "session_id": st.session_state["thread_id"],
-                                },
-                            )
-                        if resp.status_code == 200:
-                            data = resp.json()
-                            reply = data.get("reply", "")
-                            sources = data.get("sources", [])
-
-                            st.markdown(reply)
-                            st.session_state.chat.append(("assistant", reply))
-
-                            # 참고 문서(중복 제거 + page 표시)
-                            if sources:
-                                seen = set()
-                                with st.expander("🔎 참고 자료"):
-                                    for s in sources:
-                                        raw_name = s.get("name") or s.get("source") or ""
-                                        key = (raw_name, s.get("page"))
-                                        if key in seen:
-                                            continue
-                                        seen.add(key)
-
-                                        display = format_source_name(raw_name)
-                                        if s.get("page") is not None:
-                                            st.write(f"- {display}, page {int(s['page']) + 1}")
-                                        else:
-                                            st.write(f"- {display}")
-                        else:
-                            st.error(f"API 호출 실패 (status={resp.status_code})")
-                    except Exception as e:
-                        st.error(f"API 요청 중 오류 발생: {e}")
+            if not api_is_healthy:
+                st.error("API 서버가 오프라인입니다.")
+            else:
+                # /chat/stream: 토큰이 도착하는 대로 답변을 갱신
+                placeholder = st.empty()
+                placeholder.markdown("⏳ 처리 중...")
+                text, data = "", {}
+                try:
+                    for event, payload in stream_chat(q, st.session_state["thread_id"]):
+                        if event == "token":
+                            text += payload.get("text", "")
+                            placeholder.markdown(text + "▌")
+                        elif event == "node" and not text:
+                            label = NODE_LABELS.get(payload.get("node"), payload.get("node"))
+                            placeholder.markdown(f"⏳ {label} 중...")
+                        elif event == "final":
+                            data = payload
+                    reply = data.get("reply", text)
+                    placeholder.markdown(reply)
+                    st.session_state.chat.append(("assistant", reply))
+                    render_sources(data.get("sources", []))
+                except httpx.HTTPStatusError as e:
+                    placeholder.empty()
+                    st.error(f"API 호출 실패 (status={e.response.status_code})")
+                except Exception as e:
+                    placeholder.empty()
+                    st.error(f"API 요청 중 오류 발생: {e}")
 
 # =============================================================
 # 실행 엔트리포인트
@@ -2,23 +2,33 @@
 """
 platform_service 패키지 초기화
 외부에서 core 기능을 바로 import 할 수 있도록 re-export
+core 는 import 시 클라이언트 풀 / 체크포인트 DB / 로깅 핸들러를 만들므로 처음 접근할 때 불러옵니다.
+(문서 파싱 spawn 워커처럼 하위 모듈만 쓰는 프로세스가 core 를 import 하지 않도록)
 """
 
-from .core import (
-    pipeline,
-    build_or_load_vectorstore,
-    AZURE_AVAILABLE,
-)
-
 from . import constants
 
-# 로깅 설정 초기화
-from .logging_config import setup_logging
-setup_logging()
-
-__all__ = [
+_CORE_EXPORTS = (
     "pipeline",
+    "apipeline",
+    "stream_pipeline",
+    "astream_pipeline",
+    "search_params",
     "build_or_load_vectorstore",
+    "current_generation",
+    "response_cache_stats",
+    "intent_classifier_stats",
+    "client_registry_stats",
+    "close_clients",
     "AZURE_AVAILABLE",
-    "constants",
-]
\ No newline at end of file
+)
+
+
+def __getattr__(name):
+    if name in _CORE_EXPORTS:
+        from . import core
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [*_CORE_EXPORTS, "constants"]
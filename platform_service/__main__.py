@@ -0,0 +1,10 @@
+# platform_service/__main__.py
+
+"""
+API 서버 실행: python -m platform_service --port 8001
+spawn 방식 하위 프로세스(문서 파싱 워커)는 '__main__' 패키지 모듈을 다시 import 하지 않으므로,
+python -m platform_service.api 와 달리 워커마다 api / core 가 다시 로드되지 않습니다.
+"""
+from platform_service.api import main
+
+main()
@@ -0,0 +1,130 @@
+# platform_service/ann.py
+
+"""
+ann.py
+검색용 ANN(근사 최근접 이웃) 인덱스 팩토리 모듈
+- Sync용 마스터 인덱스(Flat, 삭제 지원)는 그대로 두고, 세대마다 검색 전용 인덱스(serve.faiss)를 별도로 생성
+- 지원 유형: flat / hnsw / ivf_flat / ivf_pq (샘플 학습 + 파라미터를 index_params.json에 저장)
+- 요청별 nprobe / efSearch 조정 지원
+"""
+import copy
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger(__name__)
+
+SERVE_INDEX_NAME = "serve.faiss"
+PARAMS_NAME = "index_params.json"
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+# PQ 코드북(8bit) 학습에 필요한 최소 벡터 수
+_PQ_MIN_TRAIN = 256
+
+
+def _factory_string(index_type: str, dim: int, n: int, opts: Dict[str, Any]) -> Optional[str]:
+    """인덱스 유형과 코퍼스 크기에 맞는 faiss index_factory 문자열 (학습 불가능하면 None)"""
+    if index_type == "hnsw":
+        return f"HNSW{opts['hnsw_m']}"
+    # nlist 기본값: 4*sqrt(n), 클러스터당 최소 39개 학습 벡터 확보
+    nlist = opts.get("nlist") or int(4 * math.sqrt(n))
+    nlist = max(1, min(nlist, n // 39))
+    opts["nlist"] = nlist
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_pq":
+        m = opts["pq_m"]
+        if dim % m != 0 or n < _PQ_MIN_TRAIN:
+            return None
+        return f"IVF{nlist},PQ{m}"
+    return None
+
+
+def build_serving_index(gen_path: Path, master: Any, index_type: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    마스터 인덱스의 벡터로 검색용 ANN 인덱스를 만들어 serve.faiss 로 저장합니다.
+    벡터는 같은 순서로 추가되므로 FAISS 위치 → docstore 매핑은 마스터와 동일합니다.
+    flat 이거나 코퍼스가 학습하기에 너무 작으면 마스터 인덱스를 그대로 사용합니다.
+    """
+    n, dim = master.ntotal, master.d
+    params: Dict[str, Any] = {"requested": index_type, "type": "flat", "ntotal": n, "dim": dim}
+    factory = _factory_string(index_type, dim, n, opts) if index_type != "flat" and n > 0 else None
+    if index_type != "flat" and factory is None:
+        logger.warning(f"벡터 수({n})가 '{index_type}' 학습에 부족하여 Flat 인덱스를 사용합니다.")
+    if factory is not None:
+        vectors = master.reconstruct_n(0, n)
+        index = faiss.index_factory(dim, factory)
+        if index_type == "hnsw":
+            index.hnsw.efConstruction = opts["ef_construction"]
+        if not index.is_trained:
+            # 학습용 샘플 (전체가 샘플보다 작으면 전체 사용)
+            rng = np.random.default_rng(0)
+            size = min(n, opts["train_sample"])
+            sample = vectors[rng.choice(n, size=size, replace=False)] if size < n else vectors
+            index.train(sample)
+        index.add(vectors)
+        faiss.write_index(index, str(gen_path / SERVE_INDEX_NAME))
+        params.update({"type": index_type, "factory": factory, "nlist": opts.get("nlist"), "pq_m": opts.get("pq_m"),
+                       "hnsw_m": opts.get("hnsw_m"), "ef_construction": opts.get("ef_construction")})
+    with open(gen_path / PARAMS_NAME, "w", encoding="utf-8") as f:
+        json.dump(params, f)
+    logger.info("serving_index_built", extra={"extra_data": params})
+    return params
+
+
+def load_params(gen_path: Path) -> Dict[str, Any]:
+    try:
+        with open(gen_path / PARAMS_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"type": "flat"}
+
+
+def has_serving_index(gen_path: Path) -> bool:
+    return (gen_path / SERVE_INDEX_NAME).exists()
+
+
+# =============================================================
+# 요청별 검색 파라미터 (nprobe / efSearch)
+# =============================================================
+class _ParamIndex:
+    """index.search 호출에 SearchParameters 를 주입하는 얇은 프록시 (원본 인덱스는 공유, 상태 변경 없음)"""
+
+    def __init__(self, index: Any, params: Any):
+        self._index = index
+        self._params = params
+
+    def search(self, x, k, *args, **kwargs):
+        kwargs.setdefault("params", self._params)
+        return self._index.search(x, k, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+
+def search_parameters(index: Any, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """인덱스 유형에 맞는 faiss SearchParameters (해당 없으면 None)"""
+    if ef_search and isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=ef_search)
+    if nprobe and faiss.try_extract_index_ivf(index) is not None:
+        return faiss.SearchParametersIVF(nprobe=nprobe)
+    return None
+
+
+def with_search_params(vs: FAISS, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> FAISS:
+    """
+    nprobe/efSearch 를 적용한 벡터스토어 뷰를 반환합니다.
+    전역 인덱스 속성을 바꾸지 않으므로 동시 요청마다 다른 값을 사용해도 안전합니다.
+    """
+    params = search_parameters(vs.index, nprobe, ef_search)
+    if params is None:
+        return vs
+    view = copy.copy(vs)
+    view.index = _ParamIndex(vs.index, params)
+    return view
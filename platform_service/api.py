@@ -1,19 +1,23 @@
 # platform_service/api.py
 
 import os
+import json
 import uvicorn
 import time as _time
 import contextlib
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from fastapi import FastAPI, Body, Request, UploadFile, File
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from platform_service import pipeline, build_or_load_vectorstore, AZURE_AVAILABLE, constants
-from platform_service.db.history import init_db, save_message, load_messages 
+from platform_service import apipeline, astream_pipeline, search_params, build_or_load_vectorstore, current_generation, response_cache_stats, intent_classifier_stats, client_registry_stats, close_clients, AZURE_AVAILABLE, constants
+from platform_service.db.history import init_db, close_db, save_message, load_messages, search_messages
+from platform_service.logging_config import dropped_log_count
+from platform_service import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +43,8 @@ async def lifespan(api: FastAPI):
         logger.error(f"Failed to initialize vectorstore: {e}")
     yield
     logger.info("Application shutting down.")
+    await close_clients()  # Azure OpenAI 공용 커넥션 풀 정리
+    close_db()             # 대기 중인 대화 기록 저장 후 writer 종료
 
 api = FastAPI(
     title="Service Desk Assistant API",
@@ -49,21 +55,29 @@ api = FastAPI(
 
 # =============================================================
 # 2. server/middleware.py (Middleware 정의)
-# - 요청/응답/에러 로깅
+# - 요청/응답/에러 로깅, 요청 처리 시간 메트릭
 # =============================================================
+def _route_path(request: Request) -> str:
+    # 메트릭 라벨 수가 늘어나지 않도록 실제 URL 대신 라우트 경로 사용
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
 class AuditMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         start = _time.time()
  
         try:
             response = await call_next(request)
-            dur = round((_time.time() - start) * 1000)
+            elapsed = _time.time() - start
+            dur = round(elapsed * 1000)
             logger.info(
                 "api_response",
                 extra={"extra_data": {"status": response.status_code, "ms": dur}}
             )
+            metrics.HTTP_LATENCY.observe(elapsed, method=request.method, path=_route_path(request), status=response.status_code)
             return response
         except Exception as e:
+            metrics.HTTP_LATENCY.observe(_time.time() - start, method=request.method, path=_route_path(request), status=500)
             logger.exception("api_error", extra={"extra_data": {"error": str(e)}})
             raise
 
@@ -77,6 +91,9 @@ api.add_middleware(AuditMiddleware)
 class ChatIn(BaseModel):
     message: str
     session_id: str
+    # 요청별 ANN 검색 파라미터 (생략 시 INDEX_NPROBE / INDEX_EF_SEARCH). 해당 인덱스 종류에만 적용
+    nprobe: Optional[int] = Field(default=None, ge=1, le=4096)
+    ef_search: Optional[int] = Field(default=None, ge=1, le=4096)
 
 class ChatOut(BaseModel):
     reply: str
@@ -88,8 +105,10 @@ def health():
     return {"ok": True}
 
 @api.post("/chat", response_model=ChatOut)
-def chat(payload: ChatIn = Body(...)):
-    out = pipeline(payload.message, payload.session_id)
+async def chat(payload: ChatIn = Body(...)):
+    # 이벤트 루프에서 비동기 파이프라인 실행 (요청당 스레드 점유 없음)
+    out = await apipeline(payload.message, payload.session_id, search_params(payload.nprobe, payload.ef_search))
+    # 대화 기록은 writer 큐에 넣기만 하고 커밋은 백그라운드 writer가 모아서 수행
     save_message(payload.session_id, "user", payload.message)
     save_message(payload.session_id, "assistant", out.get("reply", ""))
     return ChatOut(
@@ -98,10 +117,53 @@ def chat(payload: ChatIn = Body(...)):
         sources=out.get("sources", [])
     )
 
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@api.post("/chat/stream")
+async def chat_stream(payload: ChatIn = Body(...)):
+    """
+    /chat 의 SSE 버전: 노드 진행(node), 답변 토큰(token), 최종 결과(final, sources 포함)를 순서대로 전송합니다.
+    """
+    async def events():
+        final = {}
+        async for ev in astream_pipeline(payload.message, payload.session_id, search_params(payload.nprobe, payload.ef_search)):
+            if ev["event"] == "final":
+                final = ev["data"]
+            yield _sse(ev["event"], ev["data"])
+        # 모든 이벤트 전송 후 대화 기록 저장 (백그라운드 writer 큐)
+        save_message(payload.session_id, "user", payload.message)
+        save_message(payload.session_id, "assistant", final.get("reply", ""))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # 프록시(nginx 등) 버퍼링 없이 바로 전달
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @api.get("/history")
-def get_history(session_id: str, limit: int = 20):
-    msgs = load_messages(session_id, limit)
-    return {"ok": True, "messages": msgs}
+def get_history(session_id: str, limit: int = 20, before_id: Optional[int] = None):
+    """
+    세션 대화 기록을 최신순으로 반환합니다.
+    다음(더 오래된) 페이지는 응답의 next_before_id를 before_id로 넘겨 조회합니다.
+    """
+    msgs = load_messages(session_id, limit, before_id)
+    next_before_id = msgs[-1]["id"] if len(msgs) == limit and msgs else None
+    return {"ok": True, "messages": msgs, "next_before_id": next_before_id}
+
+@api.get("/history/search")
+def search_history(q: str, limit: int = 20, offset: int = 0, session_id: Optional[str] = None):
+    """
+    전체(또는 특정 세션) 대화 기록을 키워드로 검색합니다 (관련도 순).
+    다음 페이지는 응답의 next_offset을 offset으로 넘겨 조회합니다.
+    """
+    if not q.strip():
+        return {"ok": False, "message": "검색어를 입력해 주세요."}
+    results = search_messages(q, limit, offset, session_id)
+    next_offset = offset + len(results) if len(results) == limit else None
+    return {"ok": True, "results": results, "next_offset": next_offset}
 
 @api.post("/sync")
 def sync_index():
@@ -109,7 +171,7 @@ def sync_index():
         return {"ok": False, "message": "Azure 설정 없음"}
     try:
         build_or_load_vectorstore()
-        return {"ok": True, "message": "인덱스 재생성 완료"}
+        return {"ok": True, "message": "인덱스 재생성 완료", "generation": current_generation()}
     except Exception as e:
         return {"ok": False, "message": str(e)}
 
@@ -118,8 +180,18 @@ def status():
     return {
         "ok": True,
         "azure_available": AZURE_AVAILABLE,
+        "index_generation": current_generation(),
+        "response_cache": response_cache_stats(),
+        "intent_classifier": intent_classifier_stats(),
+        "clients": client_registry_stats(),
+        "dropped_logs": dropped_log_count(),
     }
 
+@api.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus 수집용 메트릭 (노드/검색/임베딩/LLM 지연 시간, 토큰 수, 의도별 분류 수, 캐시 적중)"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @api.post("/upload")
 async def upload_files(files: List[UploadFile] = File(...)):
     """업로드된 문서를 kb_data 디렉토리에 저장"""
@@ -135,7 +207,7 @@ async def upload_files(files: List[UploadFile] = File(...)):
 # =============================================================
 # 4. 실행 엔트리포인트 - main.py 
 # =============================================================
-if __name__ == "__main__":
+def main():
     import argparse
     default_host = os.getenv("API_SERVER_HOST", "0.0.0.0")
     default_port = int(os.getenv("API_PORT", 8000))
@@ -146,3 +218,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     uvicorn.run(api, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
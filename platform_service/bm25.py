@@ -0,0 +1,222 @@
+# platform_service/bm25.py
+
+"""
+bm25.py
+청크 토큰 기반 BM25 역색인 및 하이브리드(BM25 + 벡터) 검색 모듈
+- Sync 시 FAISS 인덱스와 같은 세대 디렉토리에 역색인(bm25.json)을 함께 저장
+- 문서 번호는 FAISS 위치와 동일하므로 pickle / mmap docstore 모두에서 그대로 조회 가능
+- 변경되지 않은 청크는 이전 세대의 토큰 빈도를 재사용 (형태소 분석 재실행 없음)
+- 역색인을 만든 형태소 분석기 이름(kiwi / okt)을 함께 저장 (분석기가 바뀌면 재사용하지 않음)
+- 알려진 제한: bm25.json 은 워커마다 전체를 파싱하여 힙에 올리므로 mmap 인덱스(INDEX_MMAP=1)와 달리 워커 간에 공유되지 않음
+- 벡터 검색 결과와 Reciprocal Rank Fusion(RRF)으로 결합하며,
+  에러 코드 등 정확한 용어가 BM25에서 일치하면 임베딩 호출 없이 바로 반환
+"""
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+BM25_NAME = "bm25.json"
+BM25_VERSION = 1
+
+# 영문/숫자 토큰 (VPN, SSO, ERR-1001, HR001 등)
+_ASCII_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+# =============================================================
+# 토큰화
+# =============================================================
+def ascii_tokens(text: str) -> List[str]:
+    return [t for t in _ASCII_TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def code_tokens(text: str) -> List[str]:
+    """에러 코드/화면 코드처럼 숫자를 포함한 정확 일치 대상 토큰"""
+    return [t for t in ascii_tokens(text) if any(c.isdigit() for c in t)]
+
+
+def tokenize(text: str, analyzer: Any) -> List[str]:
+    """
+    형태소 분석기(get_okt())의 어구(phrases) + 영문/숫자 토큰으로 색인어를 만듭니다.
+    phrases(Okt / Kiwi 모두)는 '인사시스템 사용자관리' 같은 복합 명사를 전체/부분 어구로 함께 반환하므로
+    한국어 복합 명사의 부분 일치 재현율이 올라갑니다.
+    """
+    lowered = text.lower()
+    terms = [p for p in analyzer.phrases(lowered) if len(p) > 1]
+    return terms + ascii_tokens(lowered)
+
+
+# =============================================================
+# BM25 역색인
+# =============================================================
+class BM25Index:
+    """
+    Okapi BM25 역색인
+    {"version": 1, "analyzer": 형태소 분석기, "ids": [청크ID], "lens": [문서 길이], "postings": {용어: [[문서번호, tf], ...]}}
+    analyzer 항목이 없는 기존 역색인은 Okt로 만든 것으로 간주합니다.
+    """
+
+    def __init__(self, ids: List[str], lens: List[int], postings: Dict[str, List[List[int]]],
+                 k1: float = 1.5, b: float = 0.75, analyzer: str = "okt"):
+        self.ids = ids
+        self.lens = lens
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer
+        self.avgdl = (sum(lens) / len(lens)) if lens else 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[str, str]], tokenizer: Callable[[str], List[str]],
+              previous: Optional["BM25Index"] = None, analyzer: str = "okt") -> "BM25Index":
+        """
+        (청크 ID, 텍스트)를 FAISS 위치 순서대로 받아 역색인을 만듭니다.
+        이전 세대에 같은 청크 ID가 있으면 저장된 토큰 빈도를 재사용합니다 (같은 형태소 분석기로 만든 경우만).
+        """
+        same_analyzer = previous is not None and previous.analyzer == analyzer
+        reuse = previous.term_frequencies() if same_analyzer else {}
+        ids: List[str] = []
+        lens: List[int] = []
+        postings: Dict[str, List[List[int]]] = defaultdict(list)
+        reused = 0
+        for pos, (cid, text) in enumerate(docs):
+            tf = reuse.get(cid)
+            if tf is None:
+                tf = Counter(tokenizer(text))
+            else:
+                reused += 1
+            ids.append(cid)
+            lens.append(sum(tf.values()))
+            for term, count in tf.items():
+                postings[term].append([pos, count])
+        logger.info("bm25_index_built", extra={"extra_data": {"docs": len(ids), "terms": len(postings), "reused": reused}})
+        return cls(ids, lens, dict(postings), analyzer=analyzer)
+
+    def term_frequencies(self) -> Dict[str, Dict[str, int]]:
+        """역색인을 청크별 {용어: tf} 로 되돌립니다 (증분 재구축용)."""
+        forward: Dict[str, Dict[str, int]] = {cid: {} for cid in self.ids}
+        for term, plist in self.postings.items():
+            for pos, tf in plist:
+                forward[self.ids[pos]][term] = tf
+        return forward
+
+    @classmethod
+    def load(cls, gen_path: Path) -> Optional["BM25Index"]:
+        try:
+            with open(gen_path / BM25_NAME, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        if data.get("version") != BM25_VERSION:
+            logger.warning(f"BM25 인덱스 버전 불일치로 무시합니다: {gen_path}")
+            return None
+        return cls(data["ids"], data["lens"], data["postings"], analyzer=data.get("analyzer", "okt"))
+
+    def save(self, gen_path: Path) -> None:
+        path = gen_path / BM25_NAME
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": BM25_VERSION, "analyzer": self.analyzer, "ids": self.ids, "lens": self.lens, "postings": self.postings},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _idf(self, df: int) -> float:
+        n = len(self.ids)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, terms: Sequence[str], k: int) -> List[Tuple[int, float]]:
+        """질의 용어로 상위 k개 (문서 번호, 점수)를 반환합니다."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self._idf(len(plist))
+            for pos, tf in plist:
+                norm = self.k1 * (1.0 - self.b + self.b * self.lens[pos] / self.avgdl)
+                scores[pos] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def positions_with(self, terms: Iterable[str]) -> set:
+        """주어진 용어 중 하나라도 포함한 문서 번호 집합"""
+        return {pos for term in terms for pos, _ in self.postings.get(term, [])}
+
+
+# =============================================================
+# Reciprocal Rank Fusion & 하이브리드 retriever
+# =============================================================
+def _doc_key(doc: Document) -> str:
+    return doc.id or doc.page_content
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], k: int = 60) -> List[Document]:
+    """여러 검색 결과 순위를 RRF 점수(Σ 1 / (k + rank))로 결합합니다."""
+    scores: Dict[str, float] = defaultdict(float)
+    docs: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _doc_key(doc)
+            scores[key] += 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 + 벡터 검색 retriever
+    - BM25 역색인이 없으면 벡터 검색만 수행
+    - 질의의 코드성 토큰(ERR-1001 등)이 BM25 1위 문서에 있으면 임베딩 없이 BM25 결과를 반환
+    - 그 외에는 두 결과를 RRF로 결합
+    """
+
+    vectorstore: Any
+    index: Optional[BM25Index] = None
+    tokenizer: Callable[[str], List[str]]
+    k: int = 4
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    def _document(self, pos: int) -> Document:
+        vs = self.vectorstore
+        return vs.docstore.search(vs.index_to_docstore_id[pos])
+
+    def _sparse(self, query: str) -> Tuple[List[Tuple[int, float]], bool]:
+        """BM25 검색 결과와 정확 일치(벡터 검색 생략) 여부"""
+        hits = self.index.search(self.tokenizer(query), self.fetch_k)
+        codes = code_tokens(query)
+        return hits, bool(hits and codes and hits[0][0] in self.index.positions_with(codes))
+
+    def _fuse(self, dense: List[Document], hits: List[Tuple[int, float]]) -> List[Document]:
+        sparse = [self._document(pos) for pos, _ in hits]
+        return reciprocal_rank_fusion([dense, sparse], k=self.rrf_k)[:self.k]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if self.index is None or len(self.index) == 0:
+            return self.vectorstore.similarity_search(query, k=self.k)
+        hits, exact = self._sparse(query)
+        if exact:
+            return [self._document(pos) for pos, _ in hits[:self.k]]
+        return self._fuse(self.vectorstore.similarity_search(query, k=self.fetch_k), hits)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        # BM25 는 메모리 내 계산이므로 그대로 수행하고, 질의 임베딩만 비동기로 요청
+        if self.index is None or len(self.index) == 0:
+            return await self.vectorstore.asimilarity_search(query, k=self.k)
+        hits, exact = self._sparse(query)
+        if exact:
+            return [self._document(pos) for pos, _ in hits[:self.k]]
+        return self._fuse(await self.vectorstore.asimilarity_search(query, k=self.fetch_k), hits)
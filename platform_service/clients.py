@@ -0,0 +1,114 @@
+# platform_service/clients.py
+
+"""
+clients.py
+Azure OpenAI LLM / 임베딩 클라이언트 레지스트리
+- (종류, 배포명, temperature) 별로 클라이언트 인스턴스를 한 번만 만들고 재사용
+- 모든 클라이언트가 프로세스 공용 httpx 커넥션 풀(keep-alive)을 공유하므로
+  요청마다 TCP/TLS 연결을 새로 맺지 않음
+- h2 패키지가 설치되어 있으면 HTTP/2 사용 (pip install "httpx[http2]")
+- 풀 크기 / 타임아웃은 환경 변수로 조정 (core.py 참고)
+"""
+import importlib.util
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """
+    키별 클라이언트 캐시 + 공용 httpx.Client / httpx.AsyncClient (스레드 안전)
+    - max_connections / max_keepalive: 풀 전체 연결 수 / 유휴 상태로 유지할 연결 수
+    - keepalive_expiry: 유휴 연결 유지 시간(초)
+    - connect_timeout / read_timeout / pool_timeout: 연결 / 응답 대기 / 풀에서 연결을 얻기까지의 제한 시간(초)
+    - http2: True 여도 h2 패키지가 없으면 HTTP/1.1 로 동작
+    AsyncClient 는 처음 사용한 이벤트 루프에 연결이 묶이므로, 서버 프로세스당 하나의 루프를 전제로 합니다.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        pool_timeout: float = 10.0,
+        http2: bool = True,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout)
+        self.http2 = http2 and http2_available()
+        if http2 and not self.http2:
+            logger.info("h2 패키지가 없어 HTTP/1.1 keep-alive 로 동작합니다.")
+        # factory() 안에서 http_client()를 다시 호출하므로 재진입 가능한 락 사용
+        self._lock = threading.RLock()
+        self._clients: Dict[Hashable, Any] = {}
+        self._http: Optional[httpx.Client] = None
+        self._ahttp: Optional[httpx.AsyncClient] = None
+
+    # ---------------------------------------------------------
+    # 공용 HTTP 커넥션 풀
+    # ---------------------------------------------------------
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http is None:
+                self._http = httpx.Client(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            return self._http
+
+    def http_async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._ahttp is None:
+                self._ahttp = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            return self._ahttp
+
+    # ---------------------------------------------------------
+    # 키별 클라이언트
+    # ---------------------------------------------------------
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """key 에 해당하는 클라이언트를 반환하고, 없으면 factory()로 한 번만 생성합니다."""
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = factory()
+                self._clients[key] = client
+                logger.info("client_registered", extra={"extra_data": {"key": repr(key)}})
+            return client
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "http2": self.http2,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive": self.limits.max_keepalive_connections,
+            }
+
+    def close(self) -> None:
+        """동기 커넥션 풀을 닫고 등록된 클라이언트를 비웁니다 (서버 종료 시)."""
+        with self._lock:
+            http, self._http = self._http, None
+            self._clients.clear()
+        if http is not None:
+            http.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            ahttp, self._ahttp = self._ahttp, None
+        if ahttp is not None:
+            await ahttp.aclose()
+        self.close()
@@ -7,6 +7,7 @@ from pathlib import Path
 # KB_DATA_DIR = Path("./kb_data")
 # INDEX_DIR = Path("./index")
 # INDEX_NAME = "faiss_index"
+EMBED_CACHE_NAME = "embedding_cache"  # INDEX_DIR 하위 임베딩 디스크 캐시
 # 항상 프로젝트 루트를 기준으로 잡음
 BASE_DIR = Path(__file__).resolve().parents[1]
 KB_DATA_DIR = BASE_DIR / "kb_data"
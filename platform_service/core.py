@@ -3,29 +3,29 @@
 # Standard library imports
 import os
 import json
+import asyncio
 import logging
 import csv
 import time as _time
 import threading
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import TypedDict, List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator
 from pathlib import Path
 
 # Third-party imports
+import faiss
 from dotenv import load_dotenv
-from konlpy.tag import Okt
 
 # LangChain & LangGraph 관련 라이브러리
 from langchain_core.prompts import PromptTemplate
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
-from langchain_community.document_loaders import (
-    PyPDFLoader, CSVLoader, TextLoader, Docx2txtLoader
-)
 from langchain_community.vectorstores import FAISS
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 
 # LangSmith를 위한 CallbackManager 임포트 (python 버전 낮춰야해서 hold - 3.11)
 # from langchain.callbacks.manager import CallbackManager
@@ -33,8 +33,19 @@ from langgraph.graph import StateGraph, END
 
 # Local application imports
 from . import constants
+from . import ingest
+from . import index_store
+from . import ann
+from . import bm25
+from . import metrics
+from . import tokenizer
+from .response_cache import ResponseCache
+from .intent import LocalIntentClassifier, SEED_EXAMPLES
+from .embeddings import CachedEmbeddings, EmbeddingScheduler, get_embedding_cache
+from .clients import ClientRegistry
+from .db.checkpoint import SQLiteCheckpointSaver
 
-# 중앙 설정(logging_config.py)에서 세팅된 로거 불러오기
+# 중앙 설정(logging_config.py)에서 세팅된 로거 불러오기 (setup_logging 은 아래 환경 변수 로드 후 실행)
 logger = logging.getLogger(__name__)
 
 # =============================================================
@@ -42,6 +53,10 @@ logger = logging.getLogger(__name__)
 # =============================================================
 load_dotenv()
 
+# 로깅 설정 초기화 (.env 의 LOG_* 값을 반영하도록 load_dotenv 이후)
+from .logging_config import setup_logging
+setup_logging()
+
 # Azure OpenAI 환경변수
 AOAI_ENDPOINT = os.getenv("AOAI_ENDPOINT", "")
 AOAI_API_KEY = os.getenv("AOAI_API_KEY", "")
@@ -50,26 +65,113 @@ AOAI_DEPLOY_GPT4O_MINI = os.getenv("AOAI_DEPLOY_GPT4O_MINI", "gpt-4o-mini")
 AOAI_DEPLOY_GPT4O = os.getenv("AOAI_DEPLOY_GPT4O", "gpt-4o")
 AOAI_DEPLOY_EMBED_3_SMALL = os.getenv("AOAI_DEPLOY_EMBED_3_SMALL", "text-embedding-3-small")
 
+# 인덱싱 파이프라인 설정 (파일 파싱 프로세스 수, 임베딩 배치 크기)
+KB_LOAD_WORKERS = int(os.getenv("KB_LOAD_WORKERS", str(os.cpu_count() or 1)))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+# 임베딩 스케줄러 설정 (요청당 텍스트 수, 동시 요청 수, 분당 토큰 한도(0=제한 없음), 재시도 횟수)
+EMBED_REQUEST_BATCH_SIZE = int(os.getenv("EMBED_REQUEST_BATCH_SIZE", "64"))
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "4"))
+EMBED_TPM_LIMIT = int(os.getenv("EMBED_TPM_LIMIT", "0"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))
+# 대화 요청 경로의 질의 임베딩 재시도 (횟수, 최대 대기 초) - 대량 인덱싱보다 짧게 제한
+EMBED_QUERY_MAX_RETRIES = int(os.getenv("EMBED_QUERY_MAX_RETRIES", "2"))
+EMBED_QUERY_MAX_DELAY = float(os.getenv("EMBED_QUERY_MAX_DELAY", "2"))
+# 입력 길이 검사(tiktoken 토큰화) 여부. 0이면 텍스트를 그대로 전송 (tiktoken 인코딩 파일을 받을 수 없는 오프라인 환경용)
+EMBED_CHECK_CTX_LENGTH = os.getenv("EMBED_CHECK_CTX_LENGTH", "1") == "1"
+# 질의 임베딩 메모리 LRU 크기 (질의 임베딩은 디스크 캐시에 저장하지 않음)
+EMBED_QUERY_CACHE_SIZE = int(os.getenv("EMBED_QUERY_CACHE_SIZE", "4096"))
+
+# 읽기 전용 mmap 인덱스 모드 (멀티 워커 환경에서 인덱스 메모리 공유)
+INDEX_MMAP = os.getenv("INDEX_MMAP", "0") == "1"
+
+# 검색용 ANN 인덱스 설정 (flat / hnsw / ivf_flat / ivf_pq) 및 기본 검색 파라미터
+INDEX_TYPE = os.getenv("INDEX_TYPE", "flat").lower()
+INDEX_NLIST = int(os.getenv("INDEX_NLIST", "0"))             # 0이면 4*sqrt(N) 자동
+INDEX_PQ_M = int(os.getenv("INDEX_PQ_M", "32"))
+INDEX_HNSW_M = int(os.getenv("INDEX_HNSW_M", "32"))
+INDEX_EF_CONSTRUCTION = int(os.getenv("INDEX_EF_CONSTRUCTION", "200"))
+INDEX_TRAIN_SAMPLE = int(os.getenv("INDEX_TRAIN_SAMPLE", "100000"))
+INDEX_NPROBE = int(os.getenv("INDEX_NPROBE", "16"))
+INDEX_EF_SEARCH = int(os.getenv("INDEX_EF_SEARCH", "64"))
+
+# 하이브리드 검색 (BM25 + 벡터, RRF 결합)
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))  # RRF 결합 전 각 검색기의 후보 수
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# 응답 캐시 (run_graph_pipeline 앞단)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0"))  # 0이면 정확 일치만 사용
+# 로컬 의도 분류기 (node_classify LLM 호출 전 단계)
+INTENT_LOCAL_ENABLED = os.getenv("INTENT_LOCAL_ENABLED", "1") == "1"
+INTENT_CENTROID_THRESHOLD = float(os.getenv("INTENT_CENTROID_THRESHOLD", "0.6"))
+INTENT_CENTROID_MARGIN = float(os.getenv("INTENT_CENTROID_MARGIN", "0.08"))
+INTENT_MAX_FAQ_EXAMPLES = int(os.getenv("INTENT_MAX_FAQ_EXAMPLES", "200"))  # 중심 계산에 사용할 FAQ 질문 수
+# LangGraph 체크포인터 (sqlite: kb_data/checkpoints.db, memory: 프로세스 메모리)
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite").lower()
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10"))  # 세션별 유지할 최근 체크포인트 수
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", str(7 * 24 * 3600)))          # 유휴 세션 만료 시간(초), 0이면 만료 없음
+CHECKPOINT_SWEEP_INTERVAL = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL", "300"))
+# 추측(speculative) 검색: 의도 분류와 동시에 질문으로 문서 검색을 시작 (RAG로 가지 않으면 결과 폐기)
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "1") == "1"
+RESPONSE_CACHE_INTENTS = [i.strip() for i in os.getenv("RESPONSE_CACHE_INTENTS", "greeting,faq,general_qa,direct_tool").split(",") if i.strip()]
+
+# 한국어 형태소 분석기 (kiwi: JVM 없는 네이티브 분석기, okt: KoNLPy Okt) 및 배치 분석 스레드 수 (-1: 전체 코어)
+KOREAN_TOKENIZER = os.getenv("KOREAN_TOKENIZER", "kiwi").lower()
+TOKENIZER_WORKERS = int(os.getenv("TOKENIZER_WORKERS", "-1"))
+
+# Azure OpenAI HTTP 커넥션 풀 (LLM / 임베딩 클라이언트 공용, keep-alive)
+AOAI_HTTP_MAX_CONNECTIONS = int(os.getenv("AOAI_HTTP_MAX_CONNECTIONS", "100"))
+AOAI_HTTP_MAX_KEEPALIVE = int(os.getenv("AOAI_HTTP_MAX_KEEPALIVE", "20"))
+AOAI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AOAI_HTTP_KEEPALIVE_EXPIRY", "60"))
+AOAI_HTTP_CONNECT_TIMEOUT = float(os.getenv("AOAI_HTTP_CONNECT_TIMEOUT", "5"))
+AOAI_HTTP_READ_TIMEOUT = float(os.getenv("AOAI_HTTP_READ_TIMEOUT", "60"))
+AOAI_HTTP_POOL_TIMEOUT = float(os.getenv("AOAI_HTTP_POOL_TIMEOUT", "10"))
+AOAI_HTTP2 = os.getenv("AOAI_HTTP2", "1") == "1"  # h2 패키지가 설치된 경우에만 적용
+
 # Azure 설정 확인 플래그
 AZURE_AVAILABLE = bool(AOAI_ENDPOINT and AOAI_API_KEY)
 if not AZURE_AVAILABLE:
     logger.warning("Azure OpenAI 설정이 없어 폴백(Fallback) 모드로 동작합니다.")
 
 
+# LLM / 임베딩 클라이언트 레지스트리 ((배포명, temperature)별 1개, 커넥션 풀 공유)
+_clients = ClientRegistry(
+    max_connections=AOAI_HTTP_MAX_CONNECTIONS,
+    max_keepalive=AOAI_HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=AOAI_HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=AOAI_HTTP_CONNECT_TIMEOUT,
+    read_timeout=AOAI_HTTP_READ_TIMEOUT,
+    pool_timeout=AOAI_HTTP_POOL_TIMEOUT,
+    http2=AOAI_HTTP2,
+)
+
+def client_registry_stats() -> Dict[str, Any]:
+    return _clients.stats()
+
+async def close_clients() -> None:
+    """API 서버 종료 시 공용 커넥션 풀을 닫습니다."""
+    await _clients.aclose()
+
+
 # =============================================================
 # 2. 공통 유틸
 # workflow/utils.py (형태소 분석기, 공용 유틸)
 # =============================================================
-# Okt 형태소 분석기 - Lazy Initialization (Thread-Safe)
+# 형태소 분석기 - Lazy Initialization (Thread-Safe)
 _okt = None
 _okt_lock = threading.Lock()
 
 _faq_data = None   # FAQ 데이터 캐시 전역변수
+_faq_postings = None  # FAQ 역색인 {토큰: [FAQ 행 번호, ...]}
 _owner_data = None
 
 
 class _DummyOkt:
     """pytest 전용: JVM 없이 최소 기능만 제공하는 더미 분석기"""
+    name = "dummy"
     def phrases(self, text: str):
         return [w for w in text.lower().split() if w]
     def nouns(self, text: str):
@@ -78,8 +180,8 @@ class _DummyOkt:
 
 def get_okt():
     """
-    Okt 인스턴스를 반환합니다.
-    JVM은 프로세스에서 한 번만 실행될 수 있으므로
+    KOREAN_TOKENIZER 설정에 따른 형태소 분석기(phrases / nouns)를 반환합니다.
+    분석기 초기화(Okt는 JVM 기동)는 프로세스에서 한 번만 수행되도록
     thread-safe lazy init 패턴을 적용했습니다.
     테스트 시에는 환경변수 TEST_DISABLE_JVM=1이면 더미 OKT를 사용합니다.
     """
@@ -90,7 +192,7 @@ def get_okt():
                 if os.getenv("TEST_DISABLE_JVM", "0") == "1":
                     _okt = _DummyOkt()       # ← JVM 미기동
                 else:
-                    _okt = Okt()             # ← 실제 JVM 기동
+                    _okt = tokenizer.create_tokenizer(KOREAN_TOKENIZER, TOKENIZER_WORKERS)
     return _okt
 
 
@@ -124,120 +226,340 @@ def get_okt():
 # 3. RAG 및 LLM 관련 함수 정의
 # workflow/vectorstore.py (벡터스토어 관리)
 # =============================================================
-# 임베딩 모델 생성
-def _make_embedder() -> AzureOpenAIEmbeddings:
+# 임베딩 모델 생성 (디스크 캐시 적용)
+def _make_embedder() -> Embeddings:
+    """
+    (배포명, 텍스트 해시) 기준 디스크 캐시를 거치는 임베딩 모델을 반환합니다.
+    인덱스 빌드와 질의 임베딩 모두 캐시를 먼저 조회합니다.
+    배포별로 한 번만 생성되어 공용 커넥션 풀과 스케줄러(TPM 페이싱)를 재사용합니다.
+    """
     if not AZURE_AVAILABLE:
         raise RuntimeError("Azure OpenAI 설정이 없어 Embedder를 생성할 수 없습니다.")
-    return AzureOpenAIEmbeddings(
-        azure_deployment=AOAI_DEPLOY_EMBED_3_SMALL,
-        api_key=AOAI_API_KEY,
-        azure_endpoint=AOAI_ENDPOINT,
-        api_version=AOAI_API_VERSION,
-    )
+
+    def factory() -> Embeddings:
+        inner = metrics.TimedEmbeddings(AzureOpenAIEmbeddings(
+            azure_deployment=AOAI_DEPLOY_EMBED_3_SMALL,
+            api_key=AOAI_API_KEY,
+            azure_endpoint=AOAI_ENDPOINT,
+            api_version=AOAI_API_VERSION,
+            # 배치 분할/재시도는 EmbeddingScheduler가 담당
+            chunk_size=EMBED_REQUEST_BATCH_SIZE,
+            max_retries=0,
+            check_embedding_ctx_length=EMBED_CHECK_CTX_LENGTH,
+            http_client=_clients.http_client(),
+            http_async_client=_clients.http_async_client(),
+        ))
+        cache = get_embedding_cache(constants.INDEX_DIR / constants.EMBED_CACHE_NAME, AOAI_DEPLOY_EMBED_3_SMALL)
+        scheduler = EmbeddingScheduler(
+            batch_size=EMBED_REQUEST_BATCH_SIZE,
+            max_concurrency=EMBED_MAX_CONCURRENCY,
+            tokens_per_minute=EMBED_TPM_LIMIT,
+            max_retries=EMBED_MAX_RETRIES,
+            query_max_retries=EMBED_QUERY_MAX_RETRIES,
+            query_max_delay=EMBED_QUERY_MAX_DELAY,
+        )
+        return CachedEmbeddings(inner, cache, scheduler, query_cache_size=EMBED_QUERY_CACHE_SIZE)
+
+    return _clients.get(("embeddings", AOAI_DEPLOY_EMBED_3_SMALL), factory)
 
 # RAG - 원본 데이터 수집 및 전처리 로직 [checklist: 6]
-def _load_docs_from_kb() -> List[Document]:
+def _load_docs_from_kb(files: List[Tuple[str, Path]]) -> Iterator[Tuple[str, List[Document]]]:
     """
     RAG - 원본 데이터 수집 및 전처리 로직
+    주어진 (manifest 키, 경로) 파일을 프로세스 풀에서 파싱하여 완료 순서대로 반환합니다.
     """
-    docs: List[Document] = []
-    # FAQ 문서 추가
-    faq_data = load_faq_data()
-    if faq_data:
-        docs.extend([
-            Document(
-                page_content=f"질문: {item.get('question')}\n답변: {item.get('answer')}",
-                metadata={"source": "faq_data.csv"}
-            ) for item in faq_data
-        ])
-    # 업무 담당자 문서 추가
-    owner_data = load_owner_data()
-    if owner_data:
-        docs.extend([
-            Document(
-                page_content=f"화면: {item.get('screen')}\n담당자: {item.get('owner')}\n이메일: {item.get('email')}\n연락처: {item.get('phone')}",
-                metadata={"source": "owners.csv"}
-            ) for item in owner_data
-        ])
-    # 기타 문서 로드
-    for kb_path in [constants.KB_DEFAULT_DIR, constants.KB_DATA_DIR]:
-        if not kb_path.exists():
-            kb_path.mkdir(parents=True, exist_ok=True)
-            for p in kb_path.rglob("*"):
-                # ✅ DB 파일(history.db 등)은 벡터화 대상에서 제외
-                if not p.is_file():
-                    continue
-                if p.suffix.lower() == ".db" or p.name == "history.db":
-                    continue
-                if p.name == "faq_data.csv":
-                    continue
-                try:
-                    suf = p.suffix.lower()
-                    if suf == ".pdf": docs.extend(PyPDFLoader(str(p)).load())
-                    elif suf == ".csv": docs.extend(CSVLoader(file_path=str(p), encoding="utf-8").load())
-                    elif suf in [".txt", ".md"]: docs.extend(TextLoader(str(p), encoding="utf-8").load())
-                    elif suf == ".docx": docs.extend(Docx2txtLoader(str(p)).load())
-                except Exception as e:
-                    logger.warning(f"문서 로드 실패: {p} - {e}")
-    return docs
+    return ingest.iter_loaded_docs(files, workers=KB_LOAD_WORKERS)
+
+def _load_generation(generation: str, embed: Embeddings) -> FAISS:
+    """수정 가능한(pickle docstore) 벡터스토어 로드 - Sync 전용"""
+    return FAISS.load_local(
+        str(index_store.generation_path(generation)),
+        embeddings=embed,
+        allow_dangerous_deserialization=True
+    )
+
+def _load_serving_generation(generation: str, embed: Embeddings) -> FAISS:
+    """
+    검색용 벡터스토어 로드
+    - 세대에 ANN 인덱스(serve.faiss)가 있으면 마스터(Flat) 대신 사용
+    - INDEX_MMAP=1 이면 mmap + 컬럼형 docstore 사용
+    """
+    gen_path = index_store.generation_path(generation)
+    index_file = ann.SERVE_INDEX_NAME if ann.has_serving_index(gen_path) else "index.faiss"
+    if INDEX_MMAP and index_store.has_columnar_docstore(gen_path):
+        return index_store.load_mmap_vectorstore(gen_path, embed, index_file)
+    vs = _load_generation(generation, embed)
+    if index_file != "index.faiss":
+        vs.index = faiss.read_index(str(gen_path / index_file))
+    return vs
+
+def _load_bm25(generation: str) -> Optional[bm25.BM25Index]:
+    if not HYBRID_SEARCH:
+        return None
+    try:
+        index = bm25.BM25Index.load(index_store.generation_path(generation))
+        analyzer = _tokenizer_name()
+    except Exception as e:
+        logger.warning(f"BM25 인덱스 로드 실패, 벡터 검색만 사용합니다: {e}")
+        return None
+    # 다른 형태소 분석기로 만든 역색인은 질의 토큰과 맞지 않으므로 사용하지 않음 (다음 Sync에서 전체 재토큰화)
+    if index is not None and index.analyzer != analyzer:
+        logger.warning(f"BM25 인덱스의 형태소 분석기({index.analyzer})가 현재 분석기({analyzer})와 달라 벡터 검색만 사용합니다: {generation}")
+        return None
+    return index
+
+def _tokenizer_name() -> str:
+    analyzer = get_okt()
+    return getattr(analyzer, "name", type(analyzer).__name__)
+
+def _bm25_tokenize(text: str) -> List[str]:
+    return bm25.tokenize(text, get_okt())
+
+def _build_bm25(gen_path: Path, vs: FAISS, base_generation: Optional[str]) -> None:
+    """FAISS 위치 순서대로 청크를 토큰화하여 BM25 역색인을 저장합니다 (미변경 청크는 이전 세대 토큰 재사용)."""
+    if not HYBRID_SEARCH:
+        return
+    try:
+        previous = _load_bm25(base_generation) if base_generation is not None else None
+        docs = (
+            (vs.index_to_docstore_id[i], vs.docstore.search(vs.index_to_docstore_id[i]).page_content)
+            for i in range(vs.index.ntotal)
+        )
+        bm25.BM25Index.build(docs, _bm25_tokenize, previous, analyzer=_tokenizer_name()).save(gen_path)
+    except Exception as e:
+        # 형태소 분석기(JVM) 오류 등으로 실패해도 벡터 인덱스 Sync는 계속 진행
+        logger.warning(f"BM25 인덱스 생성 실패, 벡터 검색만 사용합니다: {e}")
+
+def _ann_options() -> Dict[str, Any]:
+    return {
+        "nlist": INDEX_NLIST,
+        "pq_m": INDEX_PQ_M,
+        "hnsw_m": INDEX_HNSW_M,
+        "ef_construction": INDEX_EF_CONSTRUCTION,
+        "train_sample": INDEX_TRAIN_SAMPLE,
+    }
 
 # RAG - FAISS 기반의 Vector 스토어 구축 [checklist: 7]
 def build_or_load_vectorstore() -> FAISS:
     """
-    RAG - FAISS 기반의 Vector 스토어 구축
+    RAG - FAISS 기반의 Vector 스토어 구축 (증분 동기화)
+    manifest의 파일 해시와 비교하여 신규/변경 파일만 임베딩하고,
+    변경/삭제된 파일의 기존 벡터는 인덱스에서 제거합니다.
+    변경 사항은 새 세대(generation) 디렉토리에 저장한 뒤 CURRENT 포인터를 원자적으로 교체하며,
+    현재 프로세스의 retriever도 즉시 새 세대로 전환합니다.
     """
     if not AZURE_AVAILABLE:
         raise RuntimeError("'Rebuild Index'는 Azure OpenAI 설정이 필요합니다.")
+    with index_store.sync_lock():
+        generation, vs = _sync_vectorstore()
+    active = _active
+    if active is not None and active[0] == generation:
+        # 변경 없음: 이미 서비스 중인 세대를 재사용 (BM25 역색인이 새로 추가됐으면 다시 연결)
+        if active[2] is None and HYBRID_SEARCH:
+            _swap_vectorstore(generation, active[1])
+        return active[1]
+    if vs is None or INDEX_MMAP or ann.has_serving_index(index_store.generation_path(generation)):
+        # 검색용 인덱스(ANN / mmap)로 다시 로드
+        vs = _load_serving_generation(generation, _make_embedder())
+    _swap_vectorstore(generation, vs)
+    return vs
+
+def _make_splitter() -> RecursiveCharacterTextSplitter:
+    """인덱싱용 청크 분할기 (benchmarks/micro 에서도 같은 설정으로 측정)"""
+    return RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=120)
+
+def _sync_vectorstore() -> Tuple[str, Optional[FAISS]]:
+    """현재 세대를 기준으로 증분 동기화하여 (세대 ID, 새 벡터스토어)를 반환합니다. 변경이 없으면 벡터스토어는 None."""
+    base_generation = index_store.current_generation()
+    manifest = ingest.IngestManifest()
+    if base_generation is not None:
+        manifest = ingest.IngestManifest.load(index_store.generation_path(base_generation) / ingest.MANIFEST_NAME)
+
+    kb_files = dict(ingest.iter_kb_files())
+    current = {key: ingest.file_sha256(p) for key, p in kb_files.items()}
+    # KB가 완전히 비어있으면 시드 문서를 가상의 파일로 취급
+    if not current:
+        current = {ingest.SEED_KEY: ingest.text_sha256(ingest.SEED_TEXT)}
+
+    changed, deleted = manifest.diff(current)
+    # 요청한 ANN 인덱스 유형이 바뀌었으면 문서 변경이 없어도 새 세대를 생성
+    index_type_changed = (
+        base_generation is not None
+        and ann.load_params(index_store.generation_path(base_generation)).get("requested", "flat") != INDEX_TYPE
+    )
+    if base_generation is not None and not changed and not deleted and not index_type_changed:
+        logger.info("KB 변경 사항이 없어 기존 인덱스를 사용합니다.")
+        base_path = index_store.generation_path(base_generation)
+        if HYBRID_SEARCH and not (base_path / bm25.BM25_NAME).exists():
+            # BM25 역색인이 없는 기존 세대: 벡터는 그대로 두고 역색인만 추가
+            _build_bm25(base_path, _load_generation(base_generation, _make_embedder()), None)
+        return base_generation, None
+
     embed = _make_embedder()
-    if (constants.INDEX_DIR / f"{constants.INDEX_NAME}.faiss").exists():
-        return FAISS.load_local(
-            str(constants.INDEX_DIR / constants.INDEX_NAME),
-            embeddings=embed,
-            allow_dangerous_deserialization=True
-        )
-    raw_docs = _load_docs_from_kb()
-    if not raw_docs:
-        faq_data = load_faq_data()
-        if faq_data:
-            raw_docs = [
-                Document(
-                    page_content=f"질문: {item.get('question')}\n답변: {item.get('answer')}",
-                    metadata={"source": "faq_data.csv"}
-                ) for item in faq_data
-            ]
-            logger.info("업로드된 문서가 없어 faq_data.csv를 기본 RAG 지식으로 사용합니다.")
+    vs: Optional[FAISS] = None
+    if base_generation is not None:
+        # 디스크에서 새로 로드한 객체를 수정하므로 서비스 중인 인덱스에는 영향 없음
+        vs = _load_generation(base_generation, embed)
+
+    # 변경/삭제된 파일의 기존 청크 벡터 제거
+    stale_ids = [cid for key in changed + deleted for cid in manifest.chunk_ids(key)]
+    if vs is not None and stale_ids:
+        existing = set(vs.index_to_docstore_id.values())
+        stale_ids = [cid for cid in stale_ids if cid in existing]
+        if stale_ids:
+            vs.delete(stale_ids)
+    for key in changed + deleted:
+        manifest.remove(key)
+
+    # 신규/변경 파일만 로드 → 분할 → 임베딩 (파일 단위 스트리밍 + 청크 배치)
+    splitter = _make_splitter()
+    if ingest.SEED_KEY in changed:
+        loaded = iter([(ingest.SEED_KEY, [Document(page_content=ingest.SEED_TEXT, metadata={"source": ingest.SEED_KEY})])])
+    else:
+        loaded = _load_docs_from_kb([(key, kb_files[key]) for key in changed])
+
+    batch: List[Tuple[str, str, Document]] = []     # (파일 키, 청크 ID, 청크)
+    file_chunks: Dict[str, Dict[str, str]] = {}    # 파일별 반영 완료 청크 {청크ID: 청크해시}
+    remaining: Dict[str, int] = {}                 # 파일별 아직 임베딩되지 않은 청크 수
+    added = 0
+
+    def flush(items: List[Tuple[str, str, Document]]) -> None:
+        nonlocal vs, added
+        chunks = [c for _, _, c in items]
+        ids = [cid for _, cid, _ in items]
+        if vs is None:
+            vs = FAISS.from_documents(chunks, embed, ids=ids)
         else:
-            seed_text = """사내 헬프데스크 안내
-- ID 발급: 신규 입사자는 HR 포털에서 '계정 신청' 양식을 제출. 승인 후 IT가 계정 생성.
-- 비밀번호 초기화: SSO 포털의 '비밀번호 재설정' 기능 사용. 본인인증 필요.
-- 담당자 조회: 포털 상단 검색창에 화면/메뉴명을 입력하면 담당자 카드가 표시됨."""
-            raw_docs = [Document(page_content=seed_text, metadata={"source": "seed-faq.txt"})]
-
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=120)
-    chunks = splitter.split_documents(raw_docs)
-    constants.INDEX_DIR.mkdir(parents=True, exist_ok=True)
-    # FAISS에 문서를 임베딩하고 저장
-    vs = FAISS.from_documents(chunks, embed)
-    vs.save_local(str(constants.INDEX_DIR / constants.INDEX_NAME))
-    return vs
+            vs.add_documents(chunks, ids=ids)
+        added += len(items)
+        # 파일의 모든 청크가 반영된 시점에만 manifest에 기록
+        for key, cid, c in items:
+            file_chunks[key][cid] = ingest.text_sha256(c.page_content)
+            remaining[key] -= 1
+            if remaining[key] == 0:
+                manifest.set(key, current[key], file_chunks.pop(key))
+
+    for key, raw_docs in loaded:
+        chunks = splitter.split_documents(raw_docs)
+        if not chunks:
+            manifest.set(key, current[key], {})
+            continue
+        file_chunks[key], remaining[key] = {}, len(chunks)
+        batch.extend((key, ingest.chunk_id(key, current[key], i), c) for i, c in enumerate(chunks))
+        while len(batch) >= EMBED_BATCH_SIZE:
+            flush(batch[:EMBED_BATCH_SIZE])
+            batch = batch[EMBED_BATCH_SIZE:]
+    if batch:
+        flush(batch)
+
+    if vs is None:
+        # 로드 가능한 문서가 하나도 없으면 시드 문서로 인덱스를 생성
+        seed_hash = ingest.text_sha256(ingest.SEED_TEXT)
+        seed_id = ingest.chunk_id(ingest.SEED_KEY, seed_hash, 0)
+        vs = FAISS.from_documents(
+            [Document(page_content=ingest.SEED_TEXT, metadata={"source": ingest.SEED_KEY})], embed, ids=[seed_id]
+        )
+        manifest.set(ingest.SEED_KEY, seed_hash, {seed_id: seed_hash})
+    # 새 세대 디렉토리에 저장 → manifest 기록 → 포인터 교체 순서로 반영
+    generation = index_store.new_generation_id()
+    gen_path = index_store.generation_path(generation)
+    gen_path.mkdir(parents=True, exist_ok=True)
+    vs.save_local(str(gen_path))
+    index_store.write_columnar_docstore(gen_path, vs)
+    ann.build_serving_index(gen_path, vs.index, INDEX_TYPE, _ann_options())
+    _build_bm25(gen_path, vs, base_generation)
+    manifest.save(gen_path / ingest.MANIFEST_NAME)
+    index_store.publish(generation)
+    index_store.prune()
+    logger.info(
+        "vectorstore_sync",
+        extra={"extra_data": {"generation": generation, "changed": len(changed), "deleted": len(deleted), "chunks_added": added, "chunks_removed": len(stale_ids)}}
+    )
+    return generation, vs
 
-# RAG - FAISS 벡터 스토어 검색기 (Singleton Pattern)
-_vectorstore: Optional[FAISS] = None
+# RAG - FAISS 벡터 스토어 검색기 (세대 단위 Hot-Swap)
+# (세대 ID, 벡터스토어, BM25 역색인) 튜플을 통째로 교체하므로 읽는 쪽은 락이 필요 없음
+_active: Optional[Tuple[str, FAISS, Optional[bm25.BM25Index]]] = None
 _vectorstore_lock = threading.Lock()
 
-def retriever(k: int = 4):
-    """RAG - 벡터스토어 retriever (Singleton Pattern)"""
-    global _vectorstore
-    if _vectorstore is None:
+def _swap_vectorstore(generation: str, vs: FAISS) -> None:
+    global _active
+    _active = (generation, vs, _load_bm25(generation))
+
+def current_vectorstore() -> FAISS:
+    """현재 세대의 벡터스토어를 반환합니다."""
+    return _current_entry()[1]
+
+def _current_entry() -> Tuple[str, FAISS, Optional[bm25.BM25Index]]:
+    """
+    현재 세대의 (세대 ID, 벡터스토어, BM25 역색인)을 반환합니다.
+    CURRENT 포인터가 바뀌었으면 한 스레드만 새 세대를 로드하고,
+    로드 중에 들어온 다른 요청은 기다리지 않고 이전 세대를 그대로 사용합니다.
+    """
+    active = _active
+    latest = index_store.current_generation()
+    if active is not None and (latest is None or latest == active[0]):
+        return active
+    if active is None:
+        # 최초 로드는 사용할 인덱스가 없으므로 대기
         with _vectorstore_lock:
-            if _vectorstore is None:
-                _vectorstore = build_or_load_vectorstore()
-    return _vectorstore.as_retriever(search_kwargs={"k": k})
+            if _active is None:
+                if latest is None:
+                    build_or_load_vectorstore()
+                else:
+                    _swap_vectorstore(latest, _load_serving_generation(latest, _make_embedder()))
+            return _active
+    if _vectorstore_lock.acquire(blocking=False):
+        try:
+            if _active[0] != latest:
+                _swap_vectorstore(latest, _load_serving_generation(latest, _make_embedder()))
+                logger.info("index_generation_swapped", extra={"extra_data": {"generation": latest}})
+        except Exception as e:
+            logger.error(f"새 인덱스 세대 로드 실패, 이전 세대를 계속 사용합니다: {e}")
+        finally:
+            _vectorstore_lock.release()
+    return _active
+
+def current_generation() -> Optional[str]:
+    """현재 프로세스가 서비스 중인 인덱스 세대 ID"""
+    active = _active
+    return active[0] if active is not None else None
+
+def retriever(k: int = 4, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """
+    RAG - 벡터스토어 retriever (세대 단위 Hot-Swap)
+    nprobe(IVF) / ef_search(HNSW)로 요청별 재현율-지연시간 트레이드오프를 조정할 수 있습니다.
+    세대에 BM25 역색인이 있으면 BM25 + 벡터 결과를 RRF로 결합하는 하이브리드 retriever를 반환합니다.
+    (벡터스토어와 역색인은 같은 세대 튜플에서 꺼내므로 Hot-Swap 중에도 문서 번호가 어긋나지 않음)
+    """
+    return _make_retriever(_current_entry(), k, nprobe, ef_search)
+
+async def aretriever(k: int = 4, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """
+    retriever()의 비동기 버전
+    새 세대 로드(디스크 I/O)가 필요할 때만 스레드에서 수행하여 이벤트 루프를 막지 않습니다.
+    """
+    active = _active
+    if active is not None and index_store.current_generation() in (None, active[0]):
+        entry = active
+    else:
+        entry = await asyncio.to_thread(_current_entry)
+    return _make_retriever(entry, k, nprobe, ef_search)
+
+def _make_retriever(entry: Tuple[str, FAISS, Optional[bm25.BM25Index]], k: int, nprobe: Optional[int], ef_search: Optional[int]):
+    _, vs, index = entry
+    vs = ann.with_search_params(vs, nprobe or INDEX_NPROBE, ef_search or INDEX_EF_SEARCH)
+    if index is None:
+        return vs.as_retriever(search_kwargs={"k": k})
+    return bm25.HybridRetriever(
+        vectorstore=vs, index=index, tokenizer=_bm25_tokenize, k=k, fetch_k=max(k, HYBRID_FETCH_K), rrf_k=RRF_K
+    )
 
 # LLM(언어 모델) 인스턴스를 생성
 def make_llm(model: str = AOAI_DEPLOY_GPT4O_MINI, temperature: float = 0.2) -> AzureChatOpenAI:
     """
-    Azure OpenAI 서비스에 연결하여 LLM(언어 모델) 인스턴스를 생성합니다.
+    Azure OpenAI 서비스에 연결하여 LLM(언어 모델) 인스턴스를 반환합니다.
+    (배포명, temperature)별로 한 번만 생성되며, 공용 keep-alive 커넥션 풀을 사용합니다.
     Args:
         model (str): 사용할 Azure OpenAI 배포 모델의 이름. 기본값은 gpt-4o-mini입니다.
         temperature (float): 모델의 창의성(무작위성)을 조절하는 매개변수. 0.0에서 2.0 사이의 값. 
@@ -249,13 +571,17 @@ def make_llm(model: str = AOAI_DEPLOY_GPT4O_MINI, temperature: float = 0.2) -> A
     """
     if not AZURE_AVAILABLE:
         raise RuntimeError("Azure OpenAI 설정이 없어 LLM을 생성할 수 없습니다.")
-    return AzureChatOpenAI(
+    return _clients.get(("llm", model, temperature), lambda: AzureChatOpenAI(
         azure_deployment=model,
         api_version=AOAI_API_VERSION,
         azure_endpoint=AOAI_ENDPOINT,
         api_key=AOAI_API_KEY,
         temperature=temperature,
-    )
+        http_client=_clients.http_client(),
+        http_async_client=_clients.http_async_client(),
+        stream_usage=True,  # 스트리밍 응답에도 토큰 사용량 포함 (메트릭)
+        callbacks=[metrics.LLMMetricsCallback(model)],
+    ))
 
 
 # =============================================================
@@ -268,6 +594,8 @@ class BotState(TypedDict):
     reply: str
     sources: List[Dict[str, Any]]
     tool_output: Dict[str, Any]
+    docs: Optional[List[Document]]  # retrieve 노드의 추측 검색 결과 (None이면 rag 노드에서 검색)
+    search: Dict[str, int]          # 요청별 ANN 검색 파라미터 (nprobe / ef_search, 비어 있으면 INDEX_* 기본값)
 
 
 @tool
@@ -294,7 +622,9 @@ def tool_request_id(payload: Dict[str, Any] = {}) -> Dict[str, Any]:
 def tool_owner_lookup(payload: Dict[str, Any]) -> Dict[str, Any]:
     """화면이나 메뉴의 담당자 정보를 조회합니다. `screen` 인자가 필요합니다."""
     try:
-        screen = payload.get("screen") or ""
+        screen = (payload.get("screen") or "").strip()
+        if not screen:
+            return {"ok": False, "message": "조회할 화면/메뉴명을 알려주세요."}
         owner_data = load_owner_data()
         for item in owner_data:
             if screen in item.get("screen", ""):
@@ -315,10 +645,24 @@ def tool_owner_lookup(payload: Dict[str, Any]) -> Dict[str, Any]:
 # workflow/nodes.py (LangGraph 노드 정의)
 # =============================================================
     # Prompt Engineering - 프롬프트 최적화 (Few-shot Prompting) [checklist: 1]
-# 노드(Node) 함수
-def node_classify(state: BotState) -> BotState:
-    llm = make_llm(model=AOAI_DEPLOY_GPT4O_MINI, temperature=0.1)
-    prompt_template = PromptTemplate.from_template("""
+def _intent_examples() -> Dict[str, List[str]]:
+    """기본 예시 + FAQ 질문(일반 질의 → RAG)으로 중심 분류용 예시를 구성합니다."""
+    faq_questions = [row["question"] for row in load_faq_data()[:INTENT_MAX_FAQ_EXAMPLES] if row.get("question")]
+    return {**SEED_EXAMPLES, "general_qa": SEED_EXAMPLES["general_qa"] + faq_questions}
+
+_intent_classifier = LocalIntentClassifier(
+    owners_fn=lambda: load_owner_data(),
+    embedder_fn=_make_embedder,
+    examples_fn=_intent_examples,
+    threshold=INTENT_CENTROID_THRESHOLD,
+    margin=INTENT_CENTROID_MARGIN,
+)
+
+def intent_classifier_stats() -> Dict[str, Any]:
+    return _intent_classifier.stats()
+
+# 의도 분류 프롬프트 (Few-shot)
+_CLASSIFY_PROMPT = PromptTemplate.from_template("""
     당신은 사용자 의도를 분류하는 AI입니다. 사용자의 질문을 가장 적합한 카테고리로 분류하세요.
     - `greeting`: 사용자가 인사말("안녕", "안녕하세요" 등)을 건넬 때
     - `direct_tool`: 사용자가 특정 시스템 작업(비밀번호 초기화, ID 발급, 담당자 조회)을 요청할 때
@@ -336,9 +680,9 @@ def node_classify(state: BotState) -> BotState:
 
     사용자 질문: "{question}" -> 
     """)
-    prompt = prompt_template.format(question=state["question"])
-    out = llm.invoke(prompt).content
-    
+
+def _parse_intent(out: str) -> Tuple[str, Dict[str, Any]]:
+    """분류 LLM 출력(JSON)에서 (의도, 인자)를 꺼냅니다. 파싱 실패 시 general_qa."""
     intent, args = "general_qa", {}
     try:
         data = json.loads(out.strip())
@@ -348,24 +692,88 @@ def node_classify(state: BotState) -> BotState:
         logger.warning(f"[Classifier 오류] JSONDecodeError: {out}")
     except Exception as e:
         logger.error(f"[Classifier 오류] 알 수 없는 오류: {out} - {e}")
-    
-    return {**state, "intent": intent, "tool_output": args}
+    return intent, args
+
+def _local_intent_state(local) -> Dict[str, Any]:
+    logger.info("intent_local", extra={"extra_data": {"intent": local.intent, "stage": local.stage, "confidence": round(local.confidence, 4)}})
+    metrics.INTENT_TOTAL.inc(intent=local.intent, stage=local.stage)
+    return {"intent": local.intent, "tool_output": local.arguments}
+
+# 노드(Node) 함수
+# classify 는 retrieve 노드와 같은 단계에서 병렬 실행될 수 있으므로, 변경한 키(intent, tool_output)만 반환합니다.
+def node_classify(state: BotState) -> Dict[str, Any]:
+    # 1차: 로컬 분류기 (확신할 때만 결과 반환, 애매하면 LLM으로)
+    if INTENT_LOCAL_ENABLED:
+        local = _intent_classifier.classify(state["question"])
+        if local is not None:
+            return _local_intent_state(local)
+
+    llm = make_llm(model=AOAI_DEPLOY_GPT4O_MINI, temperature=0.1)
+    prompt = _CLASSIFY_PROMPT.format(question=state["question"])
+    intent, args = _parse_intent(llm.invoke(prompt).content)
+    metrics.INTENT_TOTAL.inc(intent=intent, stage="llm")
+    return {"intent": intent, "tool_output": args}
+
+async def anode_classify(state: BotState) -> Dict[str, Any]:
+    """node_classify 의 비동기 버전 (apipeline / graph.ainvoke)"""
+    if INTENT_LOCAL_ENABLED:
+        local = await _intent_classifier.aclassify(state["question"])
+        if local is not None:
+            return _local_intent_state(local)
+
+    llm = make_llm(model=AOAI_DEPLOY_GPT4O_MINI, temperature=0.1)
+    prompt = _CLASSIFY_PROMPT.format(question=state["question"])
+    intent, args = _parse_intent((await llm.ainvoke(prompt)).content)
+    metrics.INTENT_TOTAL.inc(intent=intent, stage="llm")
+    return {"intent": intent, "tool_output": args}
+
+def _skip_speculative(question: str) -> bool:
+    """규칙/담당자 화면 매칭만으로 RAG가 아닌 의도(인사, 도구)로 확정되는 질문은 추측 검색을 생략"""
+    return INTENT_LOCAL_ENABLED and _intent_classifier.quick_classify(question) is not None
+
+def node_retrieve(state: BotState) -> Dict[str, Any]:
+    """
+    classify 와 병렬로 실행되는 추측 검색 (SPECULATIVE_RETRIEVAL=1)
+    질의 임베딩 왕복을 분류 LLM 호출과 겹쳐 general_qa 응답 지연을 줄입니다.
+    실패해도 오류를 내지 않고 docs=None 으로 두어 rag 노드가 직접 검색하도록 합니다.
+    """
+    if _skip_speculative(state["question"]):
+        return {"docs": None}
+    try:
+        with metrics.RETRIEVAL_LATENCY.time(stage="speculative"):
+            return {"docs": retriever(k=4, **state.get("search", {})).invoke(state["question"])}
+    except Exception as e:
+        logger.warning(f"추측 검색 실패, RAG 단계에서 다시 검색합니다: {e}")
+        return {"docs": None}
+
+async def anode_retrieve(state: BotState) -> Dict[str, Any]:
+    """node_retrieve 의 비동기 버전"""
+    if _skip_speculative(state["question"]):
+        return {"docs": None}
+    try:
+        with metrics.RETRIEVAL_LATENCY.time(stage="speculative"):
+            return {"docs": await (await aretriever(k=4, **state.get("search", {}))).ainvoke(state["question"])}
+    except Exception as e:
+        logger.warning(f"추측 검색 실패, RAG 단계에서 다시 검색합니다: {e}")
+        return {"docs": None}
 
 def node_greeting(state: BotState) -> BotState:
     return {**state, "reply": "네, 반갑습니다. 문의사항을 말씀해 주시면 제가 도와드릴게요.", "sources": []}
 
 def node_direct_tool(state: BotState) -> BotState:
-    tool_name = state.get("tool_output", {}).get("tool_name")
-    payload = state.get("tool_output", {}).get("arguments", {})
+    tool_output = state.get("tool_output", {})
+    tool_name = tool_output.get("tool_name")
+    # LLM 분류는 screen 등을 tool_output 최상위에, 로컬 분류기는 arguments 하위에 담으므로 둘을 합쳐 사용
+    payload = {**tool_output, **(tool_output.get("arguments") or {})}
     
     if tool_name == "tool_reset_password":
         res = tool_reset_password.invoke({})
     elif tool_name == "tool_request_id":
         res = tool_request_id.invoke({})
     elif tool_name == "tool_owner_lookup":
-        # ✅ 전체 조회 예외 처리
+        # ✅ 전체 조회 예외 처리 (로컬 분류기의 list_all 또는 질문의 목록 키워드)
         query_text = state.get("question", "")
-        if "전체" in query_text or "모두" in query_text or "리스트" in query_text:
+        if payload.get("list_all") or "전체" in query_text or "모두" in query_text or "리스트" in query_text:
             from platform_service.core import load_owner_data
             owners = load_owner_data()
             res = {
@@ -402,35 +810,48 @@ def node_faq(state: BotState) -> BotState:
     return {**state, "intent": "general_qa"}
     # RAG - 사전 정의된 데이터(문서)를 검색하여 AI의 논리력을 보강/ RAG 기반 지식 검색 기능 구현 [checklist: 8,9] 
 # Prompt Engineering - 프롬프트 최적화 (역할 부여 + Chain-of-Thought) [checklist: 1] 
-def node_rag(state: BotState) -> BotState:
-    docs = retriever(k=4).get_relevant_documents(state["question"])
-    
+def _rag_messages(question: str, docs: List[Document]) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
+    """검색 결과로 (LLM 메시지, 출처 목록)을 구성합니다."""
     # 검색 결과가 전혀 없으면 → 일반 LLM 답변
     if not docs:
-        llm = make_llm(model=AOAI_DEPLOY_GPT4O)
         sys_prompt = "너는 사내 헬프데스크 상담원이다. 내부 문서에 없는 질문이라도 일반 지식을 활용해 한국어로 답해라."
-        out = llm.invoke([
+        return [
             {"role": "system", "content": sys_prompt},
-            {"role": "user", "content": state["question"]}
-        ]).content
-        return {**state, "reply": out, "sources": []}
+            {"role": "user", "content": question}
+        ], []
 
     # 검색 결과가 있으면 → RAG 기반 답변
     context = "\n\n".join([f"[{i+1}] {d.page_content[:1200]}" for i, d in enumerate(docs)])
     sources = [{"index": i+1, "source": d.metadata.get("source","unknown"), "page": d.metadata.get("page")} for i,d in enumerate(docs)]
-    llm = make_llm(model=AOAI_DEPLOY_GPT4O)
     sys_prompt = (
         "너는 사내 헬프데스크 상담원이다. "
         "가능하면 제공된 컨텍스트를 활용해 답변하되, "
         "부족하면 일반 지식을 보완해서 답해라. "
         "추가 확인이 필요하면 '정확한 정책은 사내 포털에서 확인 필요'라고 말해라."
     )
-    user_prompt = f"질문:\n{state['question']}\n\n컨텍스트:\n{context}"
-    out = llm.invoke([
+    user_prompt = f"질문:\n{question}\n\n컨텍스트:\n{context}"
+    return [
         {"role": "system", "content": sys_prompt},
         {"role": "user", "content": user_prompt}
-    ]).content
-    
+    ], sources
+
+def node_rag(state: BotState) -> BotState:
+    docs = state.get("docs")
+    if docs is None:
+        with metrics.RETRIEVAL_LATENCY.time(stage="rag"):
+            docs = retriever(k=4, **state.get("search", {})).invoke(state["question"])
+    messages, sources = _rag_messages(state["question"], docs)
+    out = make_llm(model=AOAI_DEPLOY_GPT4O).invoke(messages).content
+    return {**state, "reply": out, "sources": sources}
+
+async def anode_rag(state: BotState) -> BotState:
+    """node_rag 의 비동기 버전: 질의 임베딩과 LLM 호출을 이벤트 루프에서 대기"""
+    docs = state.get("docs")
+    if docs is None:
+        with metrics.RETRIEVAL_LATENCY.time(stage="rag"):
+            docs = await (await aretriever(k=4, **state.get("search", {}))).ainvoke(state["question"])
+    messages, sources = _rag_messages(state["question"], docs)
+    out = (await make_llm(model=AOAI_DEPLOY_GPT4O).ainvoke(messages)).content
     return {**state, "reply": out, "sources": sources}
 
 # 도구(Tool) 함수 결과 사용자 친화적인 형태로 변환
@@ -498,7 +919,7 @@ def load_owner_data() -> List[Dict[str, str]]:
 # LangChain & LangGraph - Multi-Agent Flow 설계 및 구현 [checklist: 3,4,5]
 # FAQ 데이터 로드
 def load_faq_data() -> List[Dict[str, str]]:
-    global _faq_data
+    global _faq_data, _faq_postings
     # 이미 로드된 데이터가 있으면 바로 반환
     if _faq_data is not None:
         return _faq_data
@@ -506,6 +927,7 @@ def load_faq_data() -> List[Dict[str, str]]:
     faq_file_path = constants.KB_DEFAULT_DIR / "faq_data.csv"
     if not faq_file_path.exists():
         logger.warning(f"FAQ 파일이 존재하지 않습니다: {faq_file_path}")
+        _faq_postings = {}
         _faq_data = []
         return _faq_data
     
@@ -514,21 +936,29 @@ def load_faq_data() -> List[Dict[str, str]]:
         # 파일 로드 및 데이터 파싱
         with open(faq_file_path, mode='r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
-            # Okt 객체를 미리 생성해두고 재사용
-            okt_processor = get_okt()
-            for row in reader:
-                if "question" in row and "answer" in row:
-                    # Okt 객체를 사용하여 질문을 분석
-                    row["faq_words"] = set(okt_processor.phrases(row.get("question", "")))
-                    loaded_data.append(row)
+            loaded_data = [row for row in reader if "question" in row and "answer" in row]
+        # 질문 전체를 한 번에 분석 (Kiwi는 내부 스레드 풀로 병렬 분석)
+        questions = [row.get("question") or "" for row in loaded_data]
+        for row, words in zip(loaded_data, tokenizer.phrases_many(get_okt(), questions)):
+            row["faq_words"] = set(words)
         logger.info(f"{len(loaded_data)}개의 FAQ 데이터를 로드했습니다.")
     except Exception as e:
         logger.error(f"FAQ 파일 로드 실패: {e}")
         # 오류 발생 시에도 빈 목록을 반환
         loaded_data = []
+    # 역색인을 먼저 만든 뒤 데이터를 공개 (다른 스레드가 데이터만 보고 역색인 없이 검색하지 않도록)
+    _faq_postings = _build_faq_postings(loaded_data)
     _faq_data = loaded_data
     return _faq_data
 
+def _build_faq_postings(faq_data: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """FAQ 질문 토큰 → FAQ 행 번호 목록 (오름차순) 역색인"""
+    postings: Dict[str, List[int]] = {}
+    for idx, item in enumerate(faq_data):
+        for word in item.get("faq_words", ()):
+            postings.setdefault(word, []).append(idx)
+    return postings
+
 # FAQ 유사도 검색
 def find_similar_faq(question: str) -> Optional[Dict[str, Any]]:
     logger.error(f"find_similar_faq - 질문은?: {question.lower().strip()}")
@@ -538,19 +968,28 @@ def find_similar_faq(question: str) -> Optional[Dict[str, Any]]:
     if not user_words: user_words = set(get_okt().nouns(question.lower()))
     if not user_words: return None
     
+    postings = _faq_postings if _faq_postings is not None else _build_faq_postings(faq_data)
+
+    # 질문과 토큰을 하나 이상 공유하는 FAQ만 후보로 교집합 크기 계산
+    overlap: Dict[int, int] = {}
+    for word in user_words:
+        for idx in postings.get(word, ()):
+            overlap[idx] = overlap.get(idx, 0) + 1
+
     best_score = 0.0
     best_item = None
-    
-    for item in faq_data:
-        faq_words = item.get("faq_words", set())
-        if not faq_words: continue
-        intersection = len(user_words.intersection(faq_words))
-        union = len(user_words.union(faq_words))
-        score = intersection / union if union > 0 else 0
-        
-        if score > best_score:
-            best_score = score
-            best_item = item
+    best_idx = len(faq_data)
+    # 교집합이 큰 후보부터 검사: Jaccard ≤ 교집합 / |질문 토큰| 이므로 상한이 현재 최고점보다 낮아지면 종료
+    # (동점이면 기존과 같이 앞쪽 FAQ 우선)
+    for idx, intersection in sorted(overlap.items(), key=lambda kv: (-kv[1], kv[0])):
+        if intersection / len(user_words) < best_score:
+            break
+        faq_words = faq_data[idx].get("faq_words", set())
+        score = intersection / (len(user_words) + len(faq_words) - intersection)
+        if score > best_score or (score == best_score and idx < best_idx):
+            best_score, best_item, best_idx = score, faq_data[idx], idx
+            if score == 1.0:
+                break
 
     # 점수 임계값(threshold)을 0.2로 설정
     return best_item if best_score > 0.2 else None
@@ -560,19 +999,51 @@ def find_similar_faq(question: str) -> Optional[Dict[str, Any]]:
 # 5. StateGraph 클래스를 사용해 멀티 에이전트 워크플로우를 정의
 # workflow/graph.py (LangGraph 그래프 정의)
 # =============================================================
-_memory_checkpointer = MemorySaver()
+def _make_checkpointer():
+    """CHECKPOINT_BACKEND 에 따라 대화 상태 체크포인터를 생성합니다."""
+    if CHECKPOINT_BACKEND == "memory":
+        return MemorySaver()
+    return SQLiteCheckpointSaver(
+        constants.KB_DATA_DIR / "checkpoints.db",
+        max_per_thread=CHECKPOINT_MAX_PER_THREAD,
+        ttl=CHECKPOINT_TTL,
+        sweep_interval=CHECKPOINT_SWEEP_INTERVAL,
+    )
+
+_checkpointer = _make_checkpointer()
+
+def _timed_node(name: str, func, afunc=None) -> RunnableLambda:
+    """노드 실행 시간을 sda_graph_node_duration_seconds{node=name} 에 기록하는 노드 래퍼"""
+    def run(state: BotState):
+        with metrics.NODE_LATENCY.time(node=name):
+            return func(state)
+
+    async def arun(state: BotState):
+        with metrics.NODE_LATENCY.time(node=name):
+            return await afunc(state)
+
+    return RunnableLambda(run, afunc=arun if afunc is not None else None, name=name)
+
 def build_graph():
     logger.info("build_graph")
     g = StateGraph(BotState)
-    g.add_node("classify", node_classify)
-    g.add_node("greeting", node_greeting)
-    g.add_node("direct_tool", node_direct_tool)
-    g.add_node("faq", node_faq)
-    g.add_node("rag", node_rag)
-    g.add_node("finalize", node_finalize)
+    # 동기(invoke/stream)와 비동기(ainvoke/astream) 실행 경로를 모두 제공
+    g.add_node("classify", _timed_node("classify", node_classify, anode_classify))
+    g.add_node("greeting", _timed_node("greeting", node_greeting))
+    g.add_node("direct_tool", _timed_node("direct_tool", node_direct_tool))
+    g.add_node("faq", _timed_node("faq", node_faq))
+    g.add_node("rag", _timed_node("rag", node_rag, anode_rag))
+    g.add_node("finalize", _timed_node("finalize", node_finalize))
     
     # 챗봇의 시작점
-    g.set_entry_point("classify")
+    if SPECULATIVE_RETRIEVAL:
+        # classify 와 retrieve 를 같은 단계에서 병렬 실행 → 두 노드가 모두 끝난 뒤 의도에 따라 라우팅
+        g.add_node("retrieve", _timed_node("retrieve", node_retrieve, anode_retrieve))
+        g.add_edge(START, "classify")
+        g.add_edge(START, "retrieve")
+        g.add_edge("retrieve", END)
+    else:
+        g.set_entry_point("classify")
 
     # 의도에 따라 노드 연결
     g.add_conditional_edges(
@@ -603,14 +1074,14 @@ def build_graph():
     )
     g.add_edge("finalize", END)
     
-    return g.compile(checkpointer=_memory_checkpointer)
+    return g.compile(checkpointer=_checkpointer)
 # =============================================================
 # 6. Pipeline Orchestration
 # workflow/pipeline.py (파이프라인 실행)
 # =============================================================
 # LangChain & LangGraph를 활용한 전체 파이프라인 구성
 _graph = None
-def run_graph_pipeline(question: str, session_id: str) -> Dict[str, Any]:
+def run_graph_pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
     # [checklist: 5] LangChain & LangGraph - 멀티턴 대화 (memory) 활용
     """LangGraph 기반의 AI 파이프라인을 실행합니다."""
     global _graph
@@ -636,32 +1107,229 @@ def run_graph_pipeline(question: str, session_id: str) -> Dict[str, Any]:
     if _graph is None: _graph = build_graph()
     
     out = _graph.invoke(
-        input={"question": question, "intent":"", "reply":"", "sources":[], "tool_output":{}},
+        input=_graph_input(question, search),
         config={"configurable": {"thread_id": session_id}, "callbacks": callbacks}
     )
     logger.info("pipeline_out", extra={"extra_data": {"intent": out.get("intent", "")}})
     
     # LangGraph 결과에서 최종 답변과 의도 반환
+    return _graph_result(out)
+
+def _graph_input(question: str, search: Optional[Dict[str, int]] = None) -> BotState:
+    # docs / search 는 매 턴 초기화 (체크포인트에 남은 이전 턴의 검색 결과나 파라미터를 재사용하지 않도록)
+    return {"question": question, "intent":"", "reply":"", "sources":[], "tool_output":{}, "docs": None, "search": search_params(**(search or {}))}
+
+def search_params(nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> Dict[str, int]:
+    """요청별 ANN 검색 파라미터 중 지정된 값만 모은 dict (retriever(k, **params)로 전달)"""
+    return {k: v for k, v in (("nprobe", nprobe), ("ef_search", ef_search)) if v}
+
+def _graph_result(out: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "reply": out.get("reply", "죄송합니다. 답변을 찾지 못했습니다."),
         "intent": out.get("intent", "unsupported"),
         "sources": out.get("sources", []),
     }
 
-def pipeline(question: str, session_id: str) -> Dict[str, Any]:
+async def arun_graph_pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """run_graph_pipeline 의 비동기 버전 (graph.ainvoke → 노드의 ainvoke 경로)"""
+    global _graph
+    logger.info("pipeline_in", extra={"extra_data": {"q": question}})
+    if _graph is None: _graph = build_graph()
+    out = await _graph.ainvoke(
+        input=_graph_input(question, search),
+        config={"configurable": {"thread_id": session_id}}
+    )
+    logger.info("pipeline_out", extra={"extra_data": {"intent": out.get("intent", "")}})
+    return _graph_result(out)
+
+# 답변 토큰을 스트리밍할 노드 (분류 노드의 JSON 출력은 사용자에게 보내지 않음)
+STREAM_TOKEN_NODES = {"rag"}
+
+def stream_graph_pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    LangGraph 노드 진행 상황과 LLM 토큰을 이벤트로 반환합니다.
+    - {"event": "node", "data": {"node": 노드명}}: 노드 실행 완료
+    - {"event": "token", "data": {"text": 토큰}}: 답변 토큰 (STREAM_TOKEN_NODES 에서 호출한 LLM)
+    - {"event": "final", "data": {"reply", "intent", "sources"}}: 최종 결과 (마지막 이벤트)
+    """
+    global _graph
+    logger.info("pipeline_stream_in", extra={"extra_data": {"q": question}})
+    if _graph is None: _graph = build_graph()
+
+    out: Dict[str, Any] = {}
+    for mode, chunk in _graph.stream(
+        input=_graph_input(question, search),
+        config={"configurable": {"thread_id": session_id}},
+        stream_mode=["updates", "messages"],
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") in STREAM_TOKEN_NODES and isinstance(message.content, str) and message.content:
+                yield {"event": "token", "data": {"text": message.content}}
+        else:
+            for node, update in chunk.items():
+                if update:
+                    out.update(update)
+                yield {"event": "node", "data": {"node": node}}
+    logger.info("pipeline_stream_out", extra={"extra_data": {"intent": out.get("intent", "")}})
+    yield {"event": "final", "data": _graph_result(out)}
+
+async def astream_graph_pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """stream_graph_pipeline 의 비동기 버전 (graph.astream)"""
+    global _graph
+    logger.info("pipeline_stream_in", extra={"extra_data": {"q": question}})
+    if _graph is None: _graph = build_graph()
+
+    out: Dict[str, Any] = {}
+    async for mode, chunk in _graph.astream(
+        input=_graph_input(question, search),
+        config={"configurable": {"thread_id": session_id}},
+        stream_mode=["updates", "messages"],
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") in STREAM_TOKEN_NODES and isinstance(message.content, str) and message.content:
+                yield {"event": "token", "data": {"text": message.content}}
+        else:
+            for node, update in chunk.items():
+                if update:
+                    out.update(update)
+                yield {"event": "node", "data": {"node": node}}
+    logger.info("pipeline_stream_out", extra={"extra_data": {"intent": out.get("intent", "")}})
+    yield {"event": "final", "data": _graph_result(out)}
+
+# 응답 캐시: 유사 질문 판별용 임베딩도 디스크 임베딩 캐시를 거치므로 RAG 검색의 질의 임베딩과 공유됨
+_response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=RESPONSE_CACHE_TTL,
+    similarity=RESPONSE_CACHE_SIMILARITY,
+    embed_fn=lambda text: _make_embedder().embed_query(text),
+    cacheable_intents=RESPONSE_CACHE_INTENTS,
+)
+
+def response_cache_stats() -> Dict[str, Any]:
+    return _response_cache.stats()
+
+def _response_cache_metrics():
+    """/metrics 수집 시점의 응답 캐시 조회 결과 (hit/miss) 카운터"""
+    stats = _response_cache.stats()
+    yield ("sda_response_cache_lookups_total", "counter", "응답 캐시 조회 결과", [
+        ({"result": "exact_hit"}, stats["exact_hits"]),
+        ({"result": "semantic_hit"}, stats["semantic_hits"]),
+        ({"result": "miss"}, stats["misses"]),
+        ({"result": "bypassed"}, stats["bypassed"]),
+    ])
+    yield ("sda_response_cache_entries", "gauge", "응답 캐시 항목 수", [({}, stats["size"])])
+
+metrics.REGISTRY.register_collector(_response_cache_metrics)
+
+# 파이프라인 오류 시 응답 (동기/비동기/스트리밍 경로 공용, 호출마다 dict()로 복사하여 사용)
+_SYSTEM_ERROR_RESULT = {
+    "reply": "죄송합니다. 시스템 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.",
+    "intent": "system_error",
+    "sources": []
+}
+
+def stream_pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    pipeline()의 스트리밍 버전 (/chat/stream)
+    응답 캐시 적중, 폴백 모드, 오류 시에는 final 이벤트 하나만 반환합니다.
+    """
+    if not AZURE_AVAILABLE:
+        yield {"event": "final", "data": pipeline(question, session_id)}
+        return
+    use_cache = _use_response_cache(search)
+    try:
+        generation = index_store.current_generation() if use_cache else None
+        if use_cache:
+            cached = _response_cache.get(question, generation)
+            if cached is not None:
+                logger.info("response_cache_hit", extra={"extra_data": {"intent": cached.get("intent", "")}})
+                yield {"event": "final", "data": cached}
+                return
+        for event in stream_graph_pipeline(question, session_id, search):
+            if event["event"] == "final" and use_cache:
+                _response_cache.put(question, generation, event["data"])
+            yield event
+    except Exception as e:
+        logger.error(f"스트리밍 파이프라인 실행 중 오류 발생: {e}")
+        yield {"event": "final", "data": dict(_SYSTEM_ERROR_RESULT)}
+
+def _use_response_cache(search: Optional[Dict[str, int]]) -> bool:
+    """검색 파라미터를 요청별로 지정하면 기본 설정으로 만든 캐시 답변을 재사용하거나 덮어쓰지 않음"""
+    return RESPONSE_CACHE_ENABLED and not search
+
+def _cache_lookup(question: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """(CURRENT 세대, 캐시된 응답) - 포인터 파일 읽기와 유사도 캐시의 질의 임베딩이 동기 작업이므로 비동기 경로에서는 스레드에서 실행"""
+    generation = index_store.current_generation()
+    return generation, _response_cache.get(question, generation)
+
+async def astream_pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """stream_pipeline 의 비동기 버전 (/chat/stream)"""
+    if not AZURE_AVAILABLE:
+        # 폴백 모드는 형태소 분석(JVM) 등 동기 작업이므로 스레드에서 실행
+        yield {"event": "final", "data": await asyncio.to_thread(pipeline, question, session_id)}
+        return
+    use_cache = _use_response_cache(search)
+    try:
+        generation = None
+        if use_cache:
+            generation, cached = await asyncio.to_thread(_cache_lookup, question)
+            if cached is not None:
+                logger.info("response_cache_hit", extra={"extra_data": {"intent": cached.get("intent", "")}})
+                yield {"event": "final", "data": cached}
+                return
+        async for event in astream_graph_pipeline(question, session_id, search):
+            if event["event"] == "final" and use_cache:
+                await asyncio.to_thread(_response_cache.put, question, generation, event["data"])
+            yield event
+    except Exception as e:
+        logger.error(f"스트리밍 파이프라인 실행 중 오류 발생: {e}")
+        yield {"event": "final", "data": dict(_SYSTEM_ERROR_RESULT)}
+
+async def apipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    pipeline()의 비동기 버전
+    graph.ainvoke → 분류/RAG 노드의 ainvoke(Azure 비동기 클라이언트)로 이어지므로
+    요청이 스레드풀 스레드를 점유하지 않고, 동시 요청 수는 상위 API 할당량으로만 제한됩니다.
+    search: 요청별 ANN 검색 파라미터 (search_params(nprobe=..., ef_search=...))
+    """
+    if not AZURE_AVAILABLE:
+        return await asyncio.to_thread(pipeline, question, session_id)
+    try:
+        if not _use_response_cache(search):
+            return await arun_graph_pipeline(question, session_id, search)
+        generation, cached = await asyncio.to_thread(_cache_lookup, question)
+        if cached is not None:
+            logger.info("response_cache_hit", extra={"extra_data": {"intent": cached.get("intent", "")}})
+            return cached
+        out = await arun_graph_pipeline(question, session_id)
+        await asyncio.to_thread(_response_cache.put, question, generation, out)
+        return out
+    except Exception as e:
+        logger.error(f"주요 파이프라인 실행 중 오류 발생: {e}. 폴백 모드로 전환합니다.")
+        return dict(_SYSTEM_ERROR_RESULT)
+
+def pipeline(question: str, session_id: str, search: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
     """
     Azure 연결 상태에 따라 적절한 파이프라인으로 요청을 라우팅합니다.
     """
     if AZURE_AVAILABLE:
         try:
-            return run_graph_pipeline(question, session_id)
+            if not _use_response_cache(search):
+                return run_graph_pipeline(question, session_id, search)
+            # 디스크의 CURRENT 포인터 기준: 다른 워커가 Sync 해도 이전 세대 답변을 재사용하지 않음
+            generation = index_store.current_generation()
+            cached = _response_cache.get(question, generation)
+            if cached is not None:
+                logger.info("response_cache_hit", extra={"extra_data": {"intent": cached.get("intent", "")}})
+                return cached
+            out = run_graph_pipeline(question, session_id)
+            _response_cache.put(question, generation, out)
+            return out
         except Exception as e:
             logger.error(f"주요 파이프라인 실행 중 오류 발생: {e}. 폴백 모드로 전환합니다.")
-            return {
-                "reply": "죄송합니다. 시스템 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.",
-                "intent": "system_error",
-                "sources": []
-            }
+            return dict(_SYSTEM_ERROR_RESULT)
     else:
         # 폴백 모드
         logger.info("풀백 파이프라인")
@@ -0,0 +1,360 @@
+# platform_service/db/checkpoint.py
+
+"""
+checkpoint.py
+LangGraph 체크포인트를 SQLite DB에 저장하는 모듈 (MemorySaver 대체)
+- kb_data/checkpoints.db 에 저장하므로 재시작 후에도 대화 상태가 유지되고, 여러 워커 프로세스가 공유
+- 스레드(세션)별 최근 N개 체크포인트만 유지 (오래된 체크포인트 / pending write 삭제)
+- 마지막 갱신 후 TTL이 지난 세션은 주기적으로 백그라운드 스레드에서 삭제 (요청 경로의 put()은 대기하지 않음)
+- 체크포인트는 serde(msgpack) 직렬화 후 일정 크기 이상이면 zlib 압축
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time as _time
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint BLOB NOT NULL,
+    metadata BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_updated_at ON checkpoints (updated_at);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    SQLite 기반 LangGraph 체크포인터
+    - max_per_thread: (스레드, 네임스페이스)별로 유지할 최근 체크포인트 수 (0이면 제한 없음)
+    - ttl: 마지막 체크포인트 이후 이 시간(초)이 지난 세션은 삭제 (0이면 만료 없음)
+    - sweep_interval: 만료 세션 정리 주기(초). put() 시점에 주기가 지났으면 백그라운드 스레드에서 수행
+    - compress_min_bytes: 이 크기 이상인 직렬화 결과만 zlib 압축
+    연결은 스레드별로 하나씩 열어 재사용하며, WAL 모드로 여러 프로세스의 동시 읽기/쓰기를 허용합니다.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_per_thread: int = 10,
+        ttl: float = 7 * 24 * 3600,
+        sweep_interval: float = 300.0,
+        compress_min_bytes: int = 512,
+        clock=_time.time,
+    ):
+        super().__init__()
+        self.db_path = Path(db_path)
+        self.max_per_thread = max_per_thread
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.compress_min_bytes = compress_min_bytes
+        self._clock = clock
+        self._local = threading.local()
+        self._setup_lock = threading.Lock()
+        self._ready = False
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+        self._sweep_thread: Optional[threading.Thread] = None
+
+    # ---------------------------------------------------------
+    # 연결 / 직렬화
+    # ---------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._setup_lock:
+                if not self._ready:
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+            self._local.conn = conn
+        return conn
+
+    def _dumps(self, obj: Any) -> bytes:
+        """'{z|r}{serde 타입}\\0{데이터}' 형식 (z: zlib 압축)"""
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= self.compress_min_bytes:
+            return b"z" + type_.encode() + b"\0" + zlib.compress(data, 6)
+        return b"r" + type_.encode() + b"\0" + data
+
+    def _loads(self, blob: bytes) -> Any:
+        type_, _, data = bytes(blob[1:]).partition(b"\0")
+        if blob[:1] == b"z":
+            data = zlib.decompress(data)
+        return self.serde.loads_typed((type_.decode(), data))
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_id: Optional[str],
+               checkpoint: bytes, metadata: bytes) -> CheckpointTuple:
+        writes = self._conn().execute(
+            "SELECT task_id, channel, value FROM checkpoint_writes "
+            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self._loads(checkpoint),
+            metadata=self._loads(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self._loads(value)) for task_id, channel, value in writes],
+        )
+
+    # ---------------------------------------------------------
+    # BaseCheckpointSaver 구현
+    # ---------------------------------------------------------
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            row = self._conn().execute(
+                "SELECT checkpoint_id, parent_checkpoint_id, checkpoint, metadata FROM checkpoints "
+                "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = self._conn().execute(
+                "SELECT checkpoint_id, parent_checkpoint_id, checkpoint, metadata FROM checkpoints "
+                "WHERE thread_id=? AND checkpoint_ns=? ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        if row is None:
+            return None
+        return self._tuple(thread_id, checkpoint_ns, *row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        sql = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata FROM checkpoints"
+        where, params = [], []
+        if config:
+            where.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns=?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                where.append("checkpoint_id=?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            where.append("checkpoint_id<?")
+            params.append(get_checkpoint_id(before))
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY checkpoint_id DESC"
+        rows = self._conn().execute(sql, params).fetchall()
+        for thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint, metadata in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                meta = self._loads(metadata)
+                if not all(meta.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            yield self._tuple(thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint, metadata)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        now = self._clock()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    self._dumps(checkpoint), self._dumps(get_checkpoint_metadata(config, metadata)), now,
+                ),
+            )
+            if self.max_per_thread > 0:
+                self._prune(conn, thread_id, checkpoint_ns)
+        if self.ttl > 0 and now - self._last_sweep >= self.sweep_interval:
+            self._start_sweep(now)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            rows.append((
+                # 일반 write(idx >= 0)는 재실행 시 덮어쓰지 않고, 특수 채널(음수 idx)은 최신 값으로 교체
+                WRITES_IDX_MAP.get(channel, idx) >= 0,
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                 channel, self._dumps(value), task_path),
+            ))
+        conn = self._conn()
+        with conn:
+            for keep_existing, row in rows:
+                verb = "INSERT OR IGNORE" if keep_existing else "INSERT OR REPLACE"
+                conn.execute(f"{verb} INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def delete_thread(self, thread_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM checkpoints WHERE thread_id=?", (thread_id,))
+            conn.execute("DELETE FROM checkpoint_writes WHERE thread_id=?", (thread_id,))
+
+    # 비동기 버전: SQLite 호출은 스레드에서 실행하여 이벤트 루프를 막지 않음
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: [*self.list(config, filter=filter, before=before, limit=limit)])
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # ---------------------------------------------------------
+    # 보존 정책
+    # ---------------------------------------------------------
+    def _prune(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str) -> None:
+        """최근 max_per_thread 개보다 오래된 체크포인트와 그 pending write 삭제"""
+        row = conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.max_per_thread - 1),
+        ).fetchone()
+        if row is None:
+            return
+        oldest_kept = row[0]
+        conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id<?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        )
+        conn.execute(
+            "DELETE FROM checkpoint_writes WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id<?",
+            (thread_id, checkpoint_ns, oldest_kept),
+        )
+
+    def _start_sweep(self, now: float) -> None:
+        """만료 세션 정리를 백그라운드 스레드로 시작합니다 (이미 실행 중이면 건너뜀)."""
+        with self._sweep_lock:
+            if self._sweep_thread is not None and self._sweep_thread.is_alive():
+                return
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+            self._sweep_thread = threading.Thread(target=self._run_sweep, args=(now,), name="checkpoint-sweep", daemon=True)
+            self._sweep_thread.start()
+
+    def _run_sweep(self, now: float) -> None:
+        try:
+            self.sweep(now)
+        except Exception as e:
+            logger.warning(f"만료 체크포인트 정리 실패: {e}")
+        finally:
+            self.close()  # 정리 스레드 전용 연결
+
+    def wait_for_sweep(self, timeout: Optional[float] = None) -> bool:
+        """진행 중인 정리 작업이 끝날 때까지 대기합니다 (테스트 / 종료 시 사용)."""
+        thread = self._sweep_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """TTL이 지난 세션을 삭제하고 삭제한 세션 수를 반환합니다."""
+        now = self._clock() if now is None else now
+        self._last_sweep = now
+        conn = self._conn()
+        with conn:
+            expired = [r[0] for r in conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(updated_at) < ?",
+                (now - self.ttl,),
+            )]
+            for thread_id in expired:
+                conn.execute("DELETE FROM checkpoints WHERE thread_id=?", (thread_id,))
+                conn.execute("DELETE FROM checkpoint_writes WHERE thread_id=?", (thread_id,))
+        if expired:
+            logger.info("checkpoint_sessions_expired", extra={"extra_data": {"count": len(expired)}})
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        threads, checkpoints = self._conn().execute(
+            "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+        ).fetchone()
+        return {"threads": threads, "checkpoints": checkpoints}
+
+    def close(self) -> None:
+        """현재 스레드의 연결을 닫습니다."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -3,11 +3,26 @@
 """
 history.py
 대화 기록을 SQLite DB에 저장하고 조회하는 모듈
+- 스레드별 연결을 재사용 (요청마다 connect 하지 않음)
+- WAL 저널 + synchronous=NORMAL + 페이지 캐시 설정으로 읽기와 쓰기가 서로 막지 않음
+- save_message는 큐에 넣고 바로 반환하며, 백그라운드 writer 스레드가 모아서 한 트랜잭션으로 커밋(group commit)
+- load_messages는 대기 중인 쓰기를 먼저 반영한 뒤 조회 (방금 저장한 메시지도 바로 조회 가능)
+- 스키마는 PRAGMA user_version 기반 마이그레이션으로 관리 ((session_id, id) 복합 인덱스 등)
+- 세션 조회는 before_id 커서 기반(keyset) 페이지네이션 → 테이블 크기와 무관하게 O(log n)
+- 오래된 메시지는 archive_messages()로 월별 파티션 테이블(chat_history_YYYYMM)로 이동
+- 메시지 본문은 트리거로 동기화되는 FTS5(trigram) 색인으로 키워드 검색 (search_messages)
 """
+import argparse
+import atexit
+import logging
+import os
+import queue
+import re
 import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any
-import logging
+from typing import Any, Dict, List, Optional, Tuple
 
 from platform_service import constants
 
@@ -15,56 +30,336 @@ from platform_service import constants
 logger = logging.getLogger(__name__)
 DB_PATH = constants.KB_DATA_DIR / "history.db"
 
+# 한 번에 커밋할 최대 메시지 수 / 첫 메시지 이후 추가 메시지를 기다리는 시간(초)
+HISTORY_WRITE_BATCH = int(os.getenv("HISTORY_WRITE_BATCH", "256"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.02"))
+HISTORY_CACHE_KB = int(os.getenv("HISTORY_CACHE_KB", "8192"))
+
 # =============================================================
-# DB 초기화
+# 연결 풀 (스레드별 연결)
 # =============================================================
+_local = threading.local()
+
+
+def _open(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{HISTORY_CACHE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _connect() -> sqlite3.Connection:
+    """현재 스레드의 연결을 반환합니다 (DB_PATH가 바뀌면 새로 연결)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = _local.conn = _open(DB_PATH)
+        _local.path = DB_PATH
+    return conn
+
+# =============================================================
+# 백그라운드 writer (group commit)
+# =============================================================
+class _HistoryWriter:
+    """
+    save_message 요청을 큐로 받아 모아서 커밋하는 단일 writer 스레드
+    - 메시지가 들어오면 HISTORY_FLUSH_INTERVAL 동안(또는 HISTORY_WRITE_BATCH 개까지) 더 모아 executemany 1회로 저장
+    - flush()는 호출 시점까지 큐에 들어온 메시지가 커밋될 때까지 대기
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Tuple[str, str, str]]]" = queue.Queue()
+        self._cond = threading.Condition()
+        self._enqueued = 0
+        self._done = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, row: Tuple[str, str, str]) -> None:
+        self._ensure_started()
+        with self._cond:
+            self._enqueued += 1
+        self._queue.put(row)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        with self._cond:
+            target = self._enqueued
+            return self._cond.wait_for(lambda: self._done >= target, timeout=timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = [first], False
+            try:
+                while len(batch) < HISTORY_WRITE_BATCH:
+                    row = self._queue.get(timeout=HISTORY_FLUSH_INTERVAL)
+                    if row is None:
+                        stop = True
+                        break
+                    batch.append(row)
+            except queue.Empty:
+                pass
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[str, str, str]]) -> None:
+        try:
+            conn = _connect()
+            with conn:
+                conn.executemany("INSERT INTO chat_history (session_id, role, message) VALUES (?, ?, ?)", batch)
+        except Exception as e:
+            logger.error(f"[History] 메시지 저장 실패 ({len(batch)}건): {e}")
+        finally:
+            with self._cond:
+                self._done += len(batch)
+                self._cond.notify_all()
+
+
+_writer = _HistoryWriter()
+
+# =============================================================
+# DB 초기화 (스키마 마이그레이션) / 종료
+# =============================================================
+# user_version = 적용된 마이그레이션 수. 새 마이그레이션은 목록 끝에만 추가합니다.
+_MIGRATIONS = [
+    # 1: 기본 테이블
+    """
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 2: 세션별 최신순 조회 / keyset 페이지네이션용 복합 인덱스
+    "CREATE INDEX IF NOT EXISTS idx_chat_history_session_id ON chat_history (session_id, id)",
+    # 3: 본문 전문 검색 색인 (trigram: 형태소 분석 없이 한국어 부분 문자열 검색), 기존 행 색인
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS chat_history_fts USING fts5(
+        message, content='chat_history', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS chat_history_fts_ai AFTER INSERT ON chat_history BEGIN
+        INSERT INTO chat_history_fts (rowid, message) VALUES (new.id, new.message);
+    END;
+    CREATE TRIGGER IF NOT EXISTS chat_history_fts_ad AFTER DELETE ON chat_history BEGIN
+        INSERT INTO chat_history_fts (chat_history_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    END;
+    CREATE TRIGGER IF NOT EXISTS chat_history_fts_au AFTER UPDATE OF message ON chat_history BEGIN
+        INSERT INTO chat_history_fts (chat_history_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO chat_history_fts (rowid, message) VALUES (new.id, new.message);
+    END;
+    INSERT INTO chat_history_fts (chat_history_fts) VALUES ('rebuild');
+    """,
+]
+
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        with conn:
-            conn.execute("""
-            CREATE TABLE IF NOT EXISTS chat_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                role TEXT NOT NULL,
-                message TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-    finally:
+    conn = _connect()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, sql in enumerate(_MIGRATIONS[version:], start=version + 1):
+        # 여러 문장으로 된 마이그레이션도 버전 갱신과 함께 하나의 트랜잭션으로 적용
+        try:
+            conn.executescript(f"BEGIN; {sql}; PRAGMA user_version = {number}; COMMIT;")
+        except sqlite3.Error:
+            # 실패한 문장 이후 COMMIT 이 실행되지 않으므로, 스레드 연결이 열린 트랜잭션에 남지 않도록 되돌림
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error("history_migration_failed", extra={"extra_data": {"version": number}})
+            raise
+        logger.info("history_migrated", extra={"extra_data": {"version": number}})
+
+
+def close_db():
+    """대기 중인 메시지를 모두 저장하고 writer 스레드와 현재 스레드의 연결을 닫습니다."""
+    _writer.flush()
+    _writer.stop()
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
         conn.close()
+        _local.conn = None
+
+
+atexit.register(_writer.flush)
 
 # =============================================================
 # 메시지 저장
 # =============================================================
 def save_message(session_id: str, role: str, message: str):
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        with conn:
-            conn.execute(
-                "INSERT INTO chat_history (session_id, role, message) VALUES (?, ?, ?)",
-                (session_id, role, message)
-            )
-    except Exception as e:
-        logger.error(f"[History] 메시지 저장 실패: {e}")
-    finally:
-        conn.close()
+    """메시지를 writer 큐에 넣고 바로 반환합니다 (DB 커밋은 백그라운드에서)."""
+    _writer.submit((session_id, role, message))
+
+
+def flush(timeout: float = 5.0) -> bool:
+    """지금까지 저장 요청한 메시지가 커밋될 때까지 대기합니다."""
+    return _writer.flush(timeout)
 
 # =============================================================
 # 메시지 조회
 # =============================================================
-def load_messages(session_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+def load_messages(session_id: str, limit: int = 50, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    세션 메시지를 최신순으로 조회합니다.
+    before_id를 주면 그 id보다 오래된 메시지만 조회합니다 (이전 페이지의 마지막 id를 커서로 사용).
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT role, message, created_at FROM chat_history WHERE session_id=? ORDER BY id DESC LIMIT ?",
-            (session_id, limit)
-        )
-        rows = cursor.fetchall()
-        return [{"role": r, "message": m, "created_at": t} for r, m, t in rows]
+        _writer.flush()
+        sql = "SELECT id, role, message, created_at FROM chat_history WHERE session_id=?"
+        params: List[Any] = [session_id]
+        if before_id is not None:
+            sql += " AND id<?"
+            params.append(before_id)
+        rows = _connect().execute(sql + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        return [{"id": i, "role": r, "message": m, "created_at": t} for i, r, m, t in rows]
     except Exception as e:
         logger.error(f"[History] 메시지 로드 실패: {e}")
         return []
-    finally:
-        conn.close()
+
+# =============================================================
+# 전문 검색 (FTS5 trigram)
+# =============================================================
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search_messages(query: str, limit: int = 20, offset: int = 0, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    메시지 본문을 키워드로 검색합니다 (공백으로 구분한 모든 키워드 포함, AND).
+    - 3글자 이상 키워드: trigram 색인 MATCH, bm25 관련도 순 정렬 + 일치 부분 snippet
+    - 2글자 이하 키워드(예: '비번'): trigram으로 색인되지 않으므로 LIKE 조건으로 추가 필터
+      (모든 키워드가 짧으면 색인 없이 최신순 스캔)
+    보관(archive_messages)된 메시지는 검색 대상에서 제외됩니다.
+    """
+    terms = [t for t in query.split() if t]
+    if not terms:
+        return []
+    long_terms = [t for t in terms if len(t) >= 3]
+    short_terms = [t for t in terms if len(t) < 3]
+    where, params = [], []
+    if long_terms:
+        where.append("chat_history_fts MATCH ?")
+        params.append(" ".join(_fts_phrase(t) for t in long_terms))
+        columns = "bm25(chat_history_fts), snippet(chat_history_fts, 0, '[', ']', '…', 12)"
+        order = "bm25(chat_history_fts), h.id DESC"
+    else:
+        columns = "0.0, h.message"
+        order = "h.id DESC"
+    for t in short_terms:
+        where.append("h.message LIKE ? ESCAPE '\\'")
+        params.append("%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    if session_id is not None:
+        where.append("h.session_id=?")
+        params.append(session_id)
+    sql = (
+        f"SELECT h.id, h.session_id, h.role, h.message, h.created_at, {columns} "
+        "FROM chat_history_fts JOIN chat_history h ON h.id = chat_history_fts.rowid "
+        f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ? OFFSET ?"
+    )
+    try:
+        _writer.flush()
+        rows = _connect().execute(sql, (*params, limit, offset)).fetchall()
+    except Exception as e:
+        logger.error(f"[History] 메시지 검색 실패: {e}")
+        return []
+    return [
+        {"id": i, "session_id": sid, "role": r, "message": m, "created_at": t, "score": round(-score, 4), "snippet": snip}
+        for i, sid, r, m, t, score, snip in rows
+    ]
+
+# =============================================================
+# 보관(archival): 오래된 메시지를 월별 파티션 테이블로 이동
+# =============================================================
+_PARTITION_RE = re.compile(r"^chat_history_\d{6}$")
+
+
+def _partition_table(conn: sqlite3.Connection, month: str) -> str:
+    table = f"chat_history_{month}"
+    if not _PARTITION_RE.match(table):
+        raise ValueError(f"잘못된 파티션 이름: {table}")
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at TIMESTAMP
+    )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_session_id ON {table} (session_id, id)")
+    return table
+
+
+def list_partitions() -> List[str]:
+    rows = _connect().execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'chat_history_%' ORDER BY name"
+    ).fetchall()
+    return [r[0] for r in rows if _PARTITION_RE.match(r[0])]
+
+
+def archive_messages(older_than_days: int = 90, batch_size: int = 5000, now: Optional[datetime] = None) -> int:
+    """
+    created_at이 older_than_days일보다 오래된 메시지를 월별 파티션 테이블로 옮기고 옮긴 건수를 반환합니다.
+    id 순서(= 저장 순서)로 앞에서부터 batch_size건씩 처리하므로 전체 테이블 스캔이나 긴 쓰기 잠금이 없습니다.
+    """
+    _writer.flush()
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+    conn = _connect()
+    moved = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, session_id, role, message, created_at FROM chat_history ORDER BY id LIMIT ?", (batch_size,)
+        ).fetchall()
+        old = []
+        for row in rows:
+            if row[4] is None or str(row[4]) >= cutoff:
+                break
+            old.append(row)
+        if not old:
+            break
+        by_month: Dict[str, List[Tuple]] = {}
+        for row in old:
+            by_month.setdefault(str(row[4])[:7].replace("-", ""), []).append(row)
+        with conn:
+            for month, month_rows in by_month.items():
+                table = _partition_table(conn, month)
+                conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?)", month_rows)
+            conn.execute("DELETE FROM chat_history WHERE id<=?", (old[-1][0],))
+        moved += len(old)
+        if len(old) < len(rows) or len(rows) < batch_size:
+            break
+    if moved:
+        logger.info("history_archived", extra={"extra_data": {"moved": moved, "cutoff": cutoff}})
+    return moved
+
+
+if __name__ == "__main__":
+    # 예) python -m platform_service.db.history --archive-days 90
+    parser = argparse.ArgumentParser(description="오래된 대화 기록을 월별 파티션 테이블로 이동")
+    parser.add_argument("--archive-days", type=int, default=90)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    init_db()
+    print(f"archived: {archive_messages(args.archive_days, args.batch_size)}")
+    close_db()
@@ -0,0 +1,444 @@
+# platform_service/embeddings.py
+
+"""
+embeddings.py
+임베딩 디스크 캐시 & 배치 스케줄러 모듈
+- (배포명, 텍스트 해시) 기준으로 임베딩 벡터를 float32 배열 파일 + 키 인덱스 파일에 저장
+- 변경 없는 코퍼스 재빌드, 반복 질문 시 임베딩 API 호출을 생략
+  (문서 임베딩만 디스크에 저장하고, 질의 임베딩은 프로세스 메모리의 LRU(크기 제한)에만 보관)
+- 대량 임베딩은 배치 / 동시성 제한 / 토큰(TPM) 페이싱 / 재시도로 나누어 요청하고,
+  완료된 배치는 즉시 캐시에 기록(체크포인트)하여 중단 후 재실행 시 이어서 진행
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time as _time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl  # 여러 워커 프로세스가 같은 캐시 파일에 append 할 때 사용 (POSIX)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def text_key(text: str) -> str:
+    """캐시 키: 텍스트 SHA-256 앞 32자리(128bit)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+# =============================================================
+# 디스크 캐시 (float32 배열 + 키 인덱스)
+# =============================================================
+class EmbeddingCache:
+    """
+    배포(namespace) 단위의 append-only 임베딩 캐시.
+    - {namespace}.f32  : 벡터를 행 단위로 이어 붙인 float32 바이너리
+    - {namespace}.keys : 행 순서대로 기록한 텍스트 해시 (한 줄에 하나)
+    - {namespace}.json : 차원 수 등 메타 정보
+    벡터를 먼저 쓰고 키를 나중에 쓰므로, 중간에 중단되어도 키가 있는 행은 항상 유효합니다.
+    """
+
+    def __init__(self, cache_dir: Path, namespace: str):
+        safe = re.sub(r"[^0-9A-Za-z_.-]", "_", namespace)
+        self.cache_dir = Path(cache_dir)
+        self.vec_path = self.cache_dir / f"{safe}.f32"
+        self.key_path = self.cache_dir / f"{safe}.keys"
+        self.meta_path = self.cache_dir / f"{safe}.json"
+        self.lock_path = self.cache_dir / f"{safe}.lock"
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._n_rows = 0              # keys 파일의 전체 행 수 (= 벡터 행 수)
+        self._key_offset = 0          # 이미 읽은 keys 파일 바이트 위치
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    # ---------------------------------------------------------
+    # 로드 / 동기화
+    # ---------------------------------------------------------
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """다른 프로세스의 쓰기(벡터 → 키 append)와 겹치지 않도록 lock 파일에 배타 잠금"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        if self.meta_path.exists():
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f).get("dim")
+        self._read_new_keys()
+        if self.dim and self.vec_path.exists() and self.vec_path.stat().st_size > self._n_rows * self.dim * 4:
+            # 키 없이 남은 벡터 행(쓰기 중단)은 잘라내어 이후 append 정렬을 보장.
+            # 다른 프로세스가 벡터만 쓰고 키는 아직 쓰지 않은 상태일 수 있으므로 잠금 후 키를 다시 읽고 판단
+            with self._file_lock():
+                self._read_new_keys()
+                expected = self._n_rows * self.dim * 4
+                if self.vec_path.stat().st_size > expected:
+                    with open(self.vec_path, "r+b") as f:
+                        f.truncate(expected)
+        if self._rows:
+            logger.info(f"임베딩 캐시 로드: {self.vec_path.name} ({len(self._rows)}건)")
+
+    def _read_new_keys(self) -> None:
+        """다른 프로세스가 추가한 키까지 반영 (마지막으로 읽은 위치부터 읽음)"""
+        if not self.key_path.exists():
+            return
+        with open(self.key_path, "rb") as f:
+            f.seek(self._key_offset)
+            data = f.read()
+        # 마지막 줄이 개행 없이 끝났다면(쓰기 중단) 다음 동기화까지 보류
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("ascii").splitlines():
+            # 중복 키(드문 경합)도 행 번호는 차지하므로 첫 행만 사용
+            self._rows.setdefault(line, self._n_rows)
+            self._n_rows += 1
+        self._key_offset += len(complete)
+        self._mmap = None
+
+    def _vectors(self) -> Optional[np.memmap]:
+        if self._mmap is None and self.dim and self._n_rows and self.vec_path.exists():
+            self._mmap = np.memmap(self.vec_path, dtype=np.float32, mode="r", shape=(self._n_rows, self.dim))
+        return self._mmap
+
+    # ---------------------------------------------------------
+    # 조회 / 저장
+    # ---------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        with self._lock:
+            vecs = self._vectors()
+            out: List[Optional[List[float]]] = []
+            for k in keys:
+                row = self._rows.get(k)
+                out.append(vecs[row].tolist() if row is not None and vecs is not None else None)
+            return out
+
+    def put_many(self, keys: List[str], vectors: List[List[float]]) -> None:
+        if not keys:
+            return
+        arr = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            self._read_new_keys()
+            if self.dim is None:
+                self.dim = int(arr.shape[1])
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif arr.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원 불일치: {arr.shape[1]} != {self.dim}")
+            new = [(k, i) for i, k in enumerate(keys) if k not in self._rows]
+            if not new:
+                return
+            with open(self.vec_path, "ab") as f:
+                f.write(arr[[i for _, i in new]].tobytes())
+            lines = "".join(f"{k}\n" for k, _ in new).encode("ascii")
+            with open(self.key_path, "ab") as f:
+                f.write(lines)
+            for k, _ in new:
+                self._rows[k] = self._n_rows
+                self._n_rows += 1
+            self._key_offset += len(lines)
+            self._mmap = None
+
+
+# 같은 캐시 파일을 여러 객체가 열지 않도록 프로세스 단위로 공유
+_caches: Dict[Path, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(cache_dir: Path, namespace: str) -> EmbeddingCache:
+    key = Path(cache_dir).resolve() / namespace
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(cache_dir, namespace)
+        return _caches[key]
+
+
+# =============================================================
+# 임베딩 스케줄러 (배치 / 동시성 / TPM 페이싱 / 재시도)
+# =============================================================
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사치: UTF-8 4바이트당 1토큰 (한글 1자 ≈ 0.75토큰)"""
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def _is_retryable(e: Exception) -> bool:
+    """429(Rate limit), 5xx, 타임아웃/연결 오류는 재시도 대상"""
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(e).__name__
+    return any(s in name for s in ("RateLimit", "Timeout", "Connection"))
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    """429 응답의 대기 시간(초): Azure 의 retry-after-ms 우선, 없으면 Retry-After"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        try:
+            return float(headers.get(name)) / scale
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class TokenBucket:
+    """분당 토큰 한도(TPM)를 초당 균등하게 소비하도록 요청을 지연시키는 토큰 버킷"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = _time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int) -> None:
+        n = min(float(n), self.capacity)
+        while True:
+            with self._lock:
+                now = _time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            _time.sleep(wait)
+
+
+class EmbeddingScheduler:
+    """
+    대량 텍스트를 batch_size 단위로 나누어 최대 max_concurrency개까지 동시에 임베딩합니다.
+    - tokens_per_minute > 0 이면 토큰 버킷으로 요청 속도를 조절 (429 폭주 방지)
+    - 재시도 가능한 오류는 지수 백오프(+지터, Retry-After 우선)로 max_retries회까지 재시도
+    - 대화 요청 경로의 질의 임베딩은 별도의 짧은 재시도 예산(query_max_retries, 대기 최대 query_max_delay초) 사용
+    - 완료된 배치마다 on_batch(시작 위치, 벡터 목록)를 호출하여 체크포인트를 남김
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        tokens_per_minute: int = 0,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        query_max_retries: int = 2,
+        query_max_delay: float = 2.0,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.query_max_retries = query_max_retries
+        self.query_max_delay = query_max_delay
+
+    def _budget(self, query: bool) -> Tuple[int, float]:
+        return (self.query_max_retries, self.query_max_delay) if query else (self.max_retries, self.max_delay)
+
+    def _delay(self, e: Exception, attempt: int, max_delay: float) -> float:
+        delay = min(max_delay, _retry_after(e) or self.base_delay * (2 ** attempt))
+        return delay * (1 + random.random() * 0.25)
+
+    def with_retry(self, fn: Callable[[], T], query: bool = False) -> T:
+        """
+        재시도 가능한 오류에 대해 지수 백오프로 fn을 다시 호출합니다. (페이싱 없음)
+        query=True 이면 질의 임베딩용 짧은 재시도 예산을 사용합니다.
+        """
+        max_retries, max_delay = self._budget(query)
+        for attempt in range(max_retries + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    raise
+                delay = self._delay(e, attempt, max_delay)
+                logger.warning(f"임베딩 요청 재시도 {attempt + 1}/{max_retries} ({delay:.1f}s 후): {e}")
+                _time.sleep(delay)
+
+    async def awith_retry(self, afn: Callable[[], Awaitable[T]], query: bool = False) -> T:
+        """with_retry 의 비동기 버전 (이벤트 루프를 막지 않도록 asyncio.sleep 으로 대기)"""
+        max_retries, max_delay = self._budget(query)
+        for attempt in range(max_retries + 1):
+            try:
+                return await afn()
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    raise
+                delay = self._delay(e, attempt, max_delay)
+                logger.warning(f"임베딩 요청 재시도 {attempt + 1}/{max_retries} ({delay:.1f}s 후): {e}")
+                await asyncio.sleep(delay)
+
+    def _embed_batch(self, texts: List[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        if self.bucket is not None:
+            self.bucket.acquire(sum(estimate_tokens(t) for t in texts))
+        return self.with_retry(lambda: embed_fn(texts))
+
+    def run(
+        self,
+        texts: List[str],
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        on_batch: Optional[Callable[[int, List[List[float]]], None]] = None,
+    ) -> List[List[float]]:
+        starts = list(range(0, len(texts), self.batch_size))
+        results: List[Optional[List[List[float]]]] = [None] * len(starts)
+
+        def work(i: int) -> None:
+            start = starts[i]
+            vectors = self._embed_batch(texts[start:start + self.batch_size], embed_fn)
+            if on_batch is not None:
+                on_batch(start, vectors)
+            results[i] = vectors
+
+        if len(starts) <= 1 or self.max_concurrency == 1:
+            for i in range(len(starts)):
+                work(i)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                # 하나라도 실패하면 예외 전파 (완료된 배치는 이미 체크포인트됨)
+                for fut in [pool.submit(work, i) for i in range(len(starts))]:
+                    fut.result()
+        return [v for batch in results for v in batch]
+
+
+# =============================================================
+# 캐시 적용 Embeddings 래퍼
+# =============================================================
+class CachedEmbeddings(Embeddings):
+    """
+    캐시를 먼저 조회하고, 없는 텍스트만 실제 임베딩 모델에 요청합니다.
+    - 문서 임베딩(embed_documents): 디스크 캐시에 저장 (코퍼스 크기로 제한됨)
+    - 질의 임베딩(embed_query): 디스크 캐시를 조회만 하고, 새 결과는 최근 query_cache_size개만 메모리 LRU에 보관
+      (사용자 질문마다 캐시 파일이 끝없이 커지거나 요청 경로에서 파일 I/O + flock이 발생하지 않도록)
+    같은 질의가 동시에 요청되면(의도 분류와 추측 검색 병렬 실행 등) API는 한 번만 호출하고 결과를 공유합니다.
+    """
+
+    def __init__(self, inner: Embeddings, cache: EmbeddingCache, scheduler: Optional[EmbeddingScheduler] = None,
+                 query_cache_size: int = 4096):
+        self.inner = inner
+        self.cache = cache
+        self.scheduler = scheduler
+        self.query_cache_size = query_cache_size
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[str, asyncio.Future] = {}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [text_key(t) for t in texts]
+        cached = self.cache.get_many(keys)
+        # 캐시 미스 텍스트만 (중복 제거 후) 임베딩 요청
+        missing: Dict[str, str] = {}
+        for k, t, v in zip(keys, texts, cached):
+            if v is None:
+                missing.setdefault(k, t)
+        if missing:
+            miss_keys, miss_texts = list(missing), list(missing.values())
+            if self.scheduler is not None:
+                # 배치가 끝날 때마다 캐시에 기록 → 중단되어도 완료된 배치는 재사용
+                vectors = self.scheduler.run(
+                    miss_texts,
+                    self.inner.embed_documents,
+                    on_batch=lambda start, vecs: self.cache.put_many(miss_keys[start:start + len(vecs)], vecs),
+                )
+            else:
+                vectors = self.inner.embed_documents(miss_texts)
+                self.cache.put_many(miss_keys, vectors)
+            fresh = dict(zip(miss_keys, vectors))
+            cached = [v if v is not None else fresh[k] for k, v in zip(keys, cached)]
+        logger.debug(f"임베딩 캐시: hit={len(texts) - len(missing)}, miss={len(missing)}")
+        return cached
+
+    def _cached_query(self, key: str) -> Optional[List[float]]:
+        with self._inflight_lock:
+            vec = self._queries.get(key)
+            if vec is not None:
+                self._queries.move_to_end(key)
+                return vec
+        return self.cache.get_many([key])[0]
+
+    def _remember_query(self, key: str, vec: List[float]) -> None:
+        if self.query_cache_size <= 0:
+            return
+        with self._inflight_lock:
+            self._queries[key] = vec
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = text_key(text)
+        vec = self._cached_query(key)
+        if vec is not None:
+            return vec
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                fut = self._inflight[key] = Future()
+        if pending is not None:
+            return pending.result()
+        try:
+            if self.scheduler is not None:
+                vec = self.scheduler.with_retry(lambda: self.inner.embed_query(text), query=True)
+            else:
+                vec = self.inner.embed_query(text)
+            self._remember_query(key, vec)
+            fut.set_result(vec)
+            return vec
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """질의 임베딩 (비동기): 캐시 미스일 때만 내부 모델의 aembed_query 호출 (디스크 캐시 조회는 스레드에서 실행)"""
+        key = text_key(text)
+        vec = self._queries.get(key)
+        if vec is None:
+            vec = await asyncio.to_thread(self._cached_query, key)
+        if vec is not None:
+            return vec
+        pending = self._ainflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        fut = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            if self.scheduler is not None:
+                vec = await self.scheduler.awith_retry(lambda: self.inner.aembed_query(text), query=True)
+            else:
+                vec = await self.inner.aembed_query(text)
+            self._remember_query(key, vec)
+            fut.set_result(vec)
+            return vec
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # 대기자가 없어도 'exception was never retrieved' 경고가 나지 않도록
+            raise
+        finally:
+            self._ainflight.pop(key, None)
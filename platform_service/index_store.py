@@ -0,0 +1,235 @@
+# platform_service/index_store.py
+
+"""
+index_store.py
+FAISS 인덱스 세대(generation) 관리 모듈
+- Sync는 새 인덱스를 별도 세대 디렉토리에 만들고, CURRENT 포인터를 원자적으로 교체
+- 각 워커의 retriever는 요청 사이에 새 세대로 교체하며, 진행 중인 검색은 이전 세대로 끝까지 수행
+- 읽기 전용 mmap 모드: .faiss 파일을 메모리 매핑하고 청크 텍스트/메타데이터는 컬럼형 파일로 저장하여
+  같은 노드의 여러 워커가 페이지 캐시를 공유 (pickle 역직렬화 없음)
+"""
+import contextlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import threading
+import time as _time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+
+from platform_service import constants
+
+try:
+    import fcntl  # 여러 워커 프로세스의 동시 Sync 방지 (POSIX)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+POINTER_NAME = "CURRENT"
+GENERATIONS_DIR = "generations"
+# 다른 워커가 아직 로드 중일 수 있으므로 현재 세대 외에 최근 세대를 일부 보관
+KEEP_GENERATIONS = int(os.getenv("INDEX_KEEP_GENERATIONS", "3"))
+
+_sync_lock = threading.Lock()
+
+
+def root_dir() -> Path:
+    return constants.INDEX_DIR / constants.INDEX_NAME
+
+
+def generation_path(generation: str) -> Path:
+    return root_dir() / GENERATIONS_DIR / generation
+
+
+def new_generation_id() -> str:
+    """정렬 가능한 세대 ID (밀리초 타임스탬프 + PID)"""
+    return f"{int(_time.time() * 1000):013d}-{os.getpid()}"
+
+
+def current_generation() -> Optional[str]:
+    """CURRENT 포인터가 가리키는 세대 ID (없으면 None)"""
+    try:
+        generation = (root_dir() / POINTER_NAME).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return generation if generation and generation_path(generation).exists() else None
+
+
+def publish(generation: str) -> None:
+    """임시 파일에 쓰고 os.replace로 교체하여 포인터를 원자적으로 전환합니다."""
+    pointer = root_dir() / POINTER_NAME
+    tmp = pointer.with_name(f"{POINTER_NAME}.{os.getpid()}.tmp")
+    tmp.write_text(generation, encoding="utf-8")
+    os.replace(tmp, pointer)
+    logger.info("index_generation_published", extra={"extra_data": {"generation": generation}})
+
+
+def list_generations() -> List[str]:
+    gen_dir = root_dir() / GENERATIONS_DIR
+    if not gen_dir.exists():
+        return []
+    return sorted(p.name for p in gen_dir.iterdir() if p.is_dir())
+
+
+def prune(keep: int = KEEP_GENERATIONS) -> None:
+    """현재 세대와 최근 keep개 세대를 제외한 이전 세대 디렉토리를 삭제합니다."""
+    current = current_generation()
+    generations = list_generations()
+    for generation in generations[:-keep] if keep > 0 else generations:
+        if generation == current:
+            continue
+        shutil.rmtree(generation_path(generation), ignore_errors=True)
+
+
+@contextlib.contextmanager
+def sync_lock() -> Iterator[None]:
+    """프로세스 내(스레드) + 프로세스 간(파일 락) Sync 직렬화"""
+    root_dir().mkdir(parents=True, exist_ok=True)
+    with _sync_lock:
+        with open(root_dir() / "sync.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# =============================================================
+# 읽기 전용 mmap 모드 (컬럼형 docstore)
+# =============================================================
+COLUMNS = ("ids", "texts", "metas")
+
+
+def _column_paths(gen_path: Path, name: str):
+    return gen_path / f"docs.{name}.bin", gen_path / f"docs.{name}.off"
+
+
+def write_columnar_docstore(gen_path: Path, vs: FAISS) -> None:
+    """
+    FAISS 위치(i) 순서대로 청크 ID/텍스트/메타데이터(JSON)를 컬럼별 바이너리 파일로 저장합니다.
+    각 컬럼은 UTF-8 바이트를 이어 붙인 .bin 과 uint64 오프셋 배열(.off, n+1개)로 구성됩니다.
+    """
+    n = vs.index.ntotal
+    files = {name: open(_column_paths(gen_path, name)[0], "wb") for name in COLUMNS}
+    offsets = {name: np.zeros(n + 1, dtype=np.uint64) for name in COLUMNS}
+    try:
+        for i in range(n):
+            doc_id = vs.index_to_docstore_id[i]
+            doc = vs.docstore.search(doc_id)
+            values = {
+                "ids": str(doc_id).encode("utf-8"),
+                "texts": doc.page_content.encode("utf-8"),
+                "metas": json.dumps(doc.metadata, ensure_ascii=False).encode("utf-8"),
+            }
+            for name in COLUMNS:
+                files[name].write(values[name])
+                offsets[name][i + 1] = offsets[name][i] + len(values[name])
+    finally:
+        for f in files.values():
+            f.close()
+    for name in COLUMNS:
+        offsets[name].tofile(_column_paths(gen_path, name)[1])
+
+
+def has_columnar_docstore(gen_path: Path) -> bool:
+    return all(p.exists() for name in COLUMNS for p in _column_paths(gen_path, name))
+
+
+class _Column:
+    """mmap 기반 가변 길이 바이트 컬럼 (읽기 전용)"""
+
+    def __init__(self, gen_path: Path, name: str):
+        bin_path, off_path = _column_paths(gen_path, name)
+        self.offsets = np.memmap(off_path, dtype=np.uint64, mode="r")
+        self._file = open(bin_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # 빈 파일은 mmap 할 수 없으므로 빈 바이트로 대체
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, i: int) -> str:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.data[start:end].decode("utf-8")
+
+
+class ColumnarDocstore(Docstore):
+    """FAISS 위치 번호로 청크를 조회하는 읽기 전용 docstore"""
+
+    def __init__(self, gen_path: Path):
+        self.columns = {name: _Column(gen_path, name) for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.columns["ids"])
+
+    def search(self, search: Union[str, int]) -> Union[str, Document]:
+        i = int(search)
+        if not 0 <= i < len(self):
+            return f"ID {search} not found."
+        return Document(
+            id=self.columns["ids"].get(i),
+            page_content=self.columns["texts"].get(i),
+            metadata=json.loads(self.columns["metas"].get(i)),
+        )
+
+    def delete(self, ids: List) -> None:
+        raise NotImplementedError("읽기 전용 mmap 인덱스는 수정할 수 없습니다.")
+
+
+class _PositionIds(Mapping):
+    """index_to_docstore_id 대체: FAISS 위치 i → docstore 키 i (문자열 사전을 메모리에 만들지 않음)"""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __getitem__(self, i: int) -> int:
+        i = int(i)
+        if not 0 <= i < self.n:
+            raise KeyError(i)
+        return i
+
+    def __iter__(self):
+        return iter(range(self.n))
+
+    def __len__(self) -> int:
+        return self.n
+
+
+def read_index_mmap(path: Path):
+    """.faiss 파일을 읽기 전용 mmap으로 엽니다."""
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    try:
+        # IndexFlat/HNSW 계열 저장소까지 mmap (faiss 1.8+)
+        return faiss.read_index(str(path), flags | getattr(faiss, "IO_FLAG_MMAP_IFC", 0))
+    except RuntimeError:
+        # IVF 계열은 IO_FLAG_MMAP(역색인 리스트 mmap)만 지원
+        return faiss.read_index(str(path), flags)
+
+
+def load_mmap_vectorstore(gen_path: Path, embed: Embeddings, index_file: str = "index.faiss") -> FAISS:
+    """
+    .faiss 파일을 IO_FLAG_MMAP으로 매핑하여 읽기 전용 벡터스토어를 만듭니다.
+    인덱스 데이터는 페이지 캐시에서 공유되므로 워커 수만큼 힙 메모리가 늘지 않습니다.
+    """
+    index = read_index_mmap(gen_path / index_file)
+    docstore = ColumnarDocstore(gen_path)
+    return FAISS(
+        embedding_function=embed,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=_PositionIds(len(docstore)),
+    )
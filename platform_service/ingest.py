@@ -0,0 +1,174 @@
+# platform_service/ingest.py
+
+"""
+ingest.py
+KB 문서 수집 및 증분 인덱싱(ingestion manifest) 모듈
+- kb_default / kb_data 의 파일별 콘텐츠 해시와 청크별 해시를 manifest로 관리
+- 신규/변경 파일만 다시 로드·분할·임베딩하고, 삭제된 파일의 벡터는 제거
+- 파일 파싱(load_file_docs)은 loaders.py 에서 수행
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+
+from platform_service import constants
+# 워커 프로세스가 unpickle 하는 작업 함수는 부수 효과 없는 모듈에 둠
+from platform_service.loaders import load_file_docs
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# 벡터화 대상 확장자 (history.db 등 DB 파일은 제외)
+SUPPORTED_SUFFIXES = {".pdf", ".csv", ".txt", ".md", ".docx"}
+
+# 파일 대신 사용하는 기본 시드 문서 (KB가 비어있을 때)
+SEED_KEY = "seed-faq.txt"
+SEED_TEXT = """사내 헬프데스크 안내
+- ID 발급: 신규 입사자는 HR 포털에서 '계정 신청' 양식을 제출. 승인 후 IT가 계정 생성.
+- 비밀번호 초기화: SSO 포털의 '비밀번호 재설정' 기능 사용. 본인인증 필요.
+- 담당자 조회: 포털 상단 검색창에 화면/메뉴명을 입력하면 담당자 카드가 표시됨."""
+
+
+# =============================================================
+# 해시 유틸
+# =============================================================
+def file_sha256(path: Path) -> str:
+    """파일 내용을 스트리밍으로 읽어 SHA-256 해시를 계산합니다."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(key: str, file_hash: str, index: int) -> str:
+    """
+    청크 ID: (파일 키 + 파일 해시) 기반이므로 파일이 바뀌면 ID도 바뀝니다.
+    동일 내용의 파일이 여러 경로에 있어도 충돌하지 않습니다.
+    """
+    prefix = hashlib.sha256(f"{key}\x00{file_hash}".encode("utf-8")).hexdigest()[:16]
+    return f"{prefix}-{index}"
+
+
+# =============================================================
+# KB 파일 탐색 & 파일별 로더
+# =============================================================
+def iter_kb_files() -> Iterator[Tuple[str, Path]]:
+    """
+    kb_default, kb_data 아래의 인덱싱 대상 파일을 (manifest 키, 경로)로 반환합니다.
+    manifest 키는 프로젝트 루트 기준 상대 경로(posix)입니다.
+    """
+    for kb_path in [constants.KB_DEFAULT_DIR, constants.KB_DATA_DIR]:
+        if not kb_path.exists():
+            kb_path.mkdir(parents=True, exist_ok=True)
+            continue
+        for p in sorted(kb_path.rglob("*")):
+            # ✅ DB 파일(history.db 등)은 벡터화 대상에서 제외
+            if not p.is_file():
+                continue
+            if p.suffix.lower() not in SUPPORTED_SUFFIXES:
+                continue
+            yield p.relative_to(constants.BASE_DIR).as_posix(), p
+
+
+def iter_loaded_docs(files: List[Tuple[str, Path]], workers: int) -> Iterator[Tuple[str, List[Document]]]:
+    """
+    파일을 프로세스 풀에서 병렬로 파싱하고, 완료되는 순서대로 (키, Document 목록)을 반환합니다.
+    동시에 처리 중인 파일 수를 workers * 2 로 제한하여 코퍼스 크기와 무관하게 메모리를 일정하게 유지합니다.
+    로드에 실패한 파일은 경고 로그만 남기고 건너뜁니다.
+    """
+    if workers <= 1 or len(files) <= 1:
+        for key, p in files:
+            try:
+                yield key, load_file_docs(p)
+            except Exception as e:
+                logger.warning(f"문서 로드 실패: {p} - {e}")
+        return
+
+    # JVM/스레드를 가진 API 프로세스를 fork 하지 않도록 spawn 컨텍스트 사용
+    # (워커는 platform_service.loaders 만 import 하고 core 는 import 하지 않음)
+    ctx = multiprocessing.get_context("spawn")
+    pending = iter(files)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        in_flight = {}
+        for key, p in pending:
+            in_flight[pool.submit(load_file_docs, p)] = (key, p)
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key, p = in_flight.pop(fut)
+                try:
+                    docs = fut.result()
+                except Exception as e:
+                    logger.warning(f"문서 로드 실패: {p} - {e}")
+                    docs = None
+                # 빈 자리만큼 다음 파일 제출
+                nxt = next(pending, None)
+                if nxt is not None:
+                    in_flight[pool.submit(load_file_docs, nxt[1])] = nxt
+                if docs is not None:
+                    yield key, docs
+
+
+# =============================================================
+# Ingestion Manifest
+# =============================================================
+class IngestManifest:
+    """
+    인덱스에 반영된 파일/청크 상태를 기록합니다.
+    {"version": 1, "files": {key: {"hash": 파일해시, "chunks": {청크ID: 청크해시}}}}
+    """
+
+    def __init__(self, files: Dict[str, Dict] = None):
+        self.files: Dict[str, Dict] = files or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestManifest":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                logger.warning(f"manifest 버전 불일치로 무시합니다: {path}")
+                return cls()
+            return cls(data.get("files", {}))
+        except Exception as e:
+            logger.warning(f"manifest 로드 실패: {path} - {e}")
+            return cls()
+
+    def save(self, path: Path) -> None:
+        # 임시 파일에 쓰고 교체하여 중간에 깨진 manifest가 남지 않도록 함
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def diff(self, current: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """현재 파일 해시와 비교하여 (신규/변경 키, 삭제 키)를 반환합니다."""
+        changed = [k for k, h in current.items() if self.files.get(k, {}).get("hash") != h]
+        deleted = [k for k in self.files if k not in current]
+        return changed, deleted
+
+    def chunk_ids(self, key: str) -> List[str]:
+        return list(self.files.get(key, {}).get("chunks", {}))
+
+    def set(self, key: str, file_hash: str, chunks: Dict[str, str]) -> None:
+        self.files[key] = {"hash": file_hash, "chunks": chunks}
+
+    def remove(self, key: str) -> None:
+        self.files.pop(key, None)
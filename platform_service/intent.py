@@ -0,0 +1,204 @@
+# platform_service/intent.py
+
+"""
+intent.py
+LLM 분류(node_classify) 앞단의 로컬 의도 분류기
+- 1단계: 키워드 규칙 (인사말, 비밀번호 초기화, ID 발급, 담당자 전체 조회)
+- 2단계: 담당자 화면명 매칭 (owners.csv 화면명/화면명 일부가 질문에 포함된 경우)
+- 3단계: 캐시된 임베딩 기반 최근접 중심(nearest-centroid) 분류
+확신할 수 있을 때만 결과를 반환하고, 애매한 질문은 None을 반환하여 LLM 분류로 넘깁니다.
+"""
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from platform_service import constants
+
+logger = logging.getLogger(__name__)
+
+RESET_PASSWORD_KEYWORDS = ("비밀번호 초기화", "비밀번호 재설정", "비번 초기화")
+REQUEST_ID_KEYWORDS = ("아이디 발급", "계정 발급", "계정 신청")
+OWNER_KEYWORD = "담당자"
+OWNER_LIST_KEYWORDS = ("전체", "모두", "리스트")
+
+# 최근접 중심 분류용 기본 예시 (라벨 → 질문 목록)
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "greeting": ["안녕", "안녕하세요", "반가워요", "좋은 아침입니다", "hello"],
+    "tool_reset_password": ["비밀번호를 잊어버렸어요", "패스워드 초기화 해주세요", "비밀번호가 잠겼어요", "암호를 바꾸고 싶어요"],
+    "tool_request_id": ["신규 입사자 계정 만들어 주세요", "아이디 신청은 어떻게 해요", "사번 계정 생성 요청"],
+    "general_qa": ["점심시간이 언제야?", "회사 복지제도 설명해줘", "VPN 접속이 안 돼요", "회의실 예약 방법 알려줘", "출장비 정산은 어떻게 하나요"],
+}
+
+
+@dataclass
+class IntentResult:
+    intent: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    stage: str = "rule"          # rule | owner | centroid
+    confidence: float = 1.0
+
+
+def _tool(tool_name: str, stage: str, confidence: float = 1.0, **arguments) -> IntentResult:
+    # node_direct_tool 은 tool_output["arguments"] 를 도구 payload 로 사용
+    return IntentResult("direct_tool", {"tool_name": tool_name, **arguments, "arguments": dict(arguments)}, stage, confidence)
+
+
+def _label_result(label: str, confidence: float) -> IntentResult:
+    if label.startswith("tool_"):
+        return _tool(label, "centroid", confidence)
+    return IntentResult(label, {}, "centroid", confidence)
+
+
+class LocalIntentClassifier:
+    """
+    규칙 → 담당자 화면 매칭 → 임베딩 최근접 중심 순서로 분류합니다.
+    - owners_fn: 담당자 목록(load_owner_data) 제공 함수
+    - embedder_fn: 임베딩 모델 제공 함수 (None이면 3단계 생략). 디스크 임베딩 캐시를 거치므로 예시 임베딩은 한 번만 계산
+    - examples_fn: 라벨별 예시 질문 제공 함수
+    - threshold / margin: 1위 중심과의 코사인 유사도와 2위와의 차이가 모두 기준 이상일 때만 확정
+    """
+
+    def __init__(
+        self,
+        owners_fn: Callable[[], List[Dict[str, str]]],
+        embedder_fn: Optional[Callable[[], Embeddings]] = None,
+        examples_fn: Callable[[], Dict[str, List[str]]] = lambda: SEED_EXAMPLES,
+        threshold: float = 0.6,
+        margin: float = 0.08,
+    ):
+        self.owners_fn = owners_fn
+        self.embedder_fn = embedder_fn
+        self.examples_fn = examples_fn
+        self.threshold = threshold
+        self.margin = margin
+        self._lock = threading.Lock()          # 카운터 / 중심 게시용 (짧게 잡음)
+        self._build_lock = threading.Lock()    # 중심 계산(임베딩 API 호출)은 한 스레드만 수행
+        self._labels: List[str] = []
+        self._centroids: Optional[np.ndarray] = None
+        self._counters = {"rule": 0, "owner": 0, "centroid": 0, "escalated": 0}
+
+    def classify(self, question: str) -> Optional[IntentResult]:
+        result = self.quick_classify(question) or self._centroid(question)
+        self._count(result)
+        return result
+
+    async def aclassify(self, question: str) -> Optional[IntentResult]:
+        """classify 의 비동기 버전 (질의 임베딩만 비동기로 요청)"""
+        result = self.quick_classify(question) or await self._acentroid(question)
+        self._count(result)
+        return result
+
+    def quick_classify(self, question: str) -> Optional[IntentResult]:
+        """임베딩 없이 1~2단계(규칙, 담당자 화면 매칭)만 수행합니다. 통계에는 반영하지 않습니다."""
+        return self._rules(question) or self._owner(question)
+
+    def _count(self, result: Optional[IntentResult]) -> None:
+        with self._lock:
+            self._counters[result.stage if result is not None else "escalated"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        total = sum(counters.values())
+        return {**counters, "local_rate": round(1 - counters["escalated"] / total, 4) if total else 0.0}
+
+    # ---------------------------------------------------------
+    # 1단계: 키워드 규칙 (폴백 파이프라인과 동일한 기준)
+    # ---------------------------------------------------------
+    def _rules(self, question: str) -> Optional[IntentResult]:
+        q = question.lower().strip()
+        if q in constants.GREETINGS:
+            return IntentResult("greeting")
+        if any(k in question for k in RESET_PASSWORD_KEYWORDS):
+            return _tool("tool_reset_password", "rule")
+        if any(k in question for k in REQUEST_ID_KEYWORDS):
+            return _tool("tool_request_id", "rule")
+        if OWNER_KEYWORD in question and (any(k in question for k in OWNER_LIST_KEYWORDS) or q == "담당자 조회"):
+            # 화면명 없는 전체 목록 요청 (node_direct_tool 이 list_all 로 분기)
+            return _tool("tool_owner_lookup", "rule", list_all=True)
+        return None
+
+    # ---------------------------------------------------------
+    # 2단계: 담당자 화면명 매칭
+    # ---------------------------------------------------------
+    def _owner(self, question: str) -> Optional[IntentResult]:
+        if OWNER_KEYWORD not in question:
+            return None
+        screens = [s for s in (row.get("screen", "").strip() for row in self.owners_fn()) if s]
+        exact = [s for s in screens if s in question]
+        if exact:
+            return _tool("tool_owner_lookup", "owner", screen=max(exact, key=len))
+        # '인사시스템 담당자' 처럼 화면명 일부만 언급한 경우: 하나의 화면으로 특정될 때만 확정
+        partial = [s for s in screens if any(len(part) > 1 and part in question for part in s.split("-"))]
+        if len(partial) == 1:
+            return _tool("tool_owner_lookup", "owner", screen=partial[0])
+        return None
+
+    # ---------------------------------------------------------
+    # 3단계: 임베딩 최근접 중심
+    # ---------------------------------------------------------
+    def _ensure_centroids(self, embedder: Embeddings) -> None:
+        if self._centroids is not None:
+            return
+        # 임베딩 API 호출 동안 self._lock 을 잡지 않으므로 분류 카운터 / stats() 는 대기하지 않음
+        with self._build_lock:
+            if self._centroids is not None:
+                return
+            labels, centroids = [], []
+            for label, examples in self.examples_fn().items():
+                if not examples:
+                    continue
+                vecs = np.asarray(embedder.embed_documents(examples), dtype=np.float32)
+                vecs /= np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-12
+                centroid = vecs.mean(axis=0)
+                labels.append(label)
+                centroids.append(centroid / (np.linalg.norm(centroid) + 1e-12))
+            with self._lock:
+                self._labels = labels
+                self._centroids = np.stack(centroids) if centroids else np.zeros((0, 0), dtype=np.float32)
+        logger.info("intent_centroids_built", extra={"extra_data": {"labels": labels}})
+
+    def _centroid(self, question: str) -> Optional[IntentResult]:
+        if self.embedder_fn is None:
+            return None
+        try:
+            embedder = self.embedder_fn()
+            self._ensure_centroids(embedder)
+            if len(self._labels) < 2:
+                return None
+            q = np.asarray(embedder.embed_query(question), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"로컬 의도 분류(임베딩) 실패, LLM 분류를 사용합니다: {e}")
+            return None
+        return self._decide(q)
+
+    async def _acentroid(self, question: str) -> Optional[IntentResult]:
+        if self.embedder_fn is None:
+            return None
+        try:
+            embedder = self.embedder_fn()
+            if self._centroids is None:
+                # 예시 임베딩(최초 1회)은 스레드에서 계산
+                await asyncio.to_thread(self._ensure_centroids, embedder)
+            if len(self._labels) < 2:
+                return None
+            q = np.asarray(await embedder.aembed_query(question), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"로컬 의도 분류(임베딩) 실패, LLM 분류를 사용합니다: {e}")
+            return None
+        return self._decide(q)
+
+    def _decide(self, q: np.ndarray) -> Optional[IntentResult]:
+        """1위 중심 유사도와 2위와의 차이가 기준 이상일 때만 확정"""
+        q /= np.linalg.norm(q) + 1e-12
+        scores = self._centroids @ q
+        order = np.argsort(-scores)
+        best, second = float(scores[order[0]]), float(scores[order[1]])
+        if best < self.threshold or best - second < self.margin:
+            return None
+        return _label_result(self._labels[order[0]], best)
@@ -0,0 +1,49 @@
+# platform_service/loaders.py
+
+"""
+loaders.py
+KB 파일 → Document 변환 (문서 파싱 프로세스 풀의 작업 함수)
+spawn 워커는 이 모듈만 import 하므로 core 등 부수 효과(클라이언트 풀, 체크포인트 DB, 로깅 핸들러)가 있는
+모듈을 import 하지 않습니다. (langchain 로더와 표준 라이브러리만 사용)
+"""
+import csv
+from pathlib import Path
+from typing import Dict, List
+
+from langchain_core.documents import Document
+from langchain_community.document_loaders import (
+    PyPDFLoader, CSVLoader, TextLoader, Docx2txtLoader
+)
+
+
+def _read_csv_rows(path: Path) -> List[Dict[str, str]]:
+    # UTF-8 with BOM도 안전하게 처리
+    with open(path, mode="r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def load_file_docs(path: Path) -> List[Document]:
+    """
+    단일 KB 파일을 Document 목록으로 변환합니다.
+    faq_data.csv / owners.csv 는 기존과 동일하게 행 단위 문서로 만듭니다.
+    """
+    if path.name == "faq_data.csv":
+        return [
+            Document(
+                page_content=f"질문: {row.get('question')}\n답변: {row.get('answer')}",
+                metadata={"source": "faq_data.csv"}
+            ) for row in _read_csv_rows(path) if "question" in row and "answer" in row
+        ]
+    if path.name == "owners.csv":
+        return [
+            Document(
+                page_content=f"화면: {row.get('screen')}\n담당자: {row.get('owner')}\n이메일: {row.get('email')}\n연락처: {row.get('phone')}",
+                metadata={"source": "owners.csv"}
+            ) for row in _read_csv_rows(path) if "screen" in row and "owner" in row
+        ]
+    suf = path.suffix.lower()
+    if suf == ".pdf": return PyPDFLoader(str(path)).load()
+    if suf == ".csv": return CSVLoader(file_path=str(path), encoding="utf-8").load()
+    if suf in [".txt", ".md"]: return TextLoader(str(path), encoding="utf-8").load()
+    if suf == ".docx": return Docx2txtLoader(str(path)).load()
+    return []
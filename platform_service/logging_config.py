@@ -1,12 +1,38 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
 from pathlib import Path
 import os
 import json
+import queue
+import random
+
+try:
+    import orjson  # JSON 직렬화 고속 경로 (없으면 표준 json 사용)
+except ImportError:  # pragma: no cover
+    orjson = None
 
 LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# 파일 로그 회전
+# - size(기본, LOG_MAX_BYTES 초과 시) | time(LOG_ROTATE_WHEN 주기): 프로세스별 파일(logs/app.<pid>.log)을 회전
+#   (여러 워커가 같은 파일을 회전하면 다른 프로세스가 옛 inode에 계속 써서 로그가 유실되므로 파일을 분리)
+#   종료된 프로세스의 파일은 setup_logging 시점에 삭제하므로 디스크 사용량은 살아 있는 프로세스 수에 비례
+# - none: 모든 프로세스가 logs/app.log 에 append 만 수행 (회전은 logrotate 등 외부 도구에 맡김,
+#   WatchedFileHandler 이므로 파일이 이동/삭제되면 다시 열어서 기록)
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+# 로그 큐 크기 (가득 차면 요청 스레드를 막지 않고 해당 로그를 버림)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 레벨별 샘플링 비율 (예: "DEBUG=0.01,INFO=0.2"). WARNING 이상은 항상 기록
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+
 class JsonFormatter(logging.Formatter):
     def format(self, record):
         base = {
@@ -18,7 +44,87 @@ class JsonFormatter(logging.Formatter):
         }
         if hasattr(record, "extra_data"):
             base.update(record.extra_data)
-        return json.dumps(base, ensure_ascii=False)
+        if orjson is not None:
+            # 직렬화할 수 없는 값(Path 등)은 str로 변환
+            return orjson.dumps(base, default=str).decode("utf-8")
+        return json.dumps(base, ensure_ascii=False, default=str)
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """'DEBUG=0.01,INFO=0.2' → {10: 0.01, 20: 0.2}"""
+    rates = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if sep and isinstance(level, int):
+            rates[level] = float(value)
+    return rates
+
+
+class LevelSamplingFilter(logging.Filter):
+    """WARNING 미만 레벨의 로그를 레벨별 비율만큼만 통과시킵니다."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = {level: rate for level, rate in rates.items() if level < logging.WARNING}
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        return rate is None or rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 대기하지 않고 로그를 버린 뒤 개수만 기록합니다."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _file_handler_config() -> dict:
+    """파일 핸들러 설정 (회전 시 파일명에 현재 PID를 쓰므로 setup_logging 시점에 생성)"""
+    common = {"encoding": "utf-8", "formatter": "json", "level": "INFO"}
+    if LOG_ROTATION == "time":
+        return {"class": "logging.handlers.TimedRotatingFileHandler", "filename": LOG_DIR / f"app.{os.getpid()}.log",
+                "when": LOG_ROTATE_WHEN, "backupCount": LOG_BACKUP_COUNT, **common}
+    if LOG_ROTATION == "size":
+        return {"class": "logging.handlers.RotatingFileHandler", "filename": LOG_DIR / f"app.{os.getpid()}.log",
+                "maxBytes": LOG_MAX_BYTES, "backupCount": LOG_BACKUP_COUNT, **common}
+    return {"class": "logging.handlers.WatchedFileHandler", "filename": LOG_DIR / "app.log", **common}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # 다른 사용자의 살아 있는 프로세스
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def remove_stale_logs() -> int:
+    """종료된 프로세스가 남긴 logs/app.<pid>.log* (회전된 백업 포함)를 삭제하고 삭제한 파일 수를 반환합니다."""
+    removed = 0
+    for path in LOG_DIR.glob("app.*.log*"):
+        pid = path.name.split(".")[1]
+        if not pid.isdigit() or int(pid) == os.getpid() or _pid_alive(int(pid)):
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass  # 다른 워커가 동시에 삭제한 경우
+    return removed
+
 
 LOGGING_CONFIG = {
     "version": 1,
@@ -32,19 +138,53 @@ LOGGING_CONFIG = {
             "formatter": "json",
             "level": "INFO",
         },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": LOG_DIR / "app.log",
-            "encoding": "utf-8",
-            "formatter": "json",
-            "level": "INFO",
-        },
+        "file": _file_handler_config(),
     },
     "root": {
         "handlers": ["console", "file"],
-        "level": "INFO",
+        "level": LOG_LEVEL,
     },
 }
 
+_listener = None
+_queue_handler = None
+
+
 def setup_logging():
-    logging.config.dictConfig(LOGGING_CONFIG)
+    """
+    LOGGING_CONFIG의 콘솔/파일 핸들러를 QueueListener 스레드로 옮기고,
+    root에는 큐에 넣기만 하는 QueueHandler를 연결합니다.
+    JSON 직렬화와 디스크 쓰기는 listener 스레드에서 수행되므로 요청 스레드를 막지 않습니다.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    if LOG_ROTATION in ("size", "time"):
+        remove_stale_logs()
+    logging.config.dictConfig({**LOGGING_CONFIG, "handlers": {**LOGGING_CONFIG["handlers"], "file": _file_handler_config()}})
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    rates = parse_sample_rates(LOG_SAMPLE_RATES)
+    if rates:
+        _queue_handler.addFilter(LevelSamplingFilter(rates))
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 기록하고 listener를 종료합니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_log_count() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
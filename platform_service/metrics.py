@@ -0,0 +1,292 @@
+# platform_service/metrics.py
+
+"""
+metrics.py
+Prometheus 텍스트 형식(0.0.4) 메트릭 (GET /metrics)
+- Counter / Histogram: 라벨별 값을 프로세스 메모리에 누적 (스레드 안전)
+- collector: 수집(scrape) 시점에 기존 stats() 값을 읽어 노출 (응답 캐시 등)
+- LangGraph 노드 / 검색 / 임베딩 / LLM 지연 시간, LLM 토큰 수, 의도별 분류 횟수 정의
+prometheus_client 없이 동작하며, 멀티 워커 환경에서는 워커(프로세스)별 값이 노출됩니다.
+"""
+import bisect
+import contextlib
+import logging
+import threading
+import time as _time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 지연 시간(초) / 토큰 수 히스토그램 구간
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+# collector 반환 형식: (메트릭명, 타입, 설명, [(라벨, 값), ...])
+Sample = Tuple[Dict[str, Any], float]
+CollectorFamily = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, Any]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or any(n not in labels for n in self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 이 필요합니다 (입력: {tuple(labels)})")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, self._snapshot(value)) for key, value in self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(list(zip(self.labelnames, key)), value))
+        return lines
+
+    def _snapshot(self, value: Any) -> Any:
+        return value
+
+    def _samples(self, labels: List[Tuple[str, str]], value: Any) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        # 구간별(비누적) 개수를 저장하고 출력할 때 누적합으로 변환
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """with 블록 실행 시간(초)을 기록합니다 (예외가 나도 기록)."""
+        start = _time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(_time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state is not None else 0
+
+    def _snapshot(self, value):
+        counts, total, n = value
+        return list(counts), total, n
+
+    def _samples(self, labels, value):
+        counts, total, n = value
+        lines, cumulative = [], 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            cumulative += c
+            le = _format_labels(labels + [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭과 collector 를 등록하고 Prometheus 텍스트 형식으로 출력합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectorFamily]]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"{metric.name} 메트릭이 다른 형식으로 이미 등록되어 있습니다.")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectorFamily]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                # collector 하나가 실패해도 나머지 메트릭은 노출
+                logger.warning(f"메트릭 collector 실패: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {_escape(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.items())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# =============================================================
+# 서비스 메트릭 정의
+# =============================================================
+REGISTRY = MetricsRegistry()
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "sda_http_request_duration_seconds", "API 요청 처리 시간 (스트리밍은 응답 시작까지)", ["method", "path", "status"])
+NODE_LATENCY = REGISTRY.histogram(
+    "sda_graph_node_duration_seconds", "LangGraph 노드 실행 시간", ["node"])
+RETRIEVAL_LATENCY = REGISTRY.histogram(
+    "sda_retrieval_duration_seconds", "문서 검색 시간 (질의 임베딩 포함, stage=speculative|rag)", ["stage"])
+EMBEDDING_LATENCY = REGISTRY.histogram(
+    "sda_embedding_request_duration_seconds", "임베딩 API 호출 시간 (캐시 미스만)", ["op"])
+LLM_LATENCY = REGISTRY.histogram(
+    "sda_llm_request_duration_seconds", "LLM 호출 시간", ["model", "status"])
+LLM_TOKENS = REGISTRY.histogram(
+    "sda_llm_tokens", "LLM 호출당 토큰 수 (type=input|output)", ["model", "type"], buckets=TOKEN_BUCKETS)
+INTENT_TOTAL = REGISTRY.counter(
+    "sda_intent_classified_total", "의도 분류 결과 (stage=rule|owner|centroid|llm)", ["intent", "stage"])
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# =============================================================
+# LLM / 임베딩 계측
+# =============================================================
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """LLM 응답의 (입력, 출력) 토큰 수 (usage_metadata 우선, 없으면 llm_output.token_usage)"""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if not (input_tokens or output_tokens):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens, output_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """LLM 클라이언트에 연결해 호출 시간과 토큰 수를 기록하는 콜백 (make_llm 참고)"""
+
+    run_inline = True  # 비동기 실행 시에도 executor 로 넘기지 않고 바로 실행
+
+    def __init__(self, model: str):
+        self.model = model
+        self._starts: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = _time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = _time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "ok")
+        input_tokens, output_tokens = _token_usage(response)
+        if input_tokens or output_tokens:
+            LLM_TOKENS.observe(input_tokens, model=self.model, type="input")
+            LLM_TOKENS.observe(output_tokens, model=self.model, type="output")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
+
+    def _finish(self, run_id: UUID, status: str) -> None:
+        start: Optional[float] = self._starts.pop(run_id, None)
+        if start is not None:
+            LLM_LATENCY.observe(_time.perf_counter() - start, model=self.model, status=status)
+
+
+class TimedEmbeddings(Embeddings):
+    """실제 임베딩 API 호출 시간을 기록하는 래퍼 (CachedEmbeddings 의 inner 로 사용 → 캐시 미스만 측정)"""
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with EMBEDDING_LATENCY.time(op="documents"):
+            return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with EMBEDDING_LATENCY.time(op="query"):
+            return self.inner.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        with EMBEDDING_LATENCY.time(op="documents"):
+            return await self.inner.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        with EMBEDDING_LATENCY.time(op="query"):
+            return await self.inner.aembed_query(text)
@@ -0,0 +1,209 @@
+# platform_service/response_cache.py
+
+"""
+response_cache.py
+run_graph_pipeline 앞단의 응답 캐시 모듈
+- 1차: 정규화한 질문 텍스트 정확 일치 (LRU + TTL)
+- 2차(선택): 질문 임베딩 코사인 유사도가 임계값 이상인 캐시 항목 재사용
+- 인덱스 세대(generation)가 바뀌면 전체 무효화
+- 의도(intent)별 캐시 허용 규칙, 이전 대화에 의존하는 질문은 캐시하지 않음
+- 적중률 등 지표는 stats()로 조회
+"""
+import copy
+import logging
+import re
+import threading
+import time as _time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 이전 대화 맥락을 참조하는 표현 (세션마다 답이 달라지므로 캐시 제외)
+SESSION_MARKERS = ("아까", "방금", "이전 답변", "이전 질문", "위에서", "앞에서", "다시 말해", "그거", "그것", "그럼")
+
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.~。？！]+$")
+
+
+def normalize_question(question: str) -> str:
+    """NFKC 정규화 + 소문자 + 공백 축약 + 끝 문장부호 제거"""
+    text = unicodedata.normalize("NFKC", question).lower().strip()
+    text = _SPACE_RE.sub(" ", text)
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def is_session_dependent(question: str) -> bool:
+    return any(marker in question for marker in SESSION_MARKERS)
+
+
+@dataclass
+class _Entry:
+    result: Dict[str, Any]
+    intent: str
+    expires_at: float
+    vector: Optional[np.ndarray] = None
+
+
+class ResponseCache:
+    """
+    질문 → 파이프라인 결과 캐시 (스레드 안전)
+    - max_entries 초과 시 가장 오래 사용되지 않은 항목부터 제거(LRU)
+    - similarity > 0 이고 embed_fn 이 있으면 semantic_intents 의 응답에 한해 유사 질문도 적중 처리
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: float = 600.0,
+        similarity: float = 0.0,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        cacheable_intents: Iterable[str] = ("greeting", "faq", "general_qa", "direct_tool"),
+        semantic_intents: Iterable[str] = ("faq", "general_qa"),
+        clock: Callable[[], float] = _time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.embed_fn = embed_fn
+        self.cacheable_intents = set(cacheable_intents)
+        self.semantic_intents = set(semantic_intents)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._generation: Optional[str] = None
+        # 유사도 검색용 행렬 (항목이 바뀌면 다음 검색 때 다시 구성)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._dirty = False
+        self._counters = {
+            "exact_hits": 0, "semantic_hits": 0, "misses": 0, "bypassed": 0,
+            "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+        }
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity > 0 and self.embed_fn is not None
+
+    # ---------------------------------------------------------
+    # 조회 / 저장
+    # ---------------------------------------------------------
+    def get(self, question: str, generation: Optional[str]) -> Optional[Dict[str, Any]]:
+        """캐시된 결과의 사본을 반환합니다 (없으면 None)."""
+        if is_session_dependent(question):
+            with self._lock:
+                self._counters["bypassed"] += 1
+            return None
+        key = normalize_question(question)
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._live_entry(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["exact_hits"] += 1
+                return copy.deepcopy(entry.result)
+            if not self.semantic_enabled or not self._entries:
+                self._counters["misses"] += 1
+                return None
+
+        # 임베딩 호출은 락 밖에서 수행
+        vector = self._embed(question)
+        with self._lock:
+            match = self._nearest(vector, generation) if vector is not None else None
+            if match is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(match)
+            self._counters["semantic_hits"] += 1
+            return copy.deepcopy(self._entries[match].result)
+
+    def put(self, question: str, generation: Optional[str], result: Dict[str, Any]) -> bool:
+        """의도별 규칙을 통과한 결과만 저장합니다. 저장 여부를 반환합니다."""
+        intent = result.get("intent", "")
+        if intent not in self.cacheable_intents or not result.get("reply") or is_session_dependent(question):
+            return False
+        vector = self._embed(question) if self.semantic_enabled and intent in self.semantic_intents else None
+        key = normalize_question(question)
+        with self._lock:
+            if generation != self._generation:
+                if self._generation is not None:
+                    # 요청 처리 중 세대가 바뀐 결과는 저장하지 않음
+                    return False
+                self._generation = generation
+            self._entries[key] = _Entry(copy.deepcopy(result), intent, self._clock() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+            self._dirty = True
+        return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        hits = counters["exact_hits"] + counters["semantic_hits"]
+        lookups = hits + counters["misses"]
+        return {**counters, "size": size, "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
+    # ---------------------------------------------------------
+    # 내부 유틸 (락 보유 상태에서 호출)
+    # ---------------------------------------------------------
+    def _check_generation(self, generation: Optional[str]) -> None:
+        if generation == self._generation:
+            return
+        if self._entries:
+            self._clear()
+            logger.info("response_cache_invalidated", extra={"extra_data": {"generation": generation}})
+        self._generation = generation
+
+    def _clear(self) -> None:
+        if self._entries:
+            self._counters["invalidations"] += 1
+        self._entries.clear()
+        self._matrix, self._matrix_keys, self._dirty = None, [], False
+
+    def _live_entry(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self._clock():
+            del self._entries[key]
+            self._counters["expirations"] += 1
+            self._dirty = True
+            return None
+        return entry
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        try:
+            v = np.asarray(self.embed_fn(question), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"응답 캐시 임베딩 실패, 정확 일치만 사용합니다: {e}")
+            return None
+        norm = np.linalg.norm(v)
+        return v / norm if norm else None
+
+    def _nearest(self, vector: np.ndarray, generation: Optional[str]) -> Optional[str]:
+        if generation != self._generation:
+            return None
+        if self._dirty or self._matrix is None:
+            self._matrix_keys = [k for k, e in self._entries.items() if e.vector is not None]
+            self._matrix = np.stack([self._entries[k].vector for k in self._matrix_keys]) if self._matrix_keys else None
+            self._dirty = False
+        if self._matrix is None:
+            return None
+        scores = self._matrix @ vector
+        for i in np.argsort(-scores):
+            if scores[i] < self.similarity:
+                return None
+            key = self._matrix_keys[i]
+            if self._live_entry(key) is not None:
+                return key
+        return None
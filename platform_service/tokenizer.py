@@ -0,0 +1,135 @@
+# platform_service/tokenizer.py
+
+"""
+tokenizer.py
+한국어 형태소 분석기 백엔드 모듈 (get_okt()가 반환하는 분석기)
+- 모든 백엔드는 Okt와 같은 phrases(text) / nouns(text) 인터페이스를 제공
+- kiwi: kiwipiepy (C++ 네이티브, JVM 없음) - 기본값. 하나의 인스턴스를 여러 스레드에서 동시에 호출 가능
+- okt: KoNLPy Okt (JVM 기동, pip install -e ".[nlp-ko]") - 기존 동작
+- 백엔드마다 토큰 결과가 다르므로 name 속성을 BM25 역색인에 함께 저장하여 불일치를 감지
+"""
+import logging
+from typing import Any, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_BACKENDS = ("kiwi", "okt")
+
+# 어구를 이루는 품사 (일반/고유 명사, 어근, 외국어, 한자, 숫자)
+_PHRASE_TAGS = frozenset({"NNG", "NNP", "XR", "SL", "SH", "SN"})
+# 앞 형태소에 붙어 있을 때만 어구를 이어가는 품사 (초기+화, 비+정상 등 파생 접사)
+_ATTACHED_TAGS = frozenset({"XSN", "XPN"})
+_NOUN_TAGS = frozenset({"NNG", "NNP"})
+
+
+def _dedupe(items: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(items))
+
+
+class KiwiTokenizer:
+    """
+    kiwipiepy 기반 분석기
+    phrases는 Okt phrases처럼 연속된 명사 어절을 전체/부분 어구(최대 max_phrase_words 어절)와
+    어절 내부의 명사로 함께 반환합니다. 예) '인사시스템 사용자관리'
+    → ['인사시스템', '인사시스템 사용자관리', '사용자관리', '인사', '시스템', '사용자', '관리']
+    """
+
+    name = "kiwi"
+
+    def __init__(self, num_workers: int = -1, max_phrase_words: int = 3):
+        from kiwipiepy import Kiwi
+        # num_workers는 여러 문장을 한 번에 분석(phrases_many)할 때 사용할 내부 스레드 수 (-1: 전체 코어)
+        self._kiwi = Kiwi(num_workers=num_workers)
+        self.max_phrase_words = max_phrase_words
+
+    def _phrases(self, tokens: List[Any]) -> List[str]:
+        runs: List[List[str]] = []   # 연속된 명사 어절 목록
+        words: List[str] = []
+        word = ""
+        end = -1
+        morphemes: List[str] = []
+        for tok in tokens:
+            attached = bool(word) and tok.start == end
+            if tok.tag in _PHRASE_TAGS or (attached and tok.tag in _ATTACHED_TAGS):
+                if tok.tag in _NOUN_TAGS:
+                    morphemes.append(tok.form)
+                if attached:
+                    word += tok.form
+                else:
+                    if word:
+                        words.append(word)
+                    word = tok.form
+                end = tok.start + tok.len
+                continue
+            # 조사/어미 등 명사가 아닌 형태소에서 어구가 끊김
+            if word:
+                words.append(word)
+                word = ""
+            if words:
+                runs.append(words)
+                words = []
+        if word:
+            words.append(word)
+        if words:
+            runs.append(words)
+
+        phrases: List[str] = []
+        for run in runs:
+            for i in range(len(run)):
+                for j in range(i + 1, min(i + self.max_phrase_words, len(run)) + 1):
+                    phrases.append(" ".join(run[i:j]))
+        return [p for p in _dedupe(phrases + morphemes) if len(p) > 1]
+
+    def phrases(self, text: str) -> List[str]:
+        return self._phrases(self._kiwi.tokenize(text))
+
+    def phrases_many(self, texts: List[str]) -> List[List[str]]:
+        """여러 문장을 Kiwi 내부 스레드 풀로 한 번에 분석합니다 (입력 순서 유지)."""
+        return [self._phrases(tokens) for tokens in self._kiwi.tokenize(texts)]
+
+    def nouns(self, text: str) -> List[str]:
+        return [tok.form for tok in self._kiwi.tokenize(text) if tok.tag in _NOUN_TAGS]
+
+
+class OktTokenizer:
+    """KoNLPy Okt 래퍼 (JVM 기동, 프로세스당 1회)"""
+
+    name = "okt"
+
+    def __init__(self):
+        from konlpy.tag import Okt
+        self._okt = Okt()
+
+    def phrases(self, text: str) -> List[str]:
+        return self._okt.phrases(text)
+
+    def nouns(self, text: str) -> List[str]:
+        return self._okt.nouns(text)
+
+
+def phrases_many(analyzer: Any, texts: List[str]) -> List[List[str]]:
+    """분석기가 배치 분석을 지원하면 사용하고, 아니면 한 문장씩 phrases를 호출합니다."""
+    batch = getattr(analyzer, "phrases_many", None)
+    if batch is not None:
+        return batch(texts)
+    return [analyzer.phrases(text) for text in texts]
+
+
+def create_tokenizer(backend: str, num_workers: int = -1) -> Any:
+    """
+    backend 이름으로 분석기를 생성합니다.
+    kiwi 백엔드에서 kiwipiepy가 설치되어 있지 않으면 경고 후 Okt를 사용합니다.
+    """
+    backend = backend.lower()
+    if backend not in TOKENIZER_BACKENDS:
+        raise ValueError(f"지원하지 않는 형태소 분석기입니다: {backend} (지원: {', '.join(TOKENIZER_BACKENDS)})")
+    if backend == "kiwi":
+        try:
+            analyzer = KiwiTokenizer(num_workers=num_workers)
+            logger.info("Kiwi 형태소 분석기를 초기화했습니다.")
+            return analyzer
+        except ImportError:
+            logger.warning("kiwipiepy 패키지가 없어 Okt 형태소 분석기(JVM)를 사용합니다.")
+    analyzer = OktTokenizer()
+    logger.info("Okt 형태소 분석기를 초기화했습니다.")
+    return analyzer
@@ -1,6 +1,7 @@
 # tests/conftest.py
 import pytest
 import os
+from platform_service import core
 from platform_service.db import history
 
 @pytest.fixture(scope="session", autouse=True)
@@ -9,7 +10,16 @@ def setup_test_database():
     print(f"[pytest] DB 초기화 경로: {history.DB_PATH}")
     history.init_db()
     yield
-    # 테스트 끝나고 DB 파일 삭제
-    if os.path.exists(history.DB_PATH):
-        os.remove(history.DB_PATH)
-        print(f"[pytest] 테스트 완료 후 DB 삭제: {history.DB_PATH}")
+    # 테스트 끝나고 DB 파일(WAL 파일 포함) 삭제
+    history.close_db()
+    for path in (history.DB_PATH, history.DB_PATH.with_name(history.DB_PATH.name + "-wal"), history.DB_PATH.with_name(history.DB_PATH.name + "-shm")):
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"[pytest] 테스트 완료 후 DB 삭제: {path}")
+    # 그래프 테스트가 만든 체크포인트 DB(WAL 파일 포함) 삭제
+    checkpoint_db = getattr(core._checkpointer, "db_path", None)
+    if checkpoint_db is not None:
+        core._checkpointer.close()
+        for path in (checkpoint_db, checkpoint_db.with_name(checkpoint_db.name + "-wal"), checkpoint_db.with_name(checkpoint_db.name + "-shm")):
+            if os.path.exists(path):
+                os.remove(path)
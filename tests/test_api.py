@@ -334,4 +334,214 @@ def test_upload_endpoint(client, tmp_path):
     assert r.status_code == 200
     data = r.json()
     assert data["ok"] is True
-    assert "test.txt" in data["saved"]
\ No newline at end of file
+    assert "test.txt" in data["saved"]
+
+def _parse_sse(text):
+    """SSE 응답 본문을 (event, data) 목록으로 변환"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_chat_stream_fallback_sends_final_event(client):
+    """/chat/stream 이 SSE 형식으로 final 이벤트(reply, intent, sources)를 전송하는지 검증"""
+    if AZURE_AVAILABLE:
+        pytest.skip("이 테스트는 폴백 모드에서만 실행됩니다.")
+    r = client.post("/chat/stream", json={"message": "비밀번호 초기화", "session_id": str(uuid.uuid4())})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(r.text)
+    assert events[-1][0] == "final"
+    assert events[-1][1]["intent"] == "direct_tool"
+    assert "sources" in events[-1][1]
+
+def _stub_graph(monkeypatch):
+    """LLM / retriever / 분류기를 가짜로 바꿔 Azure 없이 LangGraph 경로를 실행하도록 설정"""
+    from langchain_core.documents import Document
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+    from platform_service import core
+    from platform_service.intent import IntentResult
+    from platform_service.response_cache import ResponseCache
+
+    class StubClassifier:
+        def quick_classify(self, question):
+            return None
+
+        def classify(self, question):
+            return IntentResult("general_qa")
+
+        async def aclassify(self, question):
+            return self.classify(question)
+
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "_graph", None)
+    monkeypatch.setattr(core, "_response_cache", ResponseCache())
+    monkeypatch.setattr(core, "_intent_classifier", StubClassifier())
+    stub_retriever = RunnableLambda(lambda q: [Document(page_content="SSO 포털 안내", metadata={"source": "faq_data.csv"})])
+
+    async def stub_aretriever(k=4, **kw):
+        return stub_retriever
+
+    monkeypatch.setattr(core, "retriever", lambda k=4, **kw: stub_retriever)
+    monkeypatch.setattr(core, "aretriever", stub_aretriever)
+    monkeypatch.setattr(core, "make_llm", lambda **kw: GenericFakeChatModel(
+        messages=iter([AIMessage(content="SSO 포털에서 비밀번호를 재설정하세요")])
+    ))
+
+def test_chat_async_graph_and_history(client, monkeypatch):
+    """/chat 이 비동기 그래프(ainvoke) 경로로 응답하고, 대화 기록이 백그라운드에서 저장되는지 검증"""
+    _stub_graph(monkeypatch)
+    session_id = str(uuid.uuid4())
+    r = client.post("/chat", json={"message": "비번 잊어버림", "session_id": session_id})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["reply"] == "SSO 포털에서 비밀번호를 재설정하세요"
+    assert data["sources"][0]["source"] == "faq_data.csv"
+
+    history = client.get("/history", params={"session_id": session_id}).json()["messages"]
+    assert sorted(m["role"] for m in history) == ["assistant", "user"]
+
+def test_chat_passes_search_params_to_retriever(client, monkeypatch):
+    """/chat, /chat/stream 요청의 nprobe / ef_search 가 검색 노드의 retriever 까지 전달되는지 검증"""
+    from langchain_core.documents import Document
+    from langchain_core.runnables import RunnableLambda
+    from platform_service import core
+
+    _stub_graph(monkeypatch)
+    calls = []
+
+    async def capture_aretriever(k=4, **kw):
+        calls.append(kw)
+        return RunnableLambda(lambda q: [Document(page_content="SSO 포털 안내", metadata={"source": "faq_data.csv"})])
+
+    monkeypatch.setattr(core, "aretriever", capture_aretriever)
+    session_id = str(uuid.uuid4())
+    r = client.post("/chat", json={"message": "비번 잊어버림", "session_id": session_id, "nprobe": 32, "ef_search": 128})
+    assert r.status_code == 200
+    assert calls and all(kw == {"nprobe": 32, "ef_search": 128} for kw in calls)
+
+    calls.clear()
+    client.post("/chat/stream", json={"message": "비번 잊어버림", "session_id": str(uuid.uuid4()), "ef_search": 256})
+    assert calls and all(kw == {"ef_search": 256} for kw in calls)
+
+    # 다음 턴에 생략하면 체크포인트에 남은 이전 값이 아닌 기본값 사용
+    calls.clear()
+    client.post("/chat", json={"message": "VPN 접속 방법", "session_id": session_id})
+    assert calls and all(kw == {} for kw in calls)
+    assert client.post("/chat", json={"message": "질문", "session_id": "s1", "nprobe": 0}).status_code == 422
+
+def test_chat_stream_graph_tokens(client, monkeypatch):
+    """LangGraph 스트리밍: 노드 이벤트와 RAG 답변 토큰이 순서대로 전송되고, 마지막에 sources가 포함되는지 검증"""
+    _stub_graph(monkeypatch)
+    r = client.post("/chat/stream", json={"message": "비번 잊어버림", "session_id": str(uuid.uuid4())})
+    events = _parse_sse(r.text)
+    tokens = [d["text"] for e, d in events if e == "token"]
+    nodes = [d["node"] for e, d in events if e == "node"]
+    assert len(tokens) > 1
+    # classify 와 추측 검색(retrieve)이 먼저 병렬 실행된 뒤 rag
+    assert sorted(nodes[:2]) == ["classify", "retrieve"] and nodes[2:] == ["rag"]
+    final = events[-1][1]
+    assert final["reply"] == "".join(tokens)
+    assert final["sources"][0]["source"] == "faq_data.csv"
+
+def test_metrics_endpoint_reports_graph_latency(client, monkeypatch):
+    """/metrics: 그래프 실행 후 노드/검색 지연 시간, 의도별 분류 수, HTTP 요청 시간이 노출되는지 검증"""
+    from platform_service import metrics
+    _stub_graph(monkeypatch)
+    before = metrics.NODE_LATENCY.count(node="rag")
+    client.post("/chat", json={"message": "비번 잊어버림", "session_id": str(uuid.uuid4())})
+    assert metrics.NODE_LATENCY.count(node="rag") == before + 1
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    for node in ("classify", "retrieve", "rag"):
+        assert f'sda_graph_node_duration_seconds_count{{node="{node}"}}' in text
+    assert 'sda_retrieval_duration_seconds_count{stage="speculative"}' in text
+    assert 'sda_intent_classified_total{intent="general_qa",stage="rule"}' in text
+    assert 'sda_response_cache_lookups_total{result="miss"}' in text
+    assert 'sda_http_request_duration_seconds_count{method="POST",path="/chat",status="200"}' in text
+
+def test_speculative_retrieval_overlaps_classify(client, monkeypatch):
+    """추측 검색: 분류 중에 검색이 이미 시작되고, rag 노드는 그 결과를 재사용(검색 1회)하는지 검증"""
+    import threading
+    from langchain_core.documents import Document
+    from langchain_core.runnables import RunnableLambda
+    from platform_service import core
+    from platform_service.intent import IntentResult
+
+    _stub_graph(monkeypatch)
+    retrieved = threading.Event()
+    calls = []
+
+    def search(q):
+        calls.append(q)
+        retrieved.set()
+        return [Document(page_content="VPN 안내", metadata={"source": "vpn.pdf"})]
+
+    class WaitingClassifier:
+        def quick_classify(self, question):
+            return None
+
+        def classify(self, question):
+            # 순차 실행이라면 검색이 아직 시작되지 않았으므로 시간 초과
+            assert retrieved.wait(timeout=5), "검색이 분류와 병렬로 실행되지 않았습니다."
+            return IntentResult("general_qa")
+
+    monkeypatch.setattr(core, "_intent_classifier", WaitingClassifier())
+    monkeypatch.setattr(core, "retriever", lambda k=4, **kw: RunnableLambda(search))
+
+    out = core.run_graph_pipeline("VPN 접속이 안 돼요", str(uuid.uuid4()))
+    assert out["sources"][0]["source"] == "vpn.pdf"
+    assert calls == ["VPN 접속이 안 돼요"]
+
+def test_owner_list_rule_returns_all_owners_in_graph(client, monkeypatch):
+    """'담당자 조회'는 그래프 경로에서도 폴백과 같이 전체 담당자 목록을 반환하는지 검증"""
+    from platform_service import core
+    from platform_service.intent import LocalIntentClassifier
+
+    owners = [
+        {"screen": "인사시스템-사용자관리", "owner": "홍길동", "email": "hong@example.com", "phone": "010-0000-0001"},
+        {"screen": "재무시스템-정산화면", "owner": "김재무", "email": "kim@example.com", "phone": "010-0000-0002"},
+    ]
+    _stub_graph(monkeypatch)
+    monkeypatch.setattr(core, "INTENT_LOCAL_ENABLED", True)
+    monkeypatch.setattr(core, "_owner_data", owners)
+    monkeypatch.setattr(core, "_intent_classifier", LocalIntentClassifier(owners_fn=lambda: owners))
+
+    out = core.run_graph_pipeline("담당자 조회", str(uuid.uuid4()))
+    assert out["intent"] == "direct_tool"
+    assert "전체 담당자 목록" in out["reply"]
+    assert "홍길동" in out["reply"] and "김재무" in out["reply"]
+    # 화면명 없이 단건 조회 도구를 직접 호출하면 첫 번째 담당자를 반환하지 않음
+    assert core.tool_owner_lookup.invoke({"payload": {"screen": ""}})["ok"] is False
+
+def test_owner_lookup_uses_llm_classified_screen(monkeypatch):
+    """LLM 분류 결과처럼 screen이 tool_output 최상위에 있어도 담당자를 조회하는지 검증"""
+    from platform_service import core
+
+    owners = [{"screen": "인사시스템-사용자관리", "owner": "홍길동", "email": "hong@example.com", "phone": "010-0000-0001"}]
+    monkeypatch.setattr(core, "_owner_data", owners)
+    _, args = core._parse_intent('{"intent": "direct_tool", "arguments": {"tool_name": "tool_owner_lookup", "screen": "인사시스템"}}')
+
+    out = core.node_direct_tool({"question": "인사시스템 담당자 누구야?", "tool_output": args})
+    assert out["tool_output"]["ok"] is True
+    assert out["tool_output"]["owner"]["owner"] == "홍길동"
+
+def test_speculative_retrieval_skipped_for_rule_intents(client, monkeypatch):
+    """규칙으로 확정되는 인사/도구 질문은 추측 검색을 하지 않는지 검증"""
+    from langchain_core.runnables import RunnableLambda
+    from platform_service import core
+    from platform_service.intent import LocalIntentClassifier
+
+    _stub_graph(monkeypatch)
+    monkeypatch.setattr(core, "INTENT_LOCAL_ENABLED", True)
+    monkeypatch.setattr(core, "_intent_classifier", LocalIntentClassifier(owners_fn=lambda: []))
+    monkeypatch.setattr(core, "retriever", lambda k=4, **kw: RunnableLambda(lambda q: pytest.fail("검색하면 안 됩니다.")))
+
+    out = core.run_graph_pipeline("비밀번호 초기화", str(uuid.uuid4()))
+    assert out["intent"] == "direct_tool"
@@ -0,0 +1,47 @@
+# tests/test_benchmarks.py
+
+import base64
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from benchmarks import loadtest, mock_azure
+
+# =============================================================
+# 1. 질문 구성 / 통계
+# =============================================================
+def test_question_mix_is_deterministic_and_follows_ratio():
+    faq = ["점심시간이 언제야", "VPN 접속이 안 돼요"]
+    first = loadtest.question_mix(1000, seed=7, faq_questions=faq)
+    assert first == loadtest.question_mix(1000, seed=7, faq_questions=faq)
+    faq_like = sum(any(q.startswith(f) for f in faq) for q in first)
+    assert 0.6 < faq_like / len(first) < 0.8  # QUESTION_MIX["faq"] = 0.7
+    assert loadtest.load_faq_questions()  # kb_default/faq_data.csv 에서 질문 로드
+
+def test_phase_summary_percentiles():
+    phase = loadtest.PhaseResult(latencies_ms=[float(i) for i in range(1, 101)], errors=2, elapsed=2.0, rss_mb=[100.0, 120.5, 110.0])
+    summary = phase.summary()
+    assert summary["requests"] == 102 and summary["throughput_rps"] == 51.0
+    assert summary["latency_ms"]["p50"] == 50.5
+    assert summary["latency_ms"]["p99"] == 99.01
+    assert summary["rss_mb"] == {"start": 100.0, "end": 110.0, "peak": 120.5}
+
+# =============================================================
+# 2. mock Azure OpenAI 서버
+# =============================================================
+def test_mock_azure_embeddings_are_deterministic_and_base64_encoded():
+    client = TestClient(mock_azure.create_app())
+    url = "/openai/deployments/text-embedding-3-small/embeddings?api-version=2024-10-21"
+    plain = client.post(url, json={"input": ["안녕하세요", "VPN"]}).json()["data"]
+    encoded = client.post(url, json={"input": "안녕하세요", "encoding_format": "base64"}).json()["data"]
+    assert len(plain) == 2 and len(plain[0]["embedding"]) == mock_azure.EMBED_DIM
+    decoded = np.frombuffer(base64.b64decode(encoded[0]["embedding"]), dtype="<f4")
+    assert np.allclose(decoded, plain[0]["embedding"], atol=1e-6)
+    assert not np.allclose(plain[0]["embedding"], plain[1]["embedding"])
+
+def test_mock_azure_chat_answers_classifier_prompt_with_json():
+    client = TestClient(mock_azure.create_app())
+    url = "/openai/deployments/gpt-4o-mini/chat/completions?api-version=2024-10-21"
+    r = client.post(url, json={"messages": [{"role": "user", "content": "당신은 사용자 의도를 분류하는 AI입니다. ..."}]}).json()
+    assert r["choices"][0]["message"]["content"] == '{"intent": "general_qa", "arguments": {}}'
+    assert r["usage"]["total_tokens"] > 0
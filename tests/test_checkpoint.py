@@ -0,0 +1,97 @@
+# tests/test_checkpoint.py
+
+import asyncio
+from typing import List, Optional, TypedDict
+
+from langchain_core.documents import Document
+from langgraph.graph import END, START, StateGraph
+
+from platform_service.db.checkpoint import SQLiteCheckpointSaver
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class State(TypedDict):
+    question: str
+    turns: int
+    docs: Optional[List[Document]]
+
+
+def build(saver):
+    """질문마다 turns 를 1 증가시키는 최소 그래프 (이전 턴 상태를 체크포인트에서 읽음)"""
+    g = StateGraph(State)
+    g.add_node("answer", lambda s: {"turns": s.get("turns", 0) + 1, "docs": [Document(page_content="안내 " * 300)]})
+    g.add_edge(START, "answer")
+    g.add_edge("answer", END)
+    return g.compile(checkpointer=saver)
+
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+# =============================================================
+# 1. 영속성 / 보존 개수 / TTL 만료
+# =============================================================
+def test_state_survives_restart_and_retention_is_bounded(tmp_path):
+    db = tmp_path / "checkpoints.db"
+    graph = build(SQLiteCheckpointSaver(db, max_per_thread=3))
+    for _ in range(5):
+        graph.invoke({"question": "안녕"}, config("s1"))
+
+    # 새 인스턴스(재시작 / 다른 워커)에서도 마지막 상태를 이어서 사용
+    saver = SQLiteCheckpointSaver(db, max_per_thread=3)
+    restarted = build(saver)
+    assert restarted.get_state(config("s1")).values["turns"] == 5
+    assert asyncio.run(restarted.ainvoke({"question": "다시"}, config("s1")))["turns"] == 6
+    assert isinstance(restarted.get_state(config("s1")).values["docs"][0], Document)
+    assert len(list(saver.list(config("s1")))) == 3
+
+
+def test_idle_sessions_expire_after_ttl(tmp_path):
+    clock = FakeClock()
+    saver = SQLiteCheckpointSaver(tmp_path / "checkpoints.db", ttl=60, sweep_interval=10, clock=clock)
+    graph = build(saver)
+    graph.invoke({"question": "질문"}, config("idle"))
+    clock.now += 30
+    graph.invoke({"question": "질문"}, config("active"))
+
+    clock.now += 40  # idle: 70초 경과, active: 40초 경과 → 다음 put 에서 idle 만 정리
+    graph.invoke({"question": "질문"}, config("active"))
+    assert saver.wait_for_sweep(5)
+    assert saver.stats()["threads"] == 1
+    assert graph.get_state(config("idle")).values == {}
+    assert graph.get_state(config("active")).values["turns"] == 2
+
+
+def test_put_does_not_wait_for_ttl_sweep(tmp_path, monkeypatch):
+    """만료 세션 정리는 백그라운드에서 실행되어 요청 경로의 put()을 막지 않는지 검증"""
+    import threading
+
+    clock = FakeClock()
+    saver = SQLiteCheckpointSaver(tmp_path / "checkpoints.db", ttl=60, sweep_interval=10, clock=clock)
+    started, release = threading.Event(), threading.Event()
+    sweep = saver.sweep
+
+    def slow_sweep(now=None):
+        started.set()
+        release.wait(5)
+        return sweep(now)
+
+    monkeypatch.setattr(saver, "sweep", slow_sweep)
+    graph = build(saver)
+    try:
+        graph.invoke({"question": "질문"}, config("s1"))  # 첫 put 에서 정리 시작
+        assert started.wait(5)
+        clock.now += 30  # 정리가 아직 끝나지 않았어도 다음 턴은 바로 저장됨
+        assert graph.invoke({"question": "질문"}, config("s1"))["turns"] == 2
+    finally:
+        release.set()
+    assert saver.wait_for_sweep(5)
@@ -0,0 +1,45 @@
+# tests/test_clients.py
+
+import httpx
+import pytest
+
+from platform_service import core
+from platform_service.clients import ClientRegistry
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+@pytest.fixture
+def registry(monkeypatch):
+    """Azure 설정이 있는 것처럼 바꾸고 새 레지스트리를 사용 (실제 호출은 하지 않음)"""
+    reg = ClientRegistry(max_connections=8, max_keepalive=4, connect_timeout=1.5, http2=False)
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "AOAI_ENDPOINT", "https://example.openai.azure.com")
+    monkeypatch.setattr(core, "AOAI_API_KEY", "test-key")
+    monkeypatch.setattr(core, "_clients", reg)
+    yield reg
+    reg.close()
+
+# =============================================================
+# 1. 클라이언트 재사용 / 커넥션 풀 공유
+# =============================================================
+def test_make_llm_reuses_client_per_deployment_and_temperature(registry):
+    llm = core.make_llm(model="gpt-4o-mini", temperature=0.1)
+    assert core.make_llm(model="gpt-4o-mini", temperature=0.1) is llm
+    other = core.make_llm(model="gpt-4o-mini", temperature=0.7)
+    assert other is not llm
+    # 서로 다른 LLM 인스턴스도 같은 커넥션 풀을 사용
+    assert llm.http_client is other.http_client is registry.http_client()
+    assert llm.http_async_client is registry.http_async_client()
+    assert registry.stats()["clients"] == 2
+
+
+def test_registry_applies_pool_limits_and_timeouts():
+    reg = ClientRegistry(max_connections=8, max_keepalive=4, keepalive_expiry=30, connect_timeout=1.5, read_timeout=20, http2=False)
+    calls = []
+    assert reg.get("k", lambda: calls.append(1) or object()) is reg.get("k", lambda: calls.append(1) or object())
+    assert calls == [1]
+    assert reg.limits == httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=30)
+    assert reg.http_client().timeout == httpx.Timeout(20, connect=1.5, pool=10.0)
+    reg.close()
+    assert reg.stats()["clients"] == 0
@@ -0,0 +1,139 @@
+# tests/test_history.py
+
+import threading
+
+import pytest
+
+from platform_service.db import history
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    """임시 DB 파일로 대화 기록 저장소를 초기화"""
+    monkeypatch.setattr(history, "DB_PATH", tmp_path / "history.db")
+    history.init_db()
+    yield tmp_path / "history.db"
+    history.flush()
+
+# =============================================================
+# 1. WAL / group commit / 저장 직후 조회
+# =============================================================
+def test_history_uses_wal_and_pooled_connection(history_db):
+    conn = history._connect()
+    assert conn is history._connect()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_background_writer_group_commits_messages(history_db, monkeypatch):
+    batches = []
+    original = history._writer._write
+    monkeypatch.setattr(history._writer, "_write", lambda batch: batches.append(len(batch)) or original(batch))
+
+    def chat(worker):
+        for i in range(25):
+            history.save_message("s1", "user", f"{worker}-{i}")
+
+    threads = [threading.Thread(target=chat, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 저장 직후 조회해도 대기 중인 쓰기가 먼저 반영됨
+    messages = history.load_messages("s1", limit=200)
+    assert len(messages) == 100
+    assert sum(batches) == 100
+    assert len(batches) < 100  # 여러 메시지가 한 트랜잭션으로 커밋됨
+
+# =============================================================
+# 2. 마이그레이션 / keyset 페이지네이션 / 보관
+# =============================================================
+def test_migration_adds_session_index_to_existing_db(tmp_path, monkeypatch):
+    import sqlite3
+    path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE chat_history (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                   "role TEXT NOT NULL, message TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    legacy.execute("INSERT INTO chat_history (session_id, role, message) VALUES ('s1', 'user', '기존 메시지')")
+    legacy.commit()
+    legacy.close()
+
+    monkeypatch.setattr(history, "DB_PATH", path)
+    history.init_db()
+    conn = history._connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(history._MIGRATIONS)
+    plan = " ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM chat_history WHERE session_id=? AND id<? ORDER BY id DESC LIMIT 10", ("s1", 100)))
+    assert "idx_chat_history_session_id" in plan
+    assert history.load_messages("s1")[0]["message"] == "기존 메시지"
+    # 마이그레이션 이전에 저장된 행도 전문 검색 색인에 포함
+    assert history.search_messages("메시지")[0]["message"] == "기존 메시지"
+
+
+def test_failed_migration_rolls_back_and_leaves_connection_usable(tmp_path, monkeypatch):
+    import sqlite3
+    monkeypatch.setattr(history, "DB_PATH", tmp_path / "broken.db")
+    monkeypatch.setattr(history, "_MIGRATIONS", [history._MIGRATIONS[0], "CREATE INDEX idx_broken ON missing_table (id)"])
+    with pytest.raises(sqlite3.OperationalError):
+        history.init_db()
+
+    conn = history._connect()
+    assert not conn.in_transaction
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 1  # 실패한 마이그레이션은 적용되지 않음
+    with conn:
+        conn.execute("INSERT INTO chat_history (session_id, role, message) VALUES ('s1', 'user', '저장')")
+    assert history.load_messages("s1")[0]["message"] == "저장"
+
+
+def test_keyset_pagination_with_before_id(history_db):
+    for i in range(7):
+        history.save_message("s1", "user", f"m{i}")
+        history.save_message("other", "user", f"x{i}")
+    first = history.load_messages("s1", limit=3)
+    second = history.load_messages("s1", limit=3, before_id=first[-1]["id"])
+    last = history.load_messages("s1", limit=3, before_id=second[-1]["id"])
+    assert [m["message"] for m in first + second + last] == [f"m{i}" for i in range(6, -1, -1)]
+
+
+def test_archive_moves_old_rows_to_monthly_partitions(history_db):
+    from datetime import datetime, timezone
+    conn = history._connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO chat_history (session_id, role, message, created_at) VALUES (?, 'user', ?, ?)",
+            [("s1", "1월", "2025-01-10 09:00:00"), ("s1", "2월-a", "2025-02-03 10:00:00"),
+             ("s2", "2월-b", "2025-02-20 11:00:00"), ("s1", "최근", "2025-06-01 12:00:00")],
+        )
+    moved = history.archive_messages(older_than_days=90, batch_size=2, now=datetime(2025, 6, 2, tzinfo=timezone.utc))
+    assert moved == 3
+    assert history.list_partitions() == ["chat_history_202501", "chat_history_202502"]
+    assert [m["message"] for m in history.load_messages("s1")] == ["최근"]
+    assert conn.execute("SELECT COUNT(*) FROM chat_history_202502").fetchone()[0] == 2
+
+# =============================================================
+# 3. 전문 검색 (FTS5 trigram)
+# =============================================================
+def test_search_messages_ranks_and_paginates(history_db):
+    history.save_message("s1", "user", "VPN 접속이 안 돼요. 재택근무 중인데 회사 밖에서는 연결이 계속 끊깁니다.")
+    history.save_message("s1", "assistant", "VPN 재설치 후 VPN 인증서를 확인하세요.")
+    history.save_message("s2", "user", "비번 초기화는 어디서 하나요?")
+    history.save_message("s2", "user", "메일 용량 늘려주세요")
+
+    results = history.search_messages("VPN")
+    assert len(results) == 2
+    assert results[0]["role"] == "assistant"  # VPN이 더 많이 등장한 메시지가 먼저
+    assert "[VPN]" in results[0]["snippet"]
+    assert [r["role"] for r in history.search_messages("VPN", limit=1, offset=1)] == ["user"]
+    assert [r["session_id"] for r in history.search_messages("VPN 재설치")] == ["s1"]
+    # trigram으로 색인되지 않는 2글자 키워드는 LIKE 조건으로 검색
+    assert [r["message"] for r in history.search_messages("비번")] == ["비번 초기화는 어디서 하나요?"]
+    assert history.search_messages("접속", session_id="s2") == []
+
+    # 보관(삭제)된 메시지는 색인에서도 제거
+    conn = history._connect()
+    with conn:
+        conn.execute("DELETE FROM chat_history WHERE session_id='s1'")
+    assert history.search_messages("VPN") == []
@@ -0,0 +1,103 @@
+# tests/test_intent.py
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from platform_service import core
+from platform_service.intent import LocalIntentClassifier
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+OWNERS = [
+    {"screen": "인사시스템-사용자관리", "owner": "홍길동"},
+    {"screen": "재무시스템-정산화면", "owner": "김재무"},
+    {"screen": "재무시스템-예산관리", "owner": "이예산"},
+]
+
+
+class KeywordEmbedding(Embeddings):
+    """키워드 포함 여부로 만든 가짜 임베딩 (인사 / 비밀번호 / 계정 / 일반)"""
+    AXES = (("안녕", "반가", "hello", "아침"), ("비밀번호", "패스워드", "암호"), ("계정", "아이디", "사번"), ("점심", "복지", "vpn", "회의실", "출장"))
+
+    def _vec(self, text):
+        t = text.lower()
+        return [float(any(k in t for k in axis)) for axis in self.AXES]
+
+    def embed_documents(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vec(text)
+
+
+@pytest.fixture
+def classifier():
+    return LocalIntentClassifier(owners_fn=lambda: OWNERS, embedder_fn=KeywordEmbedding)
+
+# =============================================================
+# 1. 규칙 / 담당자 화면 매칭
+# =============================================================
+def test_keyword_rules(classifier):
+    assert classifier.classify("안녕하세요").intent == "greeting"
+    result = classifier.classify("비밀번호 초기화 하고 싶어요")
+    assert (result.intent, result.arguments["tool_name"], result.stage) == ("direct_tool", "tool_reset_password", "rule")
+    assert classifier.classify("계정 발급 절차").arguments["tool_name"] == "tool_request_id"
+    assert classifier.classify("담당자 전체 목록").arguments["tool_name"] == "tool_owner_lookup"
+    assert classifier.classify("담당자 조회").arguments["arguments"] == {"list_all": True}
+
+
+def test_owner_screen_matcher(classifier):
+    result = classifier.classify("인사시스템 담당자 누구야?")
+    assert result.stage == "owner"
+    assert result.arguments["arguments"] == {"screen": "인사시스템-사용자관리"}
+    assert classifier.classify("재무시스템-정산화면 담당자").arguments["screen"] == "재무시스템-정산화면"
+    # '재무시스템'은 두 화면에 해당하므로 LLM으로 넘김 (임베딩 단계도 확신하지 못함)
+    assert classifier.classify("재무시스템 담당자 알려줘") is None
+
+# =============================================================
+# 2. 임베딩 최근접 중심 / LLM 에스컬레이션
+# =============================================================
+def test_centroid_classifier_and_escalation(classifier):
+    result = classifier.classify("패스워드를 잊어버렸어요")
+    assert (result.intent, result.arguments["tool_name"], result.stage) == ("direct_tool", "tool_reset_password", "centroid")
+    assert classifier.classify("점심 메뉴 어디서 봐요").intent == "general_qa"
+    # 어떤 중심에도 가깝지 않으면 LLM 분류로
+    assert classifier.classify("결재선 변경 요청") is None
+    stats = classifier.stats()
+    assert stats["centroid"] == 2 and stats["escalated"] == 1
+
+
+def test_stats_do_not_wait_for_centroid_build():
+    """중심 계산(임베딩 호출) 중에도 규칙 분류와 stats()가 대기하지 않는지 검증"""
+    import threading
+
+    started, release = threading.Event(), threading.Event()
+
+    class SlowEmbedding(KeywordEmbedding):
+        def embed_documents(self, texts):
+            started.set()
+            release.wait(5)
+            return super().embed_documents(texts)
+
+    classifier = LocalIntentClassifier(owners_fn=lambda: OWNERS, embedder_fn=SlowEmbedding)
+    worker = threading.Thread(target=classifier.classify, args=("패스워드를 잊어버렸어요",))
+    worker.start()
+    try:
+        assert started.wait(5)
+        done = threading.Event()
+        threading.Thread(target=lambda: (classifier.classify("안녕하세요"), classifier.stats(), done.set())).start()
+        assert done.wait(1), "중심 계산 중 stats()/분류 카운터가 대기함"
+        assert classifier.stats()["rule"] == 1
+    finally:
+        release.set()
+        worker.join(5)
+    assert classifier.stats()["centroid"] == 1
+
+
+def test_node_classify_skips_llm_when_local_is_confident(monkeypatch, classifier):
+    monkeypatch.setattr(core, "_intent_classifier", classifier)
+    monkeypatch.setattr(core, "make_llm", lambda **kw: pytest.fail("LLM이 호출되면 안 됩니다."))
+    state = core.node_classify({"question": "인사시스템 담당자 누구야?", "intent": "", "reply": "", "sources": [], "tool_output": {}})
+    assert state["intent"] == "direct_tool"
+    assert state["tool_output"]["tool_name"] == "tool_owner_lookup"
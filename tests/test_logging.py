@@ -0,0 +1,73 @@
+# tests/test_logging.py
+
+import json
+import logging
+import logging.handlers
+import queue
+
+from platform_service import logging_config
+from platform_service.logging_config import DroppingQueueHandler, JsonFormatter, LevelSamplingFilter, parse_sample_rates
+
+def _record(level=logging.INFO, msg="hello", **extra):
+    record = logging.LogRecord("test", level, __file__, 10, msg, None, None, func="fn")
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+# =============================================================
+# 1. JSON 포맷
+# =============================================================
+def test_json_formatter_merges_extra_data_and_keeps_korean():
+    line = JsonFormatter().format(_record(msg="응답 완료", extra_data={"status": 200, "path": logging_config.LOG_DIR}))
+    data = json.loads(line)
+    assert data["msg"] == "응답 완료" and data["status"] == 200
+    assert data["level"] == "INFO" and data["function"] == "fn"
+    assert data["path"] == str(logging_config.LOG_DIR)  # 직렬화 불가 값은 문자열로
+
+# =============================================================
+# 2. 레벨별 샘플링 / 큐 포화
+# =============================================================
+def test_sampling_filter_never_drops_warnings():
+    rates = parse_sample_rates("DEBUG=0, INFO=0, WARNING=0, bogus=1")
+    assert rates == {logging.DEBUG: 0.0, logging.INFO: 0.0, logging.WARNING: 0.0}
+    f = LevelSamplingFilter(rates)
+    assert not f.filter(_record(logging.INFO))
+    assert not f.filter(_record(logging.DEBUG))
+    assert f.filter(_record(logging.WARNING))
+    assert f.filter(_record(logging.ERROR))
+
+def test_queue_handler_drops_instead_of_blocking_when_full():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(_record(msg=f"m{i}"))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+def test_setup_logging_routes_root_through_queue_listener():
+    logging_config.setup_logging()
+    root = logging.getLogger()
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+    assert not any(isinstance(h, logging.handlers.RotatingFileHandler) for h in root.handlers)
+    assert logging_config._listener is not None
+
+def test_file_handler_is_append_only_or_per_process(monkeypatch):
+    """공용 app.log 는 회전하지 않고, 회전을 켜면 프로세스별 파일을 사용하는지 검증"""
+    import os
+    monkeypatch.setattr(logging_config, "LOG_ROTATION", "none")
+    config = logging_config._file_handler_config()
+    assert config["class"] == "logging.handlers.WatchedFileHandler"
+    assert config["filename"].name == "app.log"
+    for rotation in ("size", "time"):
+        monkeypatch.setattr(logging_config, "LOG_ROTATION", rotation)
+        assert logging_config._file_handler_config()["filename"].name == f"app.{os.getpid()}.log"
+
+def test_remove_stale_logs_keeps_live_processes(monkeypatch, tmp_path):
+    """종료된 PID의 로그(회전 백업 포함)만 삭제하고 살아 있는 프로세스의 로그는 남기는지 검증"""
+    import os
+    monkeypatch.setattr(logging_config, "LOG_DIR", tmp_path)
+    dead = 2 ** 22 + 12345  # pid_max 보다 큰 값이므로 존재할 수 없는 PID
+    for name in (f"app.{os.getpid()}.log", f"app.{os.getppid()}.log.1", f"app.{dead}.log", f"app.{dead}.log.3", "app.log"):
+        (tmp_path / name).write_text("x", encoding="utf-8")
+
+    assert logging_config.remove_stale_logs() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["app.log", f"app.{os.getpid()}.log", f"app.{os.getppid()}.log.1"])
@@ -0,0 +1,60 @@
+# tests/test_metrics.py
+
+import asyncio
+
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from platform_service import metrics
+from platform_service.metrics import MetricsRegistry
+
+# =============================================================
+# 1. Prometheus 텍스트 형식
+# =============================================================
+def test_histogram_renders_cumulative_buckets():
+    reg = MetricsRegistry()
+    h = reg.histogram("demo_seconds", "데모", ["node"], buckets=(0.1, 1.0))
+    h.observe(0.05, node="rag")
+    h.observe(0.5, node="rag")
+    h.observe(3.0, node="rag")
+    text = reg.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{node="rag",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{node="rag",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{node="rag",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{node="rag"} 3' in text
+    assert 'demo_seconds_sum{node="rag"} 3.55' in text
+
+def test_counter_labels_and_collectors():
+    reg = MetricsRegistry()
+    c = reg.counter("demo_total", "데모", ["intent"])
+    c.inc(intent='say "hi"')
+    c.inc(2, intent='say "hi"')
+    assert reg.counter("demo_total", "데모", ["intent"]) is c  # 같은 이름은 기존 메트릭 반환
+    reg.register_collector(lambda: [("demo_cache_total", "counter", "캐시", [({"result": "hit"}, 4)])])
+    reg.register_collector(lambda: 1 / 0)  # 실패한 collector 는 건너뜀
+    text = reg.render()
+    assert 'demo_total{intent="say \\"hi\\""} 3.0' in text
+    assert 'demo_cache_total{result="hit"} 4.0' in text
+
+# =============================================================
+# 2. LLM / 임베딩 계측
+# =============================================================
+def test_llm_callback_records_latency_and_tokens():
+    model = "test-llm-metrics"
+    llm = GenericFakeChatModel(
+        messages=iter([AIMessage(content="답변", usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})]),
+        callbacks=[metrics.LLMMetricsCallback(model)],
+    )
+    llm.invoke("질문")
+    assert metrics.LLM_LATENCY.count(model=model, status="ok") == 1
+    assert metrics.LLM_TOKENS.count(model=model, type="input") == 1
+    assert f'sda_llm_tokens_sum{{model="{model}",type="output"}} 30.0' in metrics.render()
+
+def test_timed_embeddings_records_each_call():
+    before = metrics.EMBEDDING_LATENCY.count(op="query")
+    embed = metrics.TimedEmbeddings(FakeEmbeddings(size=8))
+    embed.embed_query("a")
+    asyncio.run(embed.aembed_query("b"))
+    assert metrics.EMBEDDING_LATENCY.count(op="query") == before + 2
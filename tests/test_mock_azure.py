@@ -0,0 +1,101 @@
+# tests/test_mock_azure.py
+
+import asyncio
+import uuid
+
+import pytest
+
+from benchmarks.mock_azure import MockAzureServer, MockConfig, classify
+from platform_service import constants, core
+from platform_service.clients import ClientRegistry
+from platform_service.intent import LocalIntentClassifier
+from platform_service.response_cache import ResponseCache
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+def _connect(monkeypatch, tmp_path, server):
+    """임시 KB/인덱스 경로와 mock 서버로 Azure 경로 전체(임베딩, 인덱싱, 분류, RAG)를 설정"""
+    monkeypatch.setattr(constants, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(constants, "KB_DEFAULT_DIR", tmp_path / "kb_default")
+    monkeypatch.setattr(constants, "KB_DATA_DIR", tmp_path / "kb_data")
+    monkeypatch.setattr(constants, "INDEX_DIR", tmp_path / "indexes")
+    (tmp_path / "kb_default").mkdir()
+    (tmp_path / "kb_data").mkdir()
+    (tmp_path / "kb_default" / "faq_data.csv").write_text(
+        "question,answer\nVPN 접속이 안 돼요,VPN 클라이언트를 재설치하세요\n점심시간이 언제야,12시부터 1시까지입니다\n", encoding="utf-8"
+    )
+    registry = ClientRegistry(http2=False)
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "AOAI_ENDPOINT", server.url)
+    monkeypatch.setattr(core, "AOAI_API_KEY", "mock")
+    monkeypatch.setattr(core, "EMBED_CHECK_CTX_LENGTH", False)
+    monkeypatch.setattr(core, "KB_LOAD_WORKERS", 1)
+    monkeypatch.setattr(core, "_clients", registry)
+    monkeypatch.setattr(core, "_active", None)
+    monkeypatch.setattr(core, "_graph", None)
+    monkeypatch.setattr(core, "_faq_data", None)
+    monkeypatch.setattr(core, "_faq_postings", None)
+    monkeypatch.setattr(core, "_okt", core._DummyOkt())
+    monkeypatch.setattr(core, "_response_cache", ResponseCache())
+    monkeypatch.setattr(core, "_intent_classifier", LocalIntentClassifier(
+        owners_fn=lambda: [], embedder_fn=core._make_embedder, examples_fn=core._intent_examples
+    ))
+    return registry
+
+
+@pytest.fixture
+def mock_azure(monkeypatch, tmp_path):
+    with MockAzureServer(MockConfig(latency_ms=5, jitter_ms=2)) as server:
+        registry = _connect(monkeypatch, tmp_path, server)
+        yield server
+        registry.close()
+
+# =============================================================
+# 1. 분류 스크립트
+# =============================================================
+def test_scripted_classifier_rules():
+    script = MockConfig().classifier_script
+    assert classify("안녕하세요", script)["intent"] == "greeting"
+    assert classify("패스워드가 잠겼어요", script)["arguments"] == {"tool_name": "tool_reset_password"}
+    assert classify("VPN 접속이 안 돼요", script) == {"intent": "general_qa", "arguments": {}}
+
+# =============================================================
+# 2. Azure 없이 전체 LangGraph 경로 실행
+# =============================================================
+def test_full_graph_and_indexing_offline(mock_azure):
+    """인덱싱 → 의도 분류(LLM 스크립트) → 추측 검색 → RAG 답변이 mock 서버만으로 동작하는지 검증"""
+    vs = core.build_or_load_vectorstore()
+    assert len(vs.index_to_docstore_id) == 2
+
+    out = core.pipeline("VPN 연결 문제 해결 방법", str(uuid.uuid4()))
+    assert out["intent"] == "general_qa"
+    assert out["reply"].startswith("참고 문서")
+    assert {s["source"] for s in out["sources"]} <= {"faq_data.csv"} and out["sources"]
+
+    # 로컬 규칙에 없는 표현 → LLM(스크립트) 분류 → 도구 실행
+    tool = core.pipeline("패스워드가 잠겼어요", str(uuid.uuid4()))
+    assert tool["intent"] == "direct_tool" and "비밀번호 초기화" in tool["reply"]
+
+def test_async_streaming_offline(mock_azure):
+    """astream_pipeline: mock 서버의 SSE 청크가 token 이벤트로 전달되는지 검증"""
+    core.build_or_load_vectorstore()
+
+    async def collect():
+        return [e async for e in core.astream_pipeline("점심시간 알려줘", str(uuid.uuid4()))]
+
+    events = asyncio.run(collect())
+    tokens = [e["data"]["text"] for e in events if e["event"] == "token"]
+    assert len(tokens) > 1
+    assert events[-1]["event"] == "final" and events[-1]["data"]["reply"] == "".join(tokens)
+
+def test_embedding_retries_through_rate_limits(monkeypatch, tmp_path):
+    """429 비율을 주입해도 스케줄러가 retry-after-ms 만큼 기다렸다가 재시도하여 인덱싱을 완료하는지 검증"""
+    with MockAzureServer(MockConfig(rate_limit=0.5, retry_after_ms=10, seed=3)) as server:
+        registry = _connect(monkeypatch, tmp_path, server)
+        try:
+            core.build_or_load_vectorstore()
+            stats = registry.http_client().get(f"{server.url}/mock/stats").json()
+        finally:
+            registry.close()
+    assert stats["throttled"] > 0 and stats["embeddings"] > 0
@@ -0,0 +1,166 @@
+# tests/test_response_cache.py
+
+import pytest
+
+from platform_service import core
+from platform_service.response_cache import ResponseCache, normalize_question
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def keyword_embed(text: str):
+    """'비밀번호' / '로그인' 포함 여부로 만든 2차원 가짜 임베딩"""
+    return [1.0 if "비밀번호" in text else 0.0, 1.0 if "로그인" in text else 0.0]
+
+
+def answer(intent: str = "general_qa", reply: str = "답변"):
+    return {"reply": reply, "intent": intent, "sources": []}
+
+# =============================================================
+# 1. 정확 일치 / TTL / LRU / 세대 무효화
+# =============================================================
+def test_exact_hit_uses_normalized_question():
+    cache = ResponseCache()
+    assert normalize_question("  비밀번호   초기화?? ") == "비밀번호 초기화"
+    assert cache.put("비밀번호 초기화", "g1", answer(reply="SSO 포털"))
+    hit = cache.get("비밀번호  초기화?", "g1")
+    assert hit["reply"] == "SSO 포털"
+    # 반환값을 수정해도 캐시 내용은 바뀌지 않음
+    hit["reply"] = "변경"
+    assert cache.get("비밀번호 초기화", "g1")["reply"] == "SSO 포털"
+    assert cache.stats()["exact_hits"] == 2
+
+
+def test_ttl_lru_and_generation_invalidation():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=60, clock=clock)
+    cache.put("질문1", "g1", answer())
+    cache.put("질문2", "g1", answer())
+    cache.get("질문1", "g1")            # 질문1 최근 사용
+    cache.put("질문3", "g1", answer())  # 질문2 제거(LRU)
+    assert cache.get("질문2", "g1") is None
+    assert cache.get("질문1", "g1") is not None
+
+    clock.now += 61
+    assert cache.get("질문1", "g1") is None
+    assert cache.stats()["expirations"] == 1
+
+    cache.put("질문4", "g1", answer())
+    assert cache.get("질문4", "g2") is None
+    stats = cache.stats()
+    assert stats["invalidations"] == 1 and stats["size"] == 0
+    # 이전 세대로 처리된 결과는 저장하지 않음
+    assert not cache.put("질문5", "g1", answer())
+
+
+def test_per_intent_and_session_rules():
+    cache = ResponseCache()
+    assert not cache.put("시스템 점검 중인가요", "g1", answer(intent="system_error"))
+    assert not cache.put("아까 말한 담당자 다시 알려줘", "g1", answer(intent="direct_tool"))
+    assert cache.get("아까 말한 담당자 다시 알려줘", "g1") is None
+    assert cache.stats()["bypassed"] == 1
+
+# =============================================================
+# 2. 유사도(임베딩) 캐시
+# =============================================================
+def test_semantic_tier_only_for_semantic_intents():
+    cache = ResponseCache(similarity=0.9, embed_fn=keyword_embed)
+    cache.put("비밀번호를 잊어버렸어요", "g1", answer(intent="faq", reply="SSO 포털에서 재설정"))
+    cache.put("로그인 담당자", "g1", answer(intent="direct_tool", reply="홍길동"))
+
+    assert cache.get("비밀번호 어떻게 바꿔요", "g1")["reply"] == "SSO 포털에서 재설정"
+    # direct_tool 응답은 정확 일치만 허용
+    assert cache.get("로그인 담당자 누구", "g1") is None
+    stats = cache.stats()
+    assert stats["semantic_hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_pipeline_serves_repeated_question_from_cache(monkeypatch):
+    """같은 질문의 두 번째 요청은 LangGraph 파이프라인을 실행하지 않는지 검증합니다."""
+    calls = []
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "_response_cache", ResponseCache())
+    monkeypatch.setattr(core.index_store, "current_generation", lambda: "g1")
+    monkeypatch.setattr(core, "run_graph_pipeline", lambda q, s: calls.append(q) or answer(reply="점심은 12시"))
+
+    assert core.pipeline("점심시간이 언제야?", "s1")["reply"] == "점심은 12시"
+    assert core.pipeline("점심시간이 언제야", "s2")["reply"] == "점심은 12시"
+    assert calls == ["점심시간이 언제야?"]
+    assert core.response_cache_stats()["exact_hits"] == 1
+
+
+def test_async_pipeline_runs_cache_io_off_the_event_loop(monkeypatch):
+    """비동기 경로의 캐시 조회/저장(세대 포인터 읽기, 유사도 캐시 질의 임베딩)이 이벤트 루프 스레드에서 실행되지 않는지 검증합니다."""
+    import asyncio
+    import threading
+
+    loop_threads = []
+
+    def off_loop(fn):
+        def wrapper(*args, **kwargs):
+            assert threading.get_ident() not in loop_threads, f"{fn.__name__} 가 이벤트 루프에서 실행되었습니다."
+            return fn(*args, **kwargs)
+        return wrapper
+
+    cache = ResponseCache()
+    monkeypatch.setattr(cache, "get", off_loop(cache.get))
+    monkeypatch.setattr(cache, "put", off_loop(cache.put))
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "_response_cache", cache)
+    monkeypatch.setattr(core.index_store, "current_generation", off_loop(lambda: "g1"))
+
+    async def fake_graph(q, s):
+        return answer(reply="점심은 12시")
+
+    monkeypatch.setattr(core, "arun_graph_pipeline", fake_graph)
+
+    async def run():
+        loop_threads.append(threading.get_ident())
+        first = await core.apipeline("점심시간이 언제야?", "s1")
+        events = [e async for e in core.astream_pipeline("점심시간이 언제야?", "s2")]
+        return first, events
+
+    first, events = asyncio.run(run())
+    assert first["reply"] == "점심은 12시"
+    assert events == [{"event": "final", "data": first}]
+
+
+def test_all_pipeline_paths_return_the_same_system_error(monkeypatch):
+    """동기/비동기/스트리밍 경로의 오류 응답이 같은 형태인지 검증합니다."""
+    import asyncio
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("graph failure")
+
+    async def aboom(*args, **kwargs):
+        raise RuntimeError("graph failure")
+
+    async def astream_boom(*args, **kwargs):
+        raise RuntimeError("graph failure")
+        yield  # 비동기 제너레이터
+
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(core, "run_graph_pipeline", boom)
+    monkeypatch.setattr(core, "stream_graph_pipeline", boom)
+    monkeypatch.setattr(core, "arun_graph_pipeline", aboom)
+    monkeypatch.setattr(core, "astream_graph_pipeline", astream_boom)
+
+    async def run_async():
+        return await core.apipeline("질문", "s1"), [e async for e in core.astream_pipeline("질문", "s1")]
+
+    sync_result = core.pipeline("질문", "s1")
+    stream_events = list(core.stream_pipeline("질문", "s1"))
+    async_result, async_events = asyncio.run(run_async())
+    assert sync_result == async_result == core._SYSTEM_ERROR_RESULT
+    assert stream_events == async_events == [{"event": "final", "data": core._SYSTEM_ERROR_RESULT}]
+    assert sync_result is not core._SYSTEM_ERROR_RESULT
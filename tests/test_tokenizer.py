@@ -0,0 +1,63 @@
+# tests/test_tokenizer.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from platform_service import tokenizer
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+@pytest.fixture(scope="module")
+def kiwi():
+    pytest.importorskip("kiwipiepy")
+    return tokenizer.create_tokenizer("kiwi", num_workers=2)
+
+# =============================================================
+# 1. Kiwi 백엔드 (phrases / nouns)
+# =============================================================
+def test_kiwi_phrases_include_compound_and_sub_phrases(kiwi):
+    """연속된 명사 어절을 전체/부분 어구와 어절 내부 명사로 함께 반환하는지 검증합니다."""
+    assert kiwi.name == "kiwi"
+    words = kiwi.phrases("인사시스템 사용자관리 담당자가 누구야?")
+    for expected in ("인사시스템", "사용자관리", "인사시스템 사용자관리", "담당자", "시스템"):
+        assert expected in words
+    # 조사/어미에서 어구가 끊기고, 한 글자 토큰은 제외
+    assert not any("누구" in w for w in words)
+    assert all(len(w) > 1 for w in words)
+
+
+def test_kiwi_phrases_join_derivational_suffix(kiwi):
+    assert "비밀번호 초기화" in kiwi.phrases("비밀번호 초기화 방법")
+    assert "vpn 접속" in kiwi.phrases("vpn 접속이 안 돼요")
+
+
+def test_kiwi_nouns_fallback_for_short_question(kiwi):
+    # find_similar_faq: phrases가 비면 nouns로 재시도
+    assert kiwi.phrases("밥") == []
+    assert kiwi.nouns("밥") == ["밥"]
+
+
+def test_kiwi_batch_and_threads_match_single_calls(kiwi):
+    """배치 분석과 여러 스레드 동시 호출 결과가 단건 호출과 같은지 검증합니다."""
+    texts = [f"{i}번 화면 비밀번호 초기화 요청" for i in range(64)] + ["VPN 접속 방법 안내", ""]
+    expected = [kiwi.phrases(t) for t in texts]
+    assert tokenizer.phrases_many(kiwi, texts) == expected
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(kiwi.phrases, texts)) == expected
+
+# =============================================================
+# 2. 백엔드 선택
+# =============================================================
+def test_phrases_many_falls_back_to_single_calls():
+    class Analyzer:
+        def phrases(self, text):
+            return text.split()
+
+    assert tokenizer.phrases_many(Analyzer(), ["a b", "c"]) == [["a", "b"], ["c"]]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        tokenizer.create_tokenizer("mecab")
@@ -0,0 +1,417 @@
+# tests/test_vectorstore.py
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from platform_service import ann, bm25, constants, core, index_store, ingest
+from platform_service.embeddings import CachedEmbeddings, EmbeddingCache, EmbeddingScheduler
+
+# =============================================================
+# Fixtures & Helpers
+# =============================================================
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """임베딩 호출 횟수(텍스트 수)를 기록하는 가짜 임베딩"""
+    calls: int = 0
+    queries: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def kb_env(tmp_path, monkeypatch):
+    """
+    임시 디렉토리를 KB/인덱스 경로로 사용하고, Azure 임베딩을 가짜 임베딩으로 대체합니다.
+    """
+    monkeypatch.setattr(constants, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(constants, "KB_DEFAULT_DIR", tmp_path / "kb_default")
+    monkeypatch.setattr(constants, "KB_DATA_DIR", tmp_path / "kb_data")
+    monkeypatch.setattr(constants, "INDEX_DIR", tmp_path / "indexes")
+    (tmp_path / "kb_default").mkdir()
+    (tmp_path / "kb_data").mkdir()
+
+    embed = CountingEmbedding(size=16)
+    # 파일 경계를 넘는 청크 배치까지 검증되도록 배치 크기를 작게 설정
+    monkeypatch.setattr(core, "EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(core, "KB_LOAD_WORKERS", 1)
+    monkeypatch.setattr(core, "AZURE_AVAILABLE", True)
+    monkeypatch.setattr(core, "_make_embedder", lambda: embed)
+    monkeypatch.setattr(core, "_active", None)
+    # BM25 토큰화는 JVM 없이 더미 분석기 사용
+    monkeypatch.setattr(core, "_okt", core._DummyOkt())
+    return tmp_path, embed
+
+# =============================================================
+# 1. 증분 인덱싱 (manifest)
+# =============================================================
+def test_incremental_sync_embeds_only_changed_files(kb_env):
+    """변경 없는 재동기화는 임베딩을 호출하지 않고, 신규 파일은 해당 파일만 임베딩하는지 검증합니다."""
+    root, embed = kb_env
+    (root / "kb_default" / "faq_data.csv").write_text(
+        "question,answer\n로그인이 안 돼요,헬프데스크로 연락\n식당 메뉴,포털 공지 확인\n", encoding="utf-8"
+    )
+    vs = core.build_or_load_vectorstore()
+    assert embed.calls == 2
+    assert len(vs.index_to_docstore_id) == 2
+
+    embed.calls = 0
+    core.build_or_load_vectorstore()
+    assert embed.calls == 0
+
+    (root / "kb_data" / "manual.txt").write_text("VPN 접속 방법 안내", encoding="utf-8")
+    vs = core.build_or_load_vectorstore()
+    assert embed.calls == 1
+    assert len(vs.index_to_docstore_id) == 3
+
+
+def test_incremental_sync_drops_deleted_file_vectors(kb_env):
+    """삭제/변경된 파일의 기존 벡터가 인덱스에서 제거되는지 검증합니다."""
+    root, embed = kb_env
+    manual = root / "kb_data" / "manual.txt"
+    manual.write_text("VPN 접속 방법 안내", encoding="utf-8")
+    (root / "kb_data" / "notice.md").write_text("점검 공지", encoding="utf-8")
+    vs = core.build_or_load_vectorstore()
+    assert len(vs.index_to_docstore_id) == 2
+
+    manual.unlink()
+    vs = core.build_or_load_vectorstore()
+    sources = {d.metadata["source"] for d in vs.docstore._dict.values()}
+    assert len(vs.index_to_docstore_id) == 1
+    assert not any(s.endswith("manual.txt") for s in sources)
+
+    generation = index_store.current_generation()
+    manifest = ingest.IngestManifest.load(index_store.generation_path(generation) / ingest.MANIFEST_NAME)
+    assert list(manifest.files) == ["kb_data/notice.md"]
+
+def test_generation_hot_swap_keeps_old_index_intact(kb_env):
+    """다른 워커가 새 세대를 게시하면 retriever가 교체되고, 기존 벡터스토어 객체는 변경되지 않는지 검증합니다."""
+    root, embed = kb_env
+    (root / "kb_data" / "manual.txt").write_text("VPN 접속 방법 안내", encoding="utf-8")
+    core.build_or_load_vectorstore()
+    old_generation = core.current_generation()
+    old_vs = core.current_vectorstore()
+
+    # 다른 프로세스의 Sync를 흉내: 새 세대만 게시하고 현재 프로세스 swap은 하지 않음
+    (root / "kb_data" / "notice.md").write_text("점검 공지", encoding="utf-8")
+    with index_store.sync_lock():
+        new_generation, _ = core._sync_vectorstore()
+    assert new_generation != old_generation
+    assert core.current_generation() == old_generation
+
+    new_vs = core.current_vectorstore()
+    assert core.current_generation() == new_generation
+    assert len(new_vs.index_to_docstore_id) == 2
+    assert len(old_vs.index_to_docstore_id) == 1
+
+
+def test_parallel_loader_streams_all_files(tmp_path):
+    """프로세스 풀 로더가 모든 파일을 반환하고, 파싱 실패 파일은 건너뛰는지 검증합니다."""
+    files = []
+    for i in range(4):
+        p = tmp_path / f"doc{i}.txt"
+        p.write_text(f"문서 {i}", encoding="utf-8")
+        files.append((p.name, p))
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    files.append((broken.name, broken))
+
+    loaded = dict(ingest.iter_loaded_docs(files, workers=2))
+    assert set(loaded) == {f"doc{i}.txt" for i in range(4)}
+    assert loaded["doc3.txt"][0].page_content == "문서 3"
+
+def test_loader_workers_do_not_import_core():
+    """파싱 워커가 unpickle 하는 로더 모듈과 패키지 초기화가 core(클라이언트 풀, 체크포인트 DB, 로깅 핸들러)를 import 하지 않는지 검증합니다."""
+    import subprocess
+    import sys
+
+    assert ingest.load_file_docs.__module__ == "platform_service.loaders"
+    code = "import sys, platform_service.loaders; print('platform_service.core' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=constants.BASE_DIR)
+    assert out.stdout.strip() == "False"
+
+# =============================================================
+# 2. 임베딩 디스크 캐시
+# =============================================================
+def test_embedding_cache_persists_across_instances(tmp_path):
+    """한 번 임베딩한 문서는 캐시를 다시 열어도 임베딩 API를 호출하지 않는지 검증합니다."""
+    inner = CountingEmbedding(size=8)
+    cached = CachedEmbeddings(inner, EmbeddingCache(tmp_path, "text-embedding-3-small"))
+    first = cached.embed_documents(["비밀번호 초기화", "로그인 오류", "비밀번호 초기화"])
+    assert inner.calls == 2
+
+    inner.calls = 0
+    reopened = CachedEmbeddings(inner, EmbeddingCache(tmp_path, "text-embedding-3-small"))
+    again = reopened.embed_documents(["비밀번호 초기화", "로그인 오류"])
+    assert inner.calls == 0
+    assert np.allclose(again, first[:2], atol=1e-6)
+    # 문서와 같은 텍스트의 질의는 디스크 캐시에서 조회
+    assert np.allclose(reopened.embed_query("로그인 오류"), first[1], atol=1e-6)
+    assert inner.queries == 0
+
+
+def test_query_embeddings_stay_in_bounded_memory_lru(tmp_path):
+    """질의 임베딩은 디스크 캐시에 쓰지 않고, 크기 제한된 메모리 LRU에서만 재사용되는지 검증합니다."""
+    inner = CountingEmbedding(size=8)
+    cache = EmbeddingCache(tmp_path, "embed")
+    cached = CachedEmbeddings(inner, cache, query_cache_size=2)
+    q = cached.embed_query("식당 메뉴는 어디서 확인?")
+    assert np.allclose(cached.embed_query("식당 메뉴는 어디서 확인?"), q, atol=1e-6)
+    assert inner.queries == 1
+    assert len(cache) == 0 and not cache.vec_path.exists()
+
+    cached.embed_query("VPN 접속 오류")
+    cached.embed_query("메일 용량")  # 가장 오래된 질의가 밀려남
+    cached.embed_query("식당 메뉴는 어디서 확인?")
+    assert inner.queries == 4
+
+
+def test_cache_load_waits_for_inflight_writer(tmp_path):
+    """다른 프로세스가 벡터만 쓰고 키는 아직 쓰지 않은 상태에서 캐시를 열어도 그 행을 잘라내지 않는지 검증합니다."""
+    import fcntl
+    import threading
+
+    writer = EmbeddingCache(tmp_path, "embed")
+    writer.put_many(["a"], [[1.0] * 4])
+    with open(writer.lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # 벡터 append 후 키 append 전 (다른 writer의 put_many 중간 상태)
+        with open(writer.vec_path, "ab") as f:
+            f.write(np.full((1, 4), 2.0, dtype=np.float32).tobytes())
+        opened = []
+        reader = threading.Thread(target=lambda: opened.append(EmbeddingCache(tmp_path, "embed")))
+        reader.start()
+        reader.join(timeout=0.2)
+        assert reader.is_alive()  # 잠금이 풀릴 때까지 잘라내지 않고 대기
+        with open(writer.key_path, "ab") as f:
+            f.write(b"b\n")
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    reader.join(timeout=5)
+    assert opened[0].get_many(["a", "b"]) == [[1.0] * 4, [2.0] * 4]
+
+
+def test_concurrent_identical_queries_share_one_embedding_call(tmp_path):
+    """같은 질의를 동시에 임베딩하면(분류 + 추측 검색) 실제 API는 한 번만 호출되는지 검증합니다."""
+    import asyncio
+    import threading
+
+    release = threading.Event()
+
+    class SlowEmbedding(CountingEmbedding):
+        def embed_query(self, text):
+            release.wait(timeout=5)
+            return super().embed_query(text)
+
+        async def aembed_query(self, text):
+            await asyncio.sleep(0.05)
+            return super().embed_query(text)
+
+    inner = SlowEmbedding(size=8)
+    cached = CachedEmbeddings(inner, EmbeddingCache(tmp_path, "embed"))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cached.embed_query("VPN 접속 오류"))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+    assert inner.queries == 1 and len(results) == 3
+
+    async def embed_twice():
+        return await asyncio.gather(cached.aembed_query("메일 용량"), cached.aembed_query("메일 용량"))
+
+    first, second = asyncio.run(embed_twice())
+    assert first == second and inner.queries == 2
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_scheduler_retries_and_checkpoints_batches(tmp_path):
+    """429 오류는 재시도하고, 완료된 배치는 즉시 캐시에 기록되어 재실행 시 재사용되는지 검증합니다."""
+    inner = CountingEmbedding(size=8)
+    failures = {"left": 1}
+
+    def flaky_embed(texts):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise RateLimitError("Too Many Requests")
+        return inner.embed_documents(texts)
+
+    class FlakyEmbedding(CountingEmbedding):
+        def embed_documents(self, texts):
+            return flaky_embed(texts)
+
+    scheduler = EmbeddingScheduler(batch_size=2, max_concurrency=2, max_retries=2, base_delay=0.01)
+    cache = EmbeddingCache(tmp_path, "embed")
+    texts = [f"문서 {i}" for i in range(5)]
+    vectors = CachedEmbeddings(FlakyEmbedding(size=8), cache, scheduler).embed_documents(texts)
+    assert len(vectors) == 5
+    assert inner.calls == 5
+    assert len(cache) == 5
+    assert np.allclose(vectors, inner.embed_documents(texts), atol=1e-6)
+
+
+def test_query_embedding_uses_short_retry_budget(tmp_path, monkeypatch):
+    """질의 임베딩은 인덱싱용 재시도 설정(6회, 최대 60초)이 아닌 짧은 재시도 예산을 사용하는지 검증합니다."""
+    from platform_service import embeddings
+
+    sleeps = []
+    monkeypatch.setattr(embeddings._time, "sleep", sleeps.append)
+
+    class Throttled(CountingEmbedding):
+        def embed_query(self, text):
+            super().embed_query(text)
+            raise RateLimitError("Too Many Requests")
+
+    inner = Throttled(size=8)
+    scheduler = EmbeddingScheduler(max_retries=6, base_delay=10.0, max_delay=60.0, query_max_retries=1, query_max_delay=0.5)
+    cached = CachedEmbeddings(inner, EmbeddingCache(tmp_path, "embed"), scheduler)
+    with pytest.raises(RateLimitError):
+        cached.embed_query("VPN 접속 오류")
+    assert inner.queries == 2
+    assert len(sleeps) == 1 and sleeps[0] <= 0.5 * 1.25
+
+
+def test_mmap_vectorstore_matches_pickled_index(kb_env):
+    """mmap + 컬럼형 docstore로 로드한 인덱스가 기존 인덱스와 같은 검색 결과를 반환하는지 검증합니다."""
+    root, embed = kb_env
+    (root / "kb_data" / "manual.txt").write_text("VPN 접속 방법 안내", encoding="utf-8")
+    (root / "kb_data" / "notice.md").write_text("점검 공지", encoding="utf-8")
+    vs = core.build_or_load_vectorstore()
+
+    gen_path = index_store.generation_path(core.current_generation())
+    mm = index_store.load_mmap_vectorstore(gen_path, embed)
+    expected = vs.similarity_search("점검 공지", k=2)
+    actual = mm.similarity_search("점검 공지", k=2)
+    assert [d.page_content for d in actual] == [d.page_content for d in expected]
+    assert [d.id for d in actual] == [d.id for d in expected]
+    assert actual[0].metadata == expected[0].metadata
+
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivf_flat", "ivf_pq"])
+def test_ann_serving_index(kb_env, monkeypatch, index_type):
+    """ANN 인덱스 유형별로 검색용 인덱스가 생성되고, 요청별 nprobe/efSearch로 검색되는지 검증합니다."""
+    root, embed = kb_env
+    monkeypatch.setattr(core, "INDEX_TYPE", index_type)
+    monkeypatch.setattr(core, "INDEX_PQ_M", 4)
+    monkeypatch.setattr(core, "EMBED_BATCH_SIZE", 512)
+    rows = "\n".join(f"질문 {i},답변 {i}" for i in range(400))
+    (root / "kb_default" / "faq_data.csv").write_text(f"question,answer\n{rows}\n", encoding="utf-8")
+
+    core.build_or_load_vectorstore()
+    gen_path = index_store.generation_path(core.current_generation())
+    params = ann.load_params(gen_path)
+    assert params["type"] == index_type
+    assert ann.has_serving_index(gen_path)
+    assert core.current_vectorstore().index.ntotal == 400
+
+    docs = core.retriever(k=3, nprobe=64, ef_search=128).invoke("질문: 질문 7\n답변: 답변 7")
+    assert docs[0].page_content == "질문: 질문 7\n답변: 답변 7"
+
+
+# =============================================================
+# 3. 하이브리드 검색 (BM25 + 벡터)
+# =============================================================
+def test_hybrid_retriever_exact_code_skips_embedding(kb_env):
+    """에러 코드처럼 정확한 용어가 BM25에서 일치하면 임베딩 호출 없이 해당 문서를 반환하는지 검증합니다."""
+    root, embed = kb_env
+    (root / "kb_data" / "errors.txt").write_text("ERR-4031 오류는 결재 권한 미부여 상태입니다.", encoding="utf-8")
+    (root / "kb_data" / "vpn.txt").write_text("VPN 접속 방법 안내", encoding="utf-8")
+    core.build_or_load_vectorstore()
+    assert (index_store.generation_path(core.current_generation()) / bm25.BM25_NAME).exists()
+
+    embed.queries = 0
+    docs = core.retriever(k=2).invoke("ERR-4031 오류가 떠요")
+    assert docs[0].metadata["source"].endswith("errors.txt")
+    assert embed.queries == 0
+
+    # 코드성 토큰이 없으면 BM25 + 벡터 결과를 RRF로 결합
+    docs = core.retriever(k=2).invoke("vpn 접속")
+    assert embed.queries == 1
+    assert docs[0].metadata["source"].endswith("vpn.txt")
+    assert len(docs) == 2
+
+
+def test_bm25_reuses_tokens_of_unchanged_chunks(kb_env, monkeypatch):
+    """증분 Sync 시 변경되지 않은 청크는 다시 토큰화하지 않는지 검증합니다."""
+    root, embed = kb_env
+    tokenized = []
+    original = core._bm25_tokenize
+    monkeypatch.setattr(core, "_bm25_tokenize", lambda text: tokenized.append(text) or original(text))
+    (root / "kb_data" / "manual.txt").write_text("VPN 접속 방법 안내", encoding="utf-8")
+    core.build_or_load_vectorstore()
+    assert tokenized == ["VPN 접속 방법 안내"]
+
+    tokenized.clear()
+    (root / "kb_data" / "notice.md").write_text("점검 공지", encoding="utf-8")
+    core.build_or_load_vectorstore()
+    assert tokenized == ["점검 공지"]
+    index = bm25.BM25Index.load(index_store.generation_path(core.current_generation()))
+    assert len(index) == 2
+    assert index.search(["vpn"], k=1)
+
+
+def test_bm25_retokenizes_when_analyzer_changes(kb_env, monkeypatch):
+    """형태소 분석기가 바뀌면 이전 역색인을 검색/토큰 재사용에 쓰지 않는지 검증합니다."""
+    root, embed = kb_env
+    (root / "kb_data" / "manual.txt").write_text("VPN 접속 방법 안내", encoding="utf-8")
+    core.build_or_load_vectorstore()
+    generation = core.current_generation()
+    assert core._load_bm25(generation).analyzer == "dummy"
+
+    class OtherAnalyzer(core._DummyOkt):
+        name = "other"
+
+    monkeypatch.setattr(core, "_okt", OtherAnalyzer())
+    assert core._load_bm25(generation) is None
+
+    tokenized = []
+    original = core._bm25_tokenize
+    monkeypatch.setattr(core, "_bm25_tokenize", lambda text: tokenized.append(text) or original(text))
+    (root / "kb_data" / "notice.md").write_text("점검 공지", encoding="utf-8")
+    core.build_or_load_vectorstore()
+    assert sorted(tokenized) == ["VPN 접속 방법 안내", "점검 공지"]
+    assert core._load_bm25(core.current_generation()).analyzer == "other"
+
+
+def test_reciprocal_rank_fusion_orders_by_combined_rank():
+    from langchain_core.documents import Document
+    a, b, c = (Document(id=i, page_content=i) for i in "abc")
+    fused = bm25.reciprocal_rank_fusion([[a, b, c], [b, c]], k=60)
+    assert [d.id for d in fused] == ["b", "c", "a"]
+
+# =============================================================
+# 4. FAQ 역색인 매칭
+# =============================================================
+def test_faq_inverted_index_matches_linear_jaccard(kb_env, monkeypatch):
+    """역색인 기반 FAQ 매칭이 기존 전체 Jaccard 스캔과 같은 결과를 반환하는지 검증합니다."""
+    root, _ = kb_env
+    rows = [
+        ("비밀번호 초기화 방법", "SSO 포털"), ("비밀번호 변경 주기", "90일"), ("점심 시간 안내", "12시"),
+        ("VPN 접속 오류", "재설치"), ("VPN 접속 방법", "포털 안내"), ("회의실 예약 방법", "그룹웨어"),
+    ]
+    body = "\n".join(f"{q},{a}" for q, a in rows)
+    (root / "kb_default" / "faq_data.csv").write_text(f"question,answer\n{body}\n", encoding="utf-8")
+    monkeypatch.setattr(core, "_faq_data", None)
+    monkeypatch.setattr(core, "_faq_postings", None)
+
+    def linear(question):
+        user_words = set(core.get_okt().phrases(question.lower()))
+        best_score, best_item = 0.0, None
+        for item in core.load_faq_data():
+            faq_words = item["faq_words"]
+            score = len(user_words & faq_words) / len(user_words | faq_words)
+            if score > best_score:
+                best_score, best_item = score, item
+        return best_item if best_score > 0.2 else None
+
+    for question in ["VPN 접속 방법", "비밀번호 초기화", "vpn 접속 안돼요", "회의실 예약", "주차 등록", "접속 방법"]:
+        assert core.find_similar_faq(question) == linear(question), question
+    assert set(core._faq_postings["vpn"]) == {3, 4}